@@ -37,6 +37,8 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "drf_spectacular",
+    # Shared services; registered for its management commands.
+    "core",
     "seller",
     "marketplace",
     "mapping",
@@ -142,7 +144,80 @@ MINIO_REGION = os.getenv("MINIO_REGION", "")
 # Cron schedules (for django-crontab or external scheduler wiring).
 CRONJOBS = [
     ("*/15 * * * *", "cron.file_transformer_cron.FileTransformerCron.run"),
+    ("* * * * *", "seller.services.file_ingestion.SellerFileProfilingService.run"),
 ]
+# Number of worker processes used to transform pending mappings (1 runs them in-process).
+FILE_TRANSFORMER_WORKERS = int(os.getenv("FILE_TRANSFORMER_WORKERS", "1"))
+# Processes used to validate a single file in chunks; only applies when mappings are transformed in-process.
+FILE_VALIDATION_WORKERS = int(os.getenv("FILE_VALIDATION_WORKERS", "1"))
+# Tracker for `unique` template columns: "memory" (exact set), "digest" (packed 8-byte hashes, values
+# confirmed on disk) or "spill" (exact set moved to a temporary SQLite index past UNIQUENESS_SPILL_BYTES).
+UNIQUENESS_TRACKER = os.getenv("UNIQUENESS_TRACKER", "spill")
+UNIQUENESS_SPILL_BYTES = int(os.getenv("UNIQUENESS_SPILL_BYTES", str(64 * 1024 * 1024)))
+# Enforce `unique` template fields across all of a seller's successfully transformed files, not just
+# within one; values are checked against the index in batches of UNIQUE_INDEX_BATCH_SIZE.
+CROSS_FILE_UNIQUENESS = env_bool("CROSS_FILE_UNIQUENESS", True)
+UNIQUE_INDEX_BATCH_SIZE = int(os.getenv("UNIQUE_INDEX_BATCH_SIZE", "500"))
+# Rows allowed to fail validation before a transform is aborted (0 stops at the first bad row). Failing rows
+# are streamed to a `.errors.jsonl` report next to the output; the transform only succeeds with errors when
+# VALIDATION_EMIT_VALID_ROWS publishes the valid subset.
+VALIDATION_ERROR_BUDGET = int(os.getenv("VALIDATION_ERROR_BUDGET", "0"))
+VALIDATION_EMIT_VALID_ROWS = env_bool("VALIDATION_EMIT_VALID_ROWS", False)
+# Persist a row-hash manifest with each transform; a later upload of the same file name for the same
+# template and mappings re-validates only new or changed rows and copies the rest from the previous output.
+INCREMENTAL_TRANSFORM = env_bool("INCREMENTAL_TRANSFORM", True)
+# Mappings claimed per batch and how long a claim is held before it can be reaped.
+MAPPING_CLAIM_BATCH_SIZE = int(os.getenv("MAPPING_CLAIM_BATCH_SIZE", "10"))
+MAPPING_LEASE_SECONDS = int(os.getenv("MAPPING_LEASE_SECONDS", "1800"))
+# Transformation results unused for this long are evicted, and the cache is trimmed to the most recent entries.
+TRANSFORM_CACHE_TTL_SECONDS = int(os.getenv("TRANSFORM_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+TRANSFORM_CACHE_MAX_ENTRIES = int(os.getenv("TRANSFORM_CACHE_MAX_ENTRIES", "10000"))
+# Opt-in memo of validated cells: distinct values remembered per column of a compiled validator (0 disables).
+# Unique, list and cross-referenced columns are never memoized.
+VALIDATION_MEMO_SIZE = int(os.getenv("VALIDATION_MEMO_SIZE", "0"))
+# Built template validators kept per process (least recently used are dropped first).
+VALIDATOR_CACHE_MAX_ENTRIES = int(os.getenv("VALIDATOR_CACHE_MAX_ENTRIES", "128"))
+# Store uploads and answer 202 immediately; headers/sample rows/row count are filled in by the worker.
+SELLER_FILE_ASYNC_INGESTION = env_bool("SELLER_FILE_ASYNC_INGESTION", False)
+SELLER_FILE_INGESTION_BATCH_SIZE = int(os.getenv("SELLER_FILE_INGESTION_BATCH_SIZE", "10"))
+SELLER_FILE_INGESTION_LEASE_SECONDS = int(os.getenv("SELLER_FILE_INGESTION_LEASE_SECONDS", "600"))
+# Profiling attempts before a file that keeps failing to read (not invalid content) is marked failed.
+SELLER_FILE_INGESTION_MAX_ATTEMPTS = int(os.getenv("SELLER_FILE_INGESTION_MAX_ATTEMPTS", "3"))
+# Long-running transform worker (`manage.py transform_worker`): idle polling backs off from the
+# poll interval to the max; expired leases and stale cache entries are reaped every REAP seconds.
+TRANSFORM_WORKER_POLL_SECONDS = float(os.getenv("TRANSFORM_WORKER_POLL_SECONDS", "1"))
+TRANSFORM_WORKER_MAX_POLL_SECONDS = float(os.getenv("TRANSFORM_WORKER_MAX_POLL_SECONDS", "15"))
+TRANSFORM_WORKER_REAP_SECONDS = int(os.getenv("TRANSFORM_WORKER_REAP_SECONDS", "60"))
+# Touched between jobs; the worker is reported dead once it is older than MAPPING_LEASE_SECONDS.
+TRANSFORM_WORKER_HEARTBEAT_FILE = os.getenv(
+    "TRANSFORM_WORKER_HEARTBEAT_FILE", "/tmp/streamoid-transform-worker.heartbeat"
+)
+# Read-endpoint response cache. Local memory is per process; point RESPONSE_CACHE_LOCATION at a
+# directory shared by the web and worker processes so writes made by the worker invalidate it too.
+RESPONSE_CACHE_LOCATION = os.getenv("RESPONSE_CACHE_LOCATION", "")
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "responses": (
+        {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": RESPONSE_CACHE_LOCATION}
+        if RESPONSE_CACHE_LOCATION
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "streamoid-responses"}
+    ),
+}
+# Seconds each endpoint's responses are kept; 0 disables caching for it. Endpoints showing worker-driven
+# status (mappings, seller files) stay short. Invalidation only reaches the processes sharing the cache, so
+# without RESPONSE_CACHE_LOCATION every endpoint defaults to 0 (each gunicorn worker and the transform worker
+# would otherwise keep serving what another process has since changed).
+_RESPONSE_CACHE_SHARED_TTLS = {
+    "sellers": 60,
+    "seller_files": 10,
+    "marketplaces": 300,
+    "marketplace_templates": 300,
+    "mappings": 5,
+}
+RESPONSE_CACHE_TTLS = {
+    endpoint: int(os.getenv(f"RESPONSE_CACHE_TTL_{endpoint.upper()}", str(ttl if RESPONSE_CACHE_LOCATION else 0)))
+    for endpoint, ttl in _RESPONSE_CACHE_SHARED_TTLS.items()
+}
 
 
 class InterceptHandler(logging.Handler):
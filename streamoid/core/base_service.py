@@ -1,6 +1,14 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q, QuerySet
 from rest_framework import serializers, status
 
+from core.constants import CURSOR_ORDERING
+
 
 class BaseService(object):
     def __init__(self):
@@ -29,6 +37,10 @@ class BaseService(object):
     def get_201_response(cls, data, message="Created Successfully"):
         return cls._build_response(code=status.HTTP_201_CREATED, data=data, message=message)
 
+    @classmethod
+    def get_202_response(cls, data, message="Accepted"):
+        return cls._build_response(code=status.HTTP_202_ACCEPTED, data=data, message=message)
+
     @classmethod
     def get_204_response(cls):
         return status.HTTP_204_NO_CONTENT
@@ -66,16 +78,36 @@ class BaseService(object):
         )
 
 
+class PaginationParamsSerializer(serializers.Serializer):
+    page_number = serializers.IntegerField(min_value=1)
+    page_size = serializers.IntegerField(min_value=1)
+
+
+class CursorParamsSerializer(serializers.Serializer):
+    page_size = serializers.IntegerField(min_value=1)
+
+
 class PaginationService(BaseService):
-    def __init__(self, page_number=None, page_size=None, default_page_size=20):
+    """
+    Page numbers are the default. Passing `cursor` (an empty string for the first
+    page) switches to keyset pagination over `CURSOR_ORDERING`: each page seeks
+    past the previous `(created_at, id)` and returns `next_cursor` instead of
+    page totals, so no COUNT runs and deep pages cost the same as the first.
+    """
+
+    def __init__(self, page_number=None, page_size=None, default_page_size=20, cursor=None, fieldset=None):
         super().__init__()
         self.total_page_number = 0
+        self.total_count = 0
         self.page_number = page_number
         self.page_size = page_size
         self.default_page_size = default_page_size
+        self.cursor = cursor
+        self.fieldset = fieldset
 
     def set_total_page_number(self, number, total_count):
         self.total_page_number = number
+        self.total_count = total_count
         self.response.update({"total_page_number": number, "total_count": total_count})
 
     def _get_total_count(self, data):
@@ -112,24 +144,67 @@ class PaginationService(BaseService):
             return None, None, None
         if self.page_number is None or self.page_size is None:
             return None, None, {"pagination": "Both page_number and page_size are required."}
-        serializer = serializers.Serializer(
-            data={"page_number": self.page_number, "page_size": self.page_size},
-            fields={
-                "page_number": serializers.IntegerField(min_value=1),
-                "page_size": serializers.IntegerField(min_value=1),
-            },
+        serializer = PaginationParamsSerializer(
+            data={"page_number": self.page_number, "page_size": self.page_size}
         )
         if not serializer.is_valid():
             return None, None, serializer.errors
         return serializer.validated_data["page_number"], serializer.validated_data["page_size"], None
 
+    def _serialize(self, datalist, serializer_class, serializer_context=None):
+        serializer_kwargs = {"fieldset": self.fieldset} if self.fieldset is not None else {}
+        return serializer_class(datalist, many=True, context=serializer_context or {}, **serializer_kwargs).data
+
+    @staticmethod
+    def encode_cursor(instance):
+        position = json.dumps([instance.created_at.isoformat(), instance.pk], separators=(",", ":"))
+        return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return `(created_at, id)` for a cursor, or None when it is malformed."""
+        try:
+            created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            return None
+
+    def _cursor_response(self, data, serializer_class=None, serializer_context=None):
+        serializer = CursorParamsSerializer(data={"page_size": self.page_size or self.default_page_size})
+        if not serializer.is_valid():
+            return self.get_400_response(errors=serializer.errors)
+        if not isinstance(data, QuerySet):
+            return self.get_400_response(errors={"cursor": "Cursor pagination is not supported here."})
+        page_size = serializer.validated_data["page_size"]
+
+        queryset = data.order_by(*CURSOR_ORDERING)
+        if self.cursor:
+            position = self.decode_cursor(self.cursor)
+            if position is None:
+                return self.get_400_response(errors={"cursor": "Invalid cursor."})
+            created_at, pk = position
+            # Row-value seek `(created_at, id) < (...)`, served by the (created_at, id) indexes.
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        # One extra row tells whether another page exists without counting.
+        datalist = list(queryset[: page_size + 1])
+        next_cursor = self.encode_cursor(datalist[page_size - 1]) if len(datalist) > page_size else None
+        datalist = datalist[:page_size]
+        if serializer_class:
+            datalist = self._serialize(datalist, serializer_class, serializer_context)
+        self.set_response(data=datalist)
+        self.response.update({"next_cursor": next_cursor})
+        return self.response
+
     def _paginate(self, data, page_number, page_size):
-        data = self._coerce_to_list(data)
+        # Querysets are paginated in the database: one COUNT plus a LIMIT/OFFSET page.
+        if not isinstance(data, QuerySet):
+            data = self._coerce_to_list(data)
         paginator_object = Paginator(data, page_size)
         try:
-            datalist = paginator_object.page(page_number).object_list
+            datalist = list(paginator_object.page(page_number).object_list)
         except PageNotAnInteger:
-            datalist = paginator_object.page(1).object_list
+            datalist = list(paginator_object.page(1).object_list)
         except EmptyPage:
             datalist = []
         finally:
@@ -139,13 +214,22 @@ class PaginationService(BaseService):
     def _set_unpaginated_response(self, data, serializer_class=None, serializer_context=None):
         datalist = self._coerce_to_list(data)
         if serializer_class:
-            serializer_context = serializer_context or {}
-            datalist = serializer_class(datalist, many=True, context=serializer_context).data
+            datalist = self._serialize(datalist, serializer_class, serializer_context)
         self.set_response(data=datalist)
         total_count = self._get_total_count(datalist)
         self.set_total_page_number(0 if total_count == 0 else 1, total_count)
 
     def paginated_response(self, data=None, serializer_class=None, serializer_context=None):
+        if self.fieldset is not None and serializer_class:
+            try:
+                if isinstance(data, QuerySet):
+                    data = self.fieldset.apply(data, serializer_class)
+                else:
+                    self.fieldset.validate(serializer_class)
+            except serializers.ValidationError as exc:
+                return self.get_400_response(errors=exc.detail)
+        if self.cursor is not None:
+            return self._cursor_response(data, serializer_class, serializer_context)
         page_number, page_size, errors = self._validate_pagination()
         if errors:
             return self.get_400_response(errors=errors)
@@ -154,7 +238,7 @@ class PaginationService(BaseService):
             return self.response
         datalist = self._paginate(data, page_number, page_size)
         if serializer_class:
-            serializer_context = serializer_context or {}
-            datalist = serializer_class(datalist, many=True, context=serializer_context).data
+            datalist = self._serialize(datalist, serializer_class, serializer_context)
         self.set_response(data=datalist)
+        self.set_total_page_number(self.total_page_number, self.total_count)
         return self.response
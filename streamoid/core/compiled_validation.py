@@ -0,0 +1,273 @@
+import decimal
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import URLValidator
+from loguru import logger
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty, get_error_detail
+
+from core.constants import SURROGATE_CHARACTER_PATTERN
+from core.custom_validation import CustomValidatior, run_comparisons
+
+SURROGATE_CHARACTER_RE = re.compile(SURROGATE_CHARACTER_PATTERN)
+# Memoized outcome of a cell the field skipped.
+_SKIPPED = object()
+
+
+class MemoizedValidationError(serializers.ValidationError):
+    """Re-raise a memoized error detail without rebuilding it."""
+
+    def __init__(self, detail):
+        self.detail = detail
+
+
+class CompiledRowValidator:
+    """
+    Validate mapped rows with plain-Python closures.
+    Returns the same `validated_data`/`errors` pair a `CustomValidator`
+    serializer would, without instantiating a serializer per row.
+    """
+
+    def __init__(self, columns, comparisons):
+        self.columns = columns
+        self.comparisons = comparisons
+        self.field_names = tuple(name for name, _validate in columns)
+
+    def __call__(self, data):
+        validated_data = {}
+        errors = {}
+        for name, validate_value in self.columns:
+            try:
+                validated_data[name] = validate_value(data.get(name, empty))
+            except serializers.ValidationError as exc:
+                errors[name] = exc.detail
+            except DjangoValidationError as exc:
+                errors[name] = get_error_detail(exc)
+            except SkipField:
+                pass
+
+        if self.comparisons and run_comparisons(self.comparisons, validated_data, errors):
+            # Keep errors in field order, as the serializer reports them.
+            errors = {name: errors[name] for name in self.field_names if name in errors}
+
+        if errors:
+            return None, errors
+        return validated_data, None
+
+
+class CompiledValidator(CustomValidatior):
+    """
+    Compile a marketplace template into a `CompiledRowValidator`.
+    Fields are built exactly as for the serializer path and then turned into
+    specialized closures. Closures only accept values on their fast path; any
+    value they would reject is handed to the DRF field so errors keep the
+    same messages and codes. With `VALIDATION_MEMO_SIZE` set, independent scalar
+    columns also remember the outcome of recent distinct values.
+    """
+
+    def _compile_char(self, field: serializers.CharField):
+        allow_blank = field.allow_blank
+        max_length = field.max_length
+        min_length = field.min_length
+        url_validator = next((item for item in field.validators if isinstance(item, URLValidator)), None)
+        run_validation = field.run_validation
+
+        def validate_char(value):
+            if type(value) is not str:
+                return run_validation(value)
+            cleaned = value.strip()
+            if not cleaned:
+                return "" if allow_blank else run_validation(value)
+            if (
+                (max_length is not None and len(cleaned) > max_length)
+                or (min_length is not None and len(cleaned) < min_length)
+                or "\x00" in cleaned
+                or (not cleaned.isascii() and SURROGATE_CHARACTER_RE.search(cleaned))
+            ):
+                return run_validation(value)
+            if url_validator is not None:
+                try:
+                    url_validator(cleaned)
+                except DjangoValidationError:
+                    return run_validation(value)
+            return cleaned
+
+        return validate_char
+
+    def _compile_decimal(self, field: serializers.DecimalField):
+        allow_null = field.allow_null
+        max_digits = field.max_digits
+        decimal_places = field.decimal_places
+        max_whole_digits = field.max_whole_digits
+        min_value = field.min_value
+        max_value = field.max_value
+        max_string_length = field.MAX_STRING_LENGTH
+        run_validation = field.run_validation
+
+        quantize_exponent = None
+        quantize_context = None
+        if decimal_places is not None:
+            quantize_exponent = decimal.Decimal(".1") ** decimal_places
+            quantize_context = decimal.getcontext().copy()
+            if max_digits is not None:
+                quantize_context.prec = max_digits
+        # Plain `[+-]digits[.digits]` cells within precision are quantized by zero-padding the
+        # fraction, which builds the same Decimal (digits and exponent) as `quantize()` would.
+        plain_path = max_whole_digits is not None and decimal_places is not None
+        fraction_padding = tuple("0" * (decimal_places - places) for places in range((decimal_places or 0) + 1))
+
+        def validate_decimal(value):
+            if type(value) is not str:
+                return run_validation(value)
+            cleaned = value.strip()
+            if not cleaned:
+                return None if allow_null else run_validation(value)
+            if plain_path and cleaned.isascii():
+                unsigned = cleaned[1:] if cleaned[0] in "+-" else cleaned
+                whole, point, fraction = unsigned.partition(".")
+                if (
+                    whole.isdigit()
+                    and len(whole) <= max_whole_digits
+                    and len(fraction) <= decimal_places
+                    and (not fraction or fraction.isdigit())
+                ):
+                    padding = fraction_padding[len(fraction)]
+                    number = decimal.Decimal(f"{cleaned}{padding}" if point else f"{cleaned}.{padding}")
+                    if (min_value is not None and number < min_value) or (
+                        max_value is not None and number > max_value
+                    ):
+                        return run_validation(value)
+                    return number
+            if len(cleaned) > max_string_length:
+                return run_validation(value)
+            try:
+                number = decimal.Decimal(cleaned)
+            except decimal.DecimalException:
+                return run_validation(value)
+            if not number.is_finite():
+                return run_validation(value)
+
+            _sign, digits, exponent = number.as_tuple()
+            if exponent >= 0:
+                total_digits = whole_digits = len(digits) + exponent
+                places = 0
+            elif len(digits) > -exponent:
+                total_digits = len(digits)
+                whole_digits = total_digits + exponent
+                places = -exponent
+            else:
+                total_digits = places = -exponent
+                whole_digits = 0
+            if (
+                (max_digits is not None and total_digits > max_digits)
+                or (decimal_places is not None and places > decimal_places)
+                or (max_whole_digits is not None and whole_digits > max_whole_digits)
+            ):
+                return run_validation(value)
+
+            if quantize_exponent is not None:
+                number = number.quantize(quantize_exponent, rounding=field.rounding, context=quantize_context)
+            if (min_value is not None and number < min_value) or (max_value is not None and number > max_value):
+                return run_validation(value)
+            return number
+
+        return validate_decimal
+
+    def _compile_choice(self, field: serializers.ChoiceField):
+        choices = field.choice_strings_to_values
+        run_validation = field.run_validation
+
+        def validate_choice(value):
+            if type(value) is str and value in choices:
+                return choices[value]
+            return run_validation(value)
+
+        return validate_choice
+
+    def _compile_list(self, field: serializers.ListField):
+        allow_empty = field.allow_empty
+        validate_child = self._compile_field(field.child)
+        run_validation = field.run_validation
+
+        def validate_list(value):
+            if type(value) is not list or (not value and not allow_empty):
+                return run_validation(value)
+            try:
+                return [validate_child(item) for item in value]
+            except (serializers.ValidationError, DjangoValidationError, SkipField):
+                # Let the ListField collect per-index errors.
+                return run_validation(value)
+
+        return validate_list
+
+    @staticmethod
+    def _memoize(validate_value, max_size: int):
+        """
+        Remember the outcome (value, error detail or skip) of up to `max_size` distinct
+        strings per column, so repeated cells such as brands or colors are validated once.
+        """
+
+        @lru_cache(maxsize=max_size)
+        def outcome(value):
+            try:
+                return validate_value(value), None
+            except serializers.ValidationError as exc:
+                return None, exc.detail
+            except DjangoValidationError as exc:
+                return None, get_error_detail(exc)
+            except SkipField:
+                return _SKIPPED, None
+
+        def validate_memoized(value):
+            if type(value) is not str:
+                return validate_value(value)
+            validated, detail = outcome(value)
+            if detail is not None:
+                raise MemoizedValidationError(detail)
+            if validated is _SKIPPED:
+                raise SkipField()
+            return validated
+
+        validate_memoized.cache_info = outcome.cache_info
+        return validate_memoized
+
+    def _memoizable_fields(self) -> set:
+        """Scalar columns whose cells validate independently of other cells and rows."""
+        excluded = set(self.schema["unique_fields"]) | set(self.schema["list_fields"])
+        for reference in self.schema["references"]:
+            excluded.update((reference["field"], reference["reference"]))
+        return {spec["name"] for spec in self.schema["fields"] if spec["type"]} - excluded
+
+    def _compile_field(self, field: serializers.Field):
+        if type(field) in (serializers.CharField, serializers.URLField):
+            return self._compile_char(field)
+        if type(field) is serializers.DecimalField:
+            return self._compile_decimal(field)
+        if type(field) is serializers.ChoiceField:
+            return self._compile_choice(field)
+        if type(field) is serializers.ListField:
+            return self._compile_list(field)
+        return field.run_validation
+
+    def build(self) -> CompiledRowValidator:
+        try:
+            self.generate_attrs()
+            fields = [(name, field) for name, field in self.attrs.items() if isinstance(field, serializers.Field)]
+            fields.sort(key=lambda item: item[1]._creation_counter)
+            # Missing columns arrive as `empty`, which every closure hands to the DRF field.
+            columns = [(name, self._compile_field(field)) for name, field in fields]
+            memo_size = settings.VALIDATION_MEMO_SIZE
+            if memo_size > 0:
+                memoizable = self._memoizable_fields()
+                columns = [
+                    (name, self._memoize(validate_value, memo_size) if name in memoizable else validate_value)
+                    for name, validate_value in columns
+                ]
+            columns = tuple(columns)
+            return CompiledRowValidator(columns, tuple(self.comparisons))
+        except Exception as e:
+            logger.warning(f"Failed to build compiled validator | Error: {e}")
+            return None
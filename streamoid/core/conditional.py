@@ -0,0 +1,56 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+DEFAULT_VERSION_FIELDS = ("updated_at",)
+
+
+def queryset_version(queryset, version_fields=DEFAULT_VERSION_FIELDS):
+    """
+    Return `(count, last_modified)` for `queryset` in one aggregate query.
+    `last_modified` is the newest of `version_fields`, which may span relations
+    (e.g. `seller_file__updated_at`) when nested objects are serialized too.
+    """
+    aggregates = {f"version_{index}": Max(field) for index, field in enumerate(version_fields)}
+    result = queryset.order_by().aggregate(row_count=Count("pk"), **aggregates)
+    versions = [result[name] for name in aggregates if result[name] is not None]
+    return result["row_count"], max(versions, default=None)
+
+
+def conditional_get(get_queryset, version_fields=DEFAULT_VERSION_FIELDS):
+    """
+    Decorate an `APIView.get` so ETag/Last-Modified come from the data's version
+    rather than the rendered body. `get_queryset(request, **kwargs)` returns the
+    rows the view would render (or None to skip); a matching `If-None-Match` or
+    `If-Modified-Since` answers 304 before the view queries or serializes anything.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            queryset = get_queryset(request, **kwargs)
+            if queryset is None:
+                return view_method(view, request, *args, **kwargs)
+
+            row_count, last_modified = queryset_version(queryset, version_fields)
+            # Counting catches deletes; the full path keeps pages and field selections apart.
+            fingerprint = f"{request.get_full_path()}|{row_count}|{last_modified and last_modified.isoformat()}"
+            etag = f'W/"{hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()}"'
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view_method(view, request, *args, **kwargs)
+            if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+                response.headers.setdefault("ETag", etag)
+                if timestamp is not None:
+                    response.headers.setdefault("Last-Modified", http_date(timestamp))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -12,3 +12,28 @@ HEAD_DATA = {
 KEY_TOKEN_PATTERN = r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])"
 # Splits on whitespace, underscores, and hyphens.
 KEY_SPLIT_PATTERN = r"[\s_-]+"
+# Matches UTF-16 surrogate code points, which DRF string fields reject.
+SURROGATE_CHARACTER_PATTERN = r"[\ud800-\udfff]"
+
+# Row validation engines used by FileValidator.
+VALIDATION_ENGINE_COMPILED = "compiled"
+VALIDATION_ENGINE_DRF = "drf"
+
+# Multipart part size for streamed MinIO uploads (MinIO's minimum part size).
+MINIO_UPLOAD_PART_SIZE = 5 * 1024 * 1024  # 5MB
+# Chunks buffered between a streaming writer and its upload thread.
+MINIO_UPLOAD_QUEUE_CHUNKS = 16
+
+# Rows per chunk when a file is validated in parallel.
+VALIDATION_CHUNK_SIZE = 2000
+
+# How FileValidator remembers the values of `unique` columns (see `core.uniqueness`).
+UNIQUENESS_TRACKER_MEMORY = "memory"
+UNIQUENESS_TRACKER_DIGEST = "digest"
+UNIQUENESS_TRACKER_SPILL = "spill"
+
+# Seek order for cursor pagination; `created_at` alone is not unique, so `id` breaks ties.
+CURSOR_ORDERING = ("-created_at", "-id")
+
+# Django cache alias holding read-endpoint responses (see `core.response_cache`).
+RESPONSE_CACHE_ALIAS = "responses"
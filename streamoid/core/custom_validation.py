@@ -1,9 +1,21 @@
 import operator
+from collections.abc import Mapping
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from loguru import logger
 from rest_framework import serializers
-
-from core.helpers import ValidationHelpers
+from rest_framework.fields import SkipField, get_error_detail
+
+from core.template_schema import (
+    FIELD_TYPE_ARRAY,
+    FIELD_TYPE_ENUM,
+    FIELD_TYPE_NUMBER,
+    FIELD_TYPE_STRING,
+    FIELD_TYPE_URL,
+    REFERENCE_MEASURE_LENGTH,
+    get_template_schema,
+)
+from core.validator_cache import validator_cache
 from marketplace.models import MarketplaceTempate
 
 """
@@ -27,162 +39,188 @@ from marketplace.models import MarketplaceTempate
 """
 
 
+def _length_bound(compared_value):
+    # A length is bounded by a referenced string's length or by a referenced number itself.
+    return len(compared_value) if isinstance(compared_value, str) else compared_value
+
+
+def length_at_least(value, compared_value) -> bool:
+    return len(value) >= _length_bound(compared_value)
+
+
+def length_at_most(value, compared_value) -> bool:
+    return len(value) <= _length_bound(compared_value)
+
+
+def run_comparisons(comparisons, validated_data: dict, errors: dict) -> list:
+    """
+    Apply `(name, compared_arg, comparison_function, raised_error)` comparisons in order
+    to already-validated values. A failing field gets an error and is removed from
+    `validated_data`, so later comparisons against it are skipped. Returns the failed names.
+    """
+    failed = []
+    for name, compared_arg, comparison_function, raised_error in comparisons:
+        if name not in validated_data or compared_arg not in validated_data:
+            continue
+        value = validated_data[name]
+        compared_value = validated_data[compared_arg]
+        # Optional fields validate to None (or "" for strings); there is nothing to compare against.
+        if value in (None, "") or compared_value in (None, ""):
+            continue
+        if not comparison_function(value, compared_value):
+            errors[name] = serializers.ValidationError(raised_error).detail
+            del validated_data[name]
+            failed.append(name)
+    return failed
+
+
+class CrossFieldSerializer(serializers.Serializer):
+    """
+    Base for generated serializers. Every cell is parsed once by its field and the
+    `$field` comparisons then run on the parsed values, in dependency order.
+    """
+
+    comparisons = ()
+
+    def to_internal_value(self, data):
+        if not isinstance(data, Mapping):
+            return super().to_internal_value(data)
+        validated_data = {}
+        errors = {}
+        for field in self._writable_fields:
+            try:
+                validated_data[field.field_name] = field.run_validation(field.get_value(data))
+            except serializers.ValidationError as exc:
+                errors[field.field_name] = exc.detail
+            except DjangoValidationError as exc:
+                errors[field.field_name] = get_error_detail(exc)
+            except SkipField:
+                pass
+        if run_comparisons(self.comparisons, validated_data, errors):
+            # Keep errors in field order.
+            errors = {name: errors[name] for name in self.fields if name in errors}
+        if errors:
+            raise serializers.ValidationError(errors)
+        return validated_data
+
+
 class CustomValidatior:
     """
     Generate a custom Django serializer from a marketplace template.
-    The builder walks the template key/value rules and constructs serializer
+    The builder walks the canonical template schema and constructs serializer
     fields with validation cases based on the provided rules.
     """
 
     def __init__(self, *args, **kwargs):
         self.marketplace_template: MarketplaceTempate = kwargs.get("template")
         self.attrs = {}
-
-    FIELD_TYPE_STRING = frozenset({"string", "str"})
-    FIELD_TYPE_NUMBER = frozenset({"number", "float", "int", "integer"})
-    FIELD_TYPE_ENUM = frozenset({"enum", "choice", "choices"})
-    FIELD_TYPE_ARRAY = frozenset({"array", "list"})
-    FIELD_TYPE_URL = frozenset({"url", "uri"})
-    INTERNAL_VALUE_COMPARISON = "internal_args_comparison"
-    VALIDATE_ARGS_FUNCTION = "validate_{arg_name}"
-
-    FIELD_HANDLER_MAP = (
-        (FIELD_TYPE_STRING, "handle_string"),
-        (FIELD_TYPE_NUMBER, "handle_number"),
-        (FIELD_TYPE_ENUM, "handle_enum"),
-        (FIELD_TYPE_ARRAY, "handle_list"),
-        (FIELD_TYPE_URL, "handle_url"),
-    )
-
-    def custom_validate_function_builder(self, function_type, **kwargs):
-        if function_type == self.INTERNAL_VALUE_COMPARISON:
-            arg_name = kwargs.get("arg_name")
-            comparison_function = kwargs.get("comparison_function")
-            compared_arg = kwargs.get("comparison_arg")
-            raised_error = kwargs.get("raised_error") or f"{arg_name} failed validation."
-            function_name = self.VALIDATE_ARGS_FUNCTION.format(arg_name=arg_name)
-
-            def internal_comparison_validation(self, value):
-                try:
-                    compared_arg_raw = self.initial_data.get(compared_arg)
-                    compared_field = self.fields.get(compared_arg)
-                    compared_arg_value = compared_field.run_validation(compared_arg_raw)
-                except serializers.ValidationError:
-                    return value
-                if not comparison_function(value, compared_arg_value):
-                    raise serializers.ValidationError(raised_error)
-                return value
-
-            self.attrs[function_name] = internal_comparison_validation
-            return
-
-    def _extract_reference_field(self, value):
-        if isinstance(value, str) and value.startswith("$") and len(value) > 1:
-            return value[1:]
-        return None
-
-    def handle_string(self, name: str, rules: dict):
-        required = rules.get("required")
-        required = ValidationHelpers.evaluate_boolean(required, False)
-
+        self.comparisons = []
+        self.schema = None
+
+    REFERENCE_COMPARISONS = {
+        "min": (operator.ge, "{name} must be greater than or equal to {reference}."),
+        "max": (operator.le, "{name} must be less than or equal to {reference}."),
+    }
+    REFERENCE_LENGTH_COMPARISONS = {
+        "min": (length_at_least, "{name} must be at least as long as {reference}."),
+        "max": (length_at_most, "{name} must be no longer than {reference}."),
+    }
+
+    FIELD_HANDLER_MAP = {
+        FIELD_TYPE_STRING: "handle_string",
+        FIELD_TYPE_NUMBER: "handle_number",
+        FIELD_TYPE_ENUM: "handle_enum",
+        FIELD_TYPE_ARRAY: "handle_list",
+        FIELD_TYPE_URL: "handle_url",
+    }
+
+    def handle_string(self, spec: dict):
+        required = spec["required"]
         field = serializers.CharField(
             required=required,
-            max_length=ValidationHelpers.get_variant_value(rules, "max", "length"),
-            min_length=ValidationHelpers.get_variant_value(rules, "min", "length"),
+            max_length=spec["max_length"],
+            min_length=spec["min_length"],
             allow_blank=not required,
         )
-        self.attrs[name] = field
-
-    def handle_number(self, name: str, rules: dict):
-        required = rules.get("required")
-        required = ValidationHelpers.evaluate_boolean(required, False)
-
-        min_value = ValidationHelpers.get_variant_value(rules, "min", "value")
-        max_value = ValidationHelpers.get_variant_value(rules, "max", "value")
-        min_reference = self._extract_reference_field(min_value)
-        max_reference = self._extract_reference_field(max_value)
-        if min_reference:
-            self.custom_validate_function_builder(
-                self.INTERNAL_VALUE_COMPARISON,
-                arg_name=name,
-                comparison_arg=min_reference,
-                comparison_function=operator.ge,
-                raised_error=f"{name} must be greater than or equal to {min_reference}.",
-            )
-            min_value = None
-
-        if max_reference:
-            self.custom_validate_function_builder(
-                self.INTERNAL_VALUE_COMPARISON,
-                arg_name=name,
-                comparison_arg=max_reference,
-                comparison_function=operator.le,
-                raised_error=f"{name} must be less than or equal to {max_reference}.",
-            )
-            max_value = None
-
-        max_digits = rules.get("max_digits") or rules.get("maxDigits") or 12
-        decimal_places = rules.get("decimal_places") or rules.get("decimalPlaces") or 2
+        self.attrs[spec["name"]] = field
 
+    def handle_number(self, spec: dict):
+        required = spec["required"]
         field = serializers.DecimalField(
             required=required,
             allow_null=not required,
-            min_value=min_value,
-            max_value=max_value,
-            max_digits=max_digits,
-            decimal_places=decimal_places,
+            min_value=spec["min_value"],
+            max_value=spec["max_value"],
+            max_digits=spec["max_digits"],
+            decimal_places=spec["decimal_places"],
         )
-        self.attrs[name] = field
-
-    def handle_enum(self, name: str, rules: dict):
-        required = rules.get("required")
-        required = ValidationHelpers.evaluate_boolean(required, False)
-        choices = rules.get("choices") or []
-        field = serializers.ChoiceField(required=required, choices=choices)
-        self.attrs[name] = field
-
-    def handle_list(self, name: str, rules: dict):
-        required = rules.get("required")
-        required = ValidationHelpers.evaluate_boolean(required, False)
-        items = rules.get("items") or {}
-        child = self._build_list_child(items)
+        self.attrs[spec["name"]] = field
+
+    def handle_enum(self, spec: dict):
+        field = serializers.ChoiceField(required=spec["required"], choices=spec["choices"])
+        self.attrs[spec["name"]] = field
+
+    def handle_list(self, spec: dict):
+        required = spec["required"]
         field = serializers.ListField(
             required=required,
             allow_empty=not required,
-            child=child,
+            child=self._build_list_child(spec["items"]),
         )
-        self.attrs[name] = field
+        self.attrs[spec["name"]] = field
 
-    def handle_url(self, name: str, rules: dict):
-        required = rules.get("required")
-        required = ValidationHelpers.evaluate_boolean(required, False)
+    def handle_url(self, spec: dict):
+        required = spec["required"]
         field = serializers.URLField(required=required, allow_null=not required)
-        self.attrs[name] = field
+        self.attrs[spec["name"]] = field
 
-    def generate_field(self, name: str, rules: dict):
-        field_type = (rules.get("type") or "").lower()
-        for field_types, handler_name in self.FIELD_HANDLER_MAP:
-            if field_type in field_types:
-                getattr(self, handler_name)(name, rules)
+    def generate_field(self, spec: dict):
+        handler_name = self.FIELD_HANDLER_MAP.get(spec["type"])
+        if handler_name:
+            getattr(self, handler_name)(spec)
 
-    def _build_list_child(self, rules: dict):
-        field_type = (rules.get("type") or "").lower()
-        if field_type in self.FIELD_TYPE_STRING:
+    def _build_list_child(self, items: dict):
+        item_type = items["type"]
+        if item_type == FIELD_TYPE_STRING:
             return serializers.CharField()
-        if field_type in self.FIELD_TYPE_NUMBER:
+        if item_type == FIELD_TYPE_NUMBER:
             return serializers.DecimalField()
-        if field_type in self.FIELD_TYPE_ENUM:
-            return serializers.ChoiceField(choices=rules.get("choices") or [])
-        if field_type in self.FIELD_TYPE_URL:
+        if item_type == FIELD_TYPE_ENUM:
+            return serializers.ChoiceField(choices=items["choices"])
+        if item_type == FIELD_TYPE_URL:
             return serializers.URLField()
         return serializers.JSONField()
 
+    def generate_attrs(self) -> dict:
+        schema = self.schema = get_template_schema(self.marketplace_template)
+        for spec in schema["fields"]:
+            self.generate_field(spec)
+        for reference in schema["references"]:
+            self.add_comparison(reference)
+        return self.attrs
+
+    def add_comparison(self, reference: dict):
+        name, compared_arg = reference["field"], reference["reference"]
+        comparisons = (
+            self.REFERENCE_LENGTH_COMPARISONS
+            if reference["measure"] == REFERENCE_MEASURE_LENGTH
+            else self.REFERENCE_COMPARISONS
+        )
+        comparison_function, raised_error = comparisons[reference["bound"]]
+        self.comparisons.append(
+            (name, compared_arg, comparison_function, raised_error.format(name=name, reference=compared_arg))
+        )
+
+    @classmethod
+    def cached(cls, marketplace_template):
+        """Build through the process-wide validator cache; see `ValidatorCache`."""
+        return validator_cache.get_or_build(cls, marketplace_template)
+
     def build(self) -> serializers.Serializer:
-        template = self.marketplace_template.template
         try:
-            for name, rules in template.items():
-                self.generate_field(name, rules)
-            return type("CustomValidator", (serializers.Serializer,), self.attrs)
+            self.generate_attrs()
+            attrs = {**self.attrs, "comparisons": tuple(self.comparisons)}
+            return type("CustomValidator", (CrossFieldSerializer,), attrs)
         except Exception as e:
             logger.warning(f"Failed to build custom validator | Error: {e}")
             return None
@@ -0,0 +1,118 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.serializers import BaseSerializer, ValidationError
+
+
+class SparseFieldset:
+    """
+    Field selection requested through the `fields` and `expand` query params.
+
+    `fields=id,seller_file.name` keeps only the listed fields; dotted paths select
+    inside nested objects. Once either param is given, nested objects that are not
+    expanded (via `expand=seller_file` or a dotted path) are rendered as their
+    primary key. `apply` pushes the same selection down to the queryset with
+    `only()`/`select_related()`, so skipped JSON columns are never read.
+    """
+
+    def __init__(self):
+        self.only = None
+        self.expanded = {}
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        fields = query_params.get("fields")
+        expand = query_params.get("expand")
+        if not fields and not expand:
+            return None
+        fieldset = cls()
+        if fields:
+            fieldset.only = set()
+            for path in cls._split(fields):
+                fieldset._add(path, select=True)
+        for path in cls._split(expand):
+            fieldset._add(path, select=False)
+        return fieldset
+
+    @staticmethod
+    def _split(value):
+        return [path.split(".") for path in (value or "").split(",") if path.strip()]
+
+    def _add(self, parts, select):
+        name, rest = parts[0].strip(), parts[1:]
+        if self.only is not None:
+            # Expanding a field also selects it.
+            self.only.add(name)
+        if rest or not select:
+            child = self.expanded.get(name)
+            if child is None:
+                child = self.expanded[name] = SparseFieldset()
+                if select:
+                    child.only = set()
+            if rest:
+                child._add(rest, select)
+
+    def prune(self, fields):
+        """Filter a serializer's `get_fields()` result, collapsing unexpanded nested serializers."""
+        if self.only is not None:
+            unknown = self.only - set(fields)
+            if unknown:
+                raise ValidationError({"fields": f"Unknown field(s): {', '.join(sorted(unknown))}."})
+        unknown = set(self.expanded) - {
+            name for name, field in fields.items() if isinstance(field, BaseSerializer)
+        }
+        if unknown:
+            raise ValidationError({"expand": f"Cannot expand: {', '.join(sorted(unknown))}."})
+
+        pruned = {}
+        for name, field in fields.items():
+            if self.only is not None and name not in self.only:
+                continue
+            if isinstance(field, BaseSerializer):
+                if name in self.expanded:
+                    field = type(field)(*field._args, **{**field._kwargs, "fieldset": self.expanded[name]})
+                else:
+                    # Read from the `<name>_id` column, so the related row is neither joined nor fetched.
+                    field = PrimaryKeyRelatedField(read_only=True, source=field._kwargs.get("source"))
+            pruned[name] = field
+        return pruned
+
+    def validate(self, serializer_class):
+        """Build the pruned serializer, raising `ValidationError` for unknown field names."""
+        serializer = serializer_class(fieldset=self)
+        serializer.fields
+        return serializer
+
+    def apply(self, queryset, serializer_class):
+        """Restrict `queryset` to the columns and joins the pruned serializer reads."""
+        serializer = self.validate(serializer_class)
+        only, related = self._columns(serializer, queryset.model)
+        queryset = queryset.select_related(None)
+        if related:
+            # `select_related()` with no arguments would follow every foreign key.
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
+
+    @classmethod
+    def _columns(cls, serializer, model, prefix=""):
+        # Pagination orders and builds cursors from these, so they are never deferred.
+        only = [f"{prefix}{model._meta.pk.name}"]
+        if any(field.name == "created_at" for field in model._meta.concrete_fields):
+            only.append(f"{prefix}created_at")
+        related = []
+        for field in serializer.fields.values():
+            source = field.source
+            if source == "*" or "." in source:
+                continue
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            only.append(f"{prefix}{source}")
+            if isinstance(field, BaseSerializer):
+                related.append(f"{prefix}{source}")
+                nested_only, nested_related = cls._columns(
+                    field, model_field.related_model, prefix=f"{prefix}{source}__"
+                )
+                only.extend(nested_only)
+                related.extend(nested_related)
+        return only, related
@@ -1,15 +1,104 @@
+from collections import deque
+from itertools import islice
+from multiprocessing import current_process
+
+from loguru import logger
 from rest_framework import serializers
 
+from core.compiled_validation import CompiledValidator
+from core.constants import VALIDATION_CHUNK_SIZE, VALIDATION_ENGINE_COMPILED, VALIDATION_ENGINE_DRF
 from core.custom_validation import CustomValidatior
-from core.helpers import ValidationHelpers
+from core.process_pool import process_pool
+from core.template_schema import TemplateSchemaError, get_template_schema
+from core.uniqueness import build_uniqueness_tracker, encode_unique_value
+
+log = logger.bind(component="file_validation")
+
+# Per-process state for chunk workers, built once by `_init_chunk_worker`.
+_chunk_worker = {}
+
+
+def _init_chunk_worker(file_validator):
+    row_validator = file_validator._build_row_validator()
+    _chunk_worker.update(
+        file_validator=file_validator,
+        row_validator=row_validator,
+        list_fields=file_validator._list_fields(),
+        header_map=file_validator._build_header_map(),
+        collect_errors=file_validator.error_budget > 0,
+    )
+
+
+def _validate_chunk(rows):
+    """Validate rows in order: `[(validated_data, errors), ...]`, stopping at the first invalid row unless collecting."""
+    file_validator = _chunk_worker["file_validator"]
+    row_validator = _chunk_worker["row_validator"]
+    if not row_validator:
+        raise serializers.ValidationError("Invalid template schema.")
+    list_fields = _chunk_worker["list_fields"]
+    header_map = _chunk_worker["header_map"]
+    collect_errors = _chunk_worker["collect_errors"]
+    results = []
+    for row in rows:
+        row_data = file_validator._map_row_values(header_map, row, list_fields)
+        validated_data, errors = row_validator(row_data)
+        results.append((validated_data, errors))
+        if errors and not collect_errors:
+            break
+    return results
 
 
 class FileValidator:
-    def __init__(self, marketplace_template, mappings, headers, rows):
+    def __init__(
+        self,
+        marketplace_template,
+        mappings,
+        headers,
+        rows,
+        engine=VALIDATION_ENGINE_COMPILED,
+        workers=1,
+        chunk_size=VALIDATION_CHUNK_SIZE,
+        unique_index=None,
+        error_budget=0,
+        on_error=None,
+        row_manifest=None,
+    ):
         self.marketplace_template = marketplace_template
         self.mappings = mappings
         self.headers = headers
         self.rows = rows
+        self.engine = engine
+        self.workers = workers
+        self.chunk_size = chunk_size
+        # Optional cross-file check (`add`/`is_full`/`flush`), e.g. `UniqueValueIndexService`.
+        self.unique_index = unique_index
+        self.error_budget = error_budget
+        self.on_error = on_error
+        self.error_count = 0
+        # Optional reuse of unchanged rows (`row_key`/`lookup`/`record`), e.g. `RowManifestService`.
+        self.row_manifest = row_manifest
+
+    @staticmethod
+    def _serializer_row_validator(serializer_class):
+        def validate_row(row_data):
+            serializer = serializer_class(data=row_data)
+            if not serializer.is_valid():
+                return None, serializer.errors
+            return serializer.validated_data, None
+
+        return validate_row
+
+    def _build_row_validator(self):
+        """Return a callable mapping row data to a `(validated_data, errors)` pair."""
+        if self.engine == VALIDATION_ENGINE_COMPILED:
+            return CompiledValidator.cached(self.marketplace_template)
+        if self.engine == VALIDATION_ENGINE_DRF:
+            # Reference implementation: one DRF serializer per row.
+            serializer_class = CustomValidatior.cached(self.marketplace_template)
+            if not serializer_class:
+                return None
+            return self._serializer_row_validator(serializer_class)
+        raise ValueError(f"Unsupported validation engine: {self.engine}")
 
     def _build_header_map(self):
         seller_to_marketplace = {}
@@ -22,20 +111,21 @@ class FileValidator:
                 seller_to_marketplace[seller_key] = marketplace_key
         return [seller_to_marketplace.get(header) for header in (self.headers or [])]
 
-    def _is_list_field(self, marketplace_key, template_rules):
-        rules = template_rules.get(marketplace_key) or {}
-        field_type = (rules.get("type") or "").lower()
-        return field_type in CustomValidatior.FIELD_TYPE_ARRAY
+    def _list_fields(self):
+        return frozenset(get_template_schema(self.marketplace_template)["list_fields"])
+
+    def _build_unique_trackers(self):
+        return {
+            key: build_uniqueness_tracker()
+            for key in get_template_schema(self.marketplace_template)["unique_fields"]
+        }
 
-    def _build_unique_sets(self, template_rules):
-        unique_sets = {}
-        for key, rules in template_rules.items():
-            unique_value = ValidationHelpers.get_variant_value(rules, "unique", default=False)
-            if ValidationHelpers.evaluate_boolean(unique_value, False):
-                unique_sets[key] = set()
-        return unique_sets
+    @staticmethod
+    def _close_unique_trackers(unique_trackers):
+        for tracker in unique_trackers.values():
+            tracker.close()
 
-    def _map_row_values(self, header_map, row, template_rules):
+    def _map_row_values(self, header_map, row, list_fields):
         data = {}
         for index, marketplace_key in enumerate(header_map):
             if not marketplace_key:
@@ -43,7 +133,7 @@ class FileValidator:
             if index >= len(row):
                 continue
             value = row[index]
-            if self._is_list_field(marketplace_key, template_rules):
+            if marketplace_key in list_fields:
                 if value in (None, ""):
                     continue
                 data.setdefault(marketplace_key, []).append(value)
@@ -51,43 +141,200 @@ class FileValidator:
                 data[marketplace_key] = value
         return data
 
-    def _validate_unique_values(self, row_index, data, unique_sets):
-        for key, seen in unique_sets.items():
+    @staticmethod
+    def _unique_values(data, unique_trackers):
+        """Encode the row's values of each unique field; reused rows carry these instead of typed values."""
+        unique_values = {}
+        for key in unique_trackers:
             if key not in data:
                 continue
             value = data[key]
-            values = value if isinstance(value, list) else [value]
+            unique_values[key] = [
+                encode_unique_value(item) for item in (value if isinstance(value, list) else [value])
+            ]
+        return unique_values
+
+    def _unique_error(self, row_index, unique_values, unique_trackers):
+        """Return the row's duplicate-value error, or stage its values for the cross-file check."""
+        for key, values in unique_values.items():
+            tracker = unique_trackers[key]
             for item in values:
-                if item in seen:
-                    raise serializers.ValidationError(
-                        {"row": row_index, "field": key, "error": "Duplicate value for unique field."}
-                    )
-                seen.add(item)
+                if not tracker.add(item):
+                    return {"row": row_index, "field": key, "error": "Duplicate value for unique field."}
+        if self.unique_index is not None:
+            for key, values in unique_values.items():
+                for item in values:
+                    self.unique_index.add(row_index, key, item)
+        return None
+
+    def _record(self, row_key, unique_values):
+        if self.row_manifest is not None:
+            self.row_manifest.record(row_key, unique_values)
+
+    def _reject(self, error):
+        """Raise a row error, or report it and carry on while the error budget lasts."""
+        if self.error_budget <= 0:
+            raise serializers.ValidationError(error)
+        self.error_count += 1
+        if self.on_error is not None:
+            self.on_error(error)
+        if self.error_count > self.error_budget:
+            raise serializers.ValidationError(
+                {"row": error["row"], "error": f"More than {self.error_budget} rows failed validation."}
+            )
+
+    def _release(self, pending):
+        """Yield rows held for the cross-file check once their batch has been checked."""
+        rejected = set()
+        for error in self.unique_index.flush():
+            rejected.add(error["row"])
+            self._reject(error)
+        while pending:
+            row_index, row_key, validated_data, unique_values = pending.popleft()
+            if row_index not in rejected:
+                self._record(row_key, unique_values)
+                yield validated_data
 
     def validate(self):
         return list(self.iter_validated_rows())
 
     def iter_validated_rows(self):
-        serializer_class = CustomValidatior(template=self.marketplace_template).build()
-        if not serializer_class:
-            raise serializers.ValidationError("Invalid template schema.")
+        """
+        Yield validated rows in file order. By default the first invalid or duplicate
+        row raises; with an `error_budget`, failing rows are passed to `on_error` and
+        skipped until more than `error_budget` rows have failed.
+        """
+        try:
+            # Cheap for saved templates; the row validator itself is only built where rows are validated.
+            get_template_schema(self.marketplace_template)
+        except TemplateSchemaError as e:
+            raise serializers.ValidationError("Invalid template schema.") from e
 
-        template_rules = self.marketplace_template.template or {}
-        header_map = self._build_header_map()
-        unique_sets = self._build_unique_sets(template_rules)
+        # Reused rows make chunks uneven; with a manifest only changed rows are validated, sequentially.
+        if self.workers > 1 and not current_process().daemon and self.row_manifest is None:
+            results = self._iter_chunk_results()
+        else:
+            if self.workers > 1:
+                # Pool workers (e.g. the transformer cron) are daemonic and cannot start their own pool.
+                log.debug("Validating sequentially inside a daemonic worker process")
+            row_validator = self._build_row_validator()
+            if not row_validator:
+                raise serializers.ValidationError("Invalid template schema.")
+            results = self._iter_row_results(row_validator)
+        unique_trackers = self._build_unique_trackers()
+        # With a cross-file index, rows are held back until their batch has been checked against it.
+        pending = deque()
+        try:
+            for row_index, row_key, validated_data, errors, unique_values in results:
+                if errors:
+                    error = {"row": row_index, "errors": errors}
+                else:
+                    if unique_values is None:
+                        unique_values = self._unique_values(validated_data, unique_trackers)
+                    error = self._unique_error(row_index, unique_values, unique_trackers)
+                if error is not None:
+                    if self.error_budget <= 0 and self.unique_index is not None:
+                        # Earlier rows still waiting for the cross-file check may fail first.
+                        yield from self._release(pending)
+                    self._reject(error)
+                    continue
+                if self.unique_index is None:
+                    self._record(row_key, unique_values)
+                    yield validated_data
+                    continue
+                pending.append((row_index, row_key, validated_data, unique_values))
+                if self.unique_index.is_full():
+                    yield from self._release(pending)
+            if self.unique_index is not None:
+                yield from self._release(pending)
+        finally:
+            results.close()
+            self._close_unique_trackers(unique_trackers)
 
+    def _iter_row_results(self, row_validator):
+        list_fields = self._list_fields()
+        header_map = self._build_header_map()
+        row_manifest = self.row_manifest
+        row_key = None
         for row_index, row in enumerate(self.rows):
-            row_data = self._map_row_values(header_map, row, template_rules)
-            serializer = serializer_class(data=row_data)
-            if not serializer.is_valid():
-                raise serializers.ValidationError({"row": row_index, "errors": serializer.errors})
-            self._validate_unique_values(row_index, serializer.validated_data, unique_sets)
-            yield serializer.validated_data
+            row_data = self._map_row_values(header_map, row, list_fields)
+            if row_manifest is not None:
+                row_key = row_manifest.row_key(row_data)
+                reused = row_manifest.lookup(row_key)
+                if reused is not None:
+                    # Unchanged since the previous transform: only its unique values are checked again.
+                    yield row_index, row_key, reused.data, None, reused.unique_values
+                    continue
+            validated_data, errors = row_validator(row_data)
+            yield row_index, row_key, validated_data, errors, None
+
+    def _iter_row_chunks(self):
+        rows = iter(self.rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield chunk
+
+    def _iter_chunk_results(self):
+        """
+        Validate ordered chunks in a process pool and merge the results back in order.
+        Workers compile the template once; unless errors are collected they stop each
+        chunk at its first invalid row. Unique values are checked by the caller as
+        results are merged, so duplicates across chunks and the first reported row
+        match the sequential path.
+        """
+        # Rows stay in the parent; workers only need the template, mappings and headers.
+        worker_state = FileValidator(
+            self.marketplace_template,
+            self.mappings,
+            self.headers,
+            None,
+            engine=self.engine,
+            error_budget=self.error_budget,
+        )
+        chunks = self._iter_row_chunks()
+        executor = process_pool(self.workers, "core.file_validation._init_chunk_worker", (worker_state,))
+        try:
+            # Keep a bounded window of chunks in flight so large files are never fully buffered.
+            in_flight = deque()
+            for chunk in islice(chunks, self.workers * 2):
+                in_flight.append(executor.submit(_validate_chunk, chunk))
+            row_index = 0
+            while in_flight:
+                results = in_flight.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    in_flight.append(executor.submit(_validate_chunk, next_chunk))
+                for validated_data, errors in results:
+                    yield row_index, None, validated_data, errors, None
+                    row_index += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
 
-def validate_file(marketplace_template, mappings, headers, rows):
-    return FileValidator(marketplace_template, mappings, headers, rows).validate()
+def validate_file(marketplace_template, mappings, headers, rows, engine=VALIDATION_ENGINE_COMPILED, workers=1):
+    return FileValidator(marketplace_template, mappings, headers, rows, engine=engine, workers=workers).validate()
 
 
-def validate_file_iter(marketplace_template, mappings, headers, rows):
-    return FileValidator(marketplace_template, mappings, headers, rows).iter_validated_rows()
+def validate_file_iter(
+    marketplace_template,
+    mappings,
+    headers,
+    rows,
+    engine=VALIDATION_ENGINE_COMPILED,
+    workers=1,
+    unique_index=None,
+    error_budget=0,
+    on_error=None,
+    row_manifest=None,
+):
+    return FileValidator(
+        marketplace_template,
+        mappings,
+        headers,
+        rows,
+        engine=engine,
+        workers=workers,
+        unique_index=unique_index,
+        error_budget=error_budget,
+        on_error=on_error,
+        row_manifest=row_manifest,
+    ).iter_validated_rows()
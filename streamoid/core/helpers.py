@@ -1,10 +1,19 @@
+import os
 import re
+import socket
+import uuid
+from functools import lru_cache
 
 from rest_framework import serializers
 
 from core.constants import KEY_SPLIT_PATTERN, KEY_TOKEN_PATTERN
 
 
+def generate_lease_owner() -> str:
+    """Identify a background worker process in lease columns (host:pid:random)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
 class ValidationHelpers:
     """Utility helpers for normalizing keys and validating values."""
 
@@ -34,11 +43,17 @@ class ValidationHelpers:
     @classmethod
     def key_variants(cls, *parts, include_short=True):
         """Build common key variants (snake, camel, compact, optional short)."""
+        return set(cls._key_variants(parts, include_short))
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _key_variants(cls, parts, include_short):
+        # Rule names come from a small vocabulary, so the regex tokenizing is memoized.
         tokens = []
         for part in parts:
             tokens.extend(cls._split_key_tokens(part))
         if not tokens:
-            return set()
+            return frozenset()
 
         snake = "_".join(tokens)
         camel = tokens[0] + "".join(token.title() for token in tokens[1:])
@@ -47,12 +62,12 @@ class ValidationHelpers:
         variants = {snake, camel, compact}
         if include_short and len(tokens) > 1:
             variants.add(tokens[0])
-        return variants
+        return frozenset(variants)
 
     @classmethod
     def get_variant_value(cls, mapping, *parts, default=None, include_short=True):
         """Return the first matching variant value from a mapping."""
-        for key in cls.key_variants(*parts, include_short=include_short):
+        for key in cls._key_variants(parts, include_short):
             if key in mapping:
                 return mapping[key]
         return default
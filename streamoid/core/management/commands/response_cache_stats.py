@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.response_cache import ResponseCache
+
+
+class Command(BaseCommand):
+    help = "Print read-endpoint response cache hits and misses per endpoint."
+
+    def handle(self, *args, **options):
+        for endpoint, counters in ResponseCache.stats().items():
+            total = counters["hits"] + counters["misses"]
+            hit_rate = counters["hits"] / total if total else 0
+            self.stdout.write(
+                f"{endpoint}: hits={counters['hits']} misses={counters['misses']} hit_rate={hit_rate:.1%}"
+            )
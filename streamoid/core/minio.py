@@ -1,11 +1,147 @@
+from contextlib import contextmanager
 from functools import lru_cache
+from io import RawIOBase
+from queue import Empty, Full, Queue
+from threading import Thread
 
 from django.conf import settings
 from loguru import logger
 from minio import Minio
+from minio.commonconfig import CopySource
+
+from core.constants import MINIO_UPLOAD_PART_SIZE, MINIO_UPLOAD_QUEUE_CHUNKS
 
 log = logger.bind(component="minio")
 
+QUEUE_POLL_SECONDS = 1
+_END_OF_STREAM = object()
+
+
+class UploadAborted(Exception):
+    pass
+
+
+class _UploadReader:
+    """Read side handed to `put_object`; blocks until the writer produces data."""
+
+    def __init__(self, chunks: Queue):
+        self._chunks = chunks
+        self._remainder = b""
+        self._finished = False
+
+    def read(self, size=-1):
+        parts = [self._remainder]
+        available = len(self._remainder)
+        while not self._finished and (size < 0 or available < size):
+            chunk = self._chunks.get()
+            if chunk is _END_OF_STREAM:
+                self._finished = True
+            elif isinstance(chunk, BaseException):
+                raise chunk
+            else:
+                parts.append(chunk)
+                available += len(chunk)
+        data = b"".join(parts)
+        if size < 0:
+            self._remainder = b""
+            return data
+        self._remainder = data[size:]
+        return data[:size]
+
+
+class MinioUploadStream(RawIOBase):
+    """
+    Writable stream that uploads to MinIO while it is being written.
+    Writes go through a bounded queue to a background `put_object(length=-1)`,
+    which sends fixed-size multipart parts as they fill. Leaving the stream
+    without `commit()` aborts the upload, so no partial object is created.
+    """
+
+    def __init__(self, client: Minio, bucket_name, file_name, part_size=MINIO_UPLOAD_PART_SIZE):
+        super().__init__()
+        self.bucket_name = bucket_name
+        self.file_name = file_name
+        self._chunks = Queue(maxsize=MINIO_UPLOAD_QUEUE_CHUNKS)
+        self._reader = _UploadReader(self._chunks)
+        self.result = None
+        self._error = None
+        self._committed = False
+        self._thread = Thread(target=self._upload, args=(client, part_size), daemon=True)
+        self._thread.start()
+
+    def _upload(self, client: Minio, part_size):
+        try:
+            # put_object aborts its multipart upload itself when the reader raises.
+            self.result = client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=self.file_name,
+                data=self._reader,
+                length=-1,
+                part_size=part_size,
+                num_parallel_uploads=1,
+            )
+        except BaseException as exc:
+            self._error = exc
+
+    def _put(self, item):
+        while True:
+            if self._error is not None or not self._thread.is_alive():
+                raise OSError(f"Upload to MinIO failed: {self._error}") from self._error
+            try:
+                self._chunks.put(item, timeout=QUEUE_POLL_SECONDS)
+                return
+            except Full:
+                continue
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        chunk = bytes(data)
+        if chunk:
+            self._put(chunk)
+        return len(chunk)
+
+    def commit(self):
+        self._put(_END_OF_STREAM)
+        self._thread.join()
+        if self._error is not None:
+            raise OSError(f"Upload to MinIO failed: {self._error}") from self._error
+        self._committed = True
+        log.info("Stored object in MinIO: bucket={}, object={}", self.bucket_name, self.file_name)
+        return self.result
+
+    def abort(self):
+        if self._committed or not self._thread.is_alive():
+            return
+        log.warning("Aborting MinIO upload: bucket={}, object={}", self.bucket_name, self.file_name)
+        # Drop queued chunks so the abort marker is read next.
+        while True:
+            try:
+                self._chunks.get_nowait()
+            except Empty:
+                break
+        try:
+            self._put(UploadAborted(f"Upload of {self.file_name} was aborted."))
+        except OSError:
+            pass
+        self._thread.join()
+
+    def close(self):
+        if not self.closed and not self._committed:
+            self.abort()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+        finally:
+            self.close()
+        return False
+
 
 class MinioHandler:
     def __init__(self, client: Minio | None = None) -> None:
@@ -42,6 +178,16 @@ class MinioHandler:
             return False
         return True
 
+    def open_upload_stream(self, bucket_name, file_name, part_size=MINIO_UPLOAD_PART_SIZE) -> MinioUploadStream:
+        self.check_and_create_bucket(bucket_name)
+        log.info("Streaming object to MinIO: bucket={}, object={}", bucket_name, file_name)
+        return MinioUploadStream(self.client, bucket_name, file_name, part_size=part_size)
+
+    def copy_file(self, bucket_name, source_name, file_name):
+        """Copy an object within the bucket on the server side; failures raise."""
+        log.info("Copying object in MinIO: bucket={}, source={}, object={}", bucket_name, source_name, file_name)
+        return self.client.copy_object(bucket_name, file_name, CopySource(bucket_name, source_name))
+
     def remove_file(self, bucket_name, file_name):
         log.info("Removing object from MinIO: bucket={}, object={}", bucket_name, file_name)
         try:
@@ -51,6 +197,27 @@ class MinioHandler:
             return False
         return True
 
+    def stat_file(self, bucket_name, file_name):
+        try:
+            return self.client.stat_object(bucket_name, file_name)
+        except Exception as e:
+            log.warning(f"Failed to stat file: {bucket_name}/{file_name} | Error: {e}")
+            return None
+
+    @contextmanager
+    def open_file_stream(self, bucket_name, file_name):
+        """Yield a streaming response for an object, releasing the connection afterwards."""
+        file_object = self.get_file(bucket_name, file_name)
+        if not file_object:
+            raise OSError(f"Failed to read {bucket_name}/{file_name} from storage.")
+        try:
+            yield file_object
+        finally:
+            try:
+                file_object.close()
+            finally:
+                file_object.release_conn()
+
     def get_file(self, bucket_name, file_name):
         try:
             file_object = self.client.get_object(bucket_name, file_name)
@@ -0,0 +1,41 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import django
+from django.utils.module_loading import import_string
+
+
+def _init_process(initializer_path: str | None, payload: bytes) -> None:
+    # Workers start from a clean interpreter: set Django up before anything touches models.
+    django.setup()
+    if initializer_path is not None:
+        initializer = import_string(initializer_path)
+        initializer(*pickle.loads(payload))
+
+
+def _forkserver_context():
+    context = get_context("forkserver")
+    # Workers then only fork. The server ignores the parent's sys.path, so this needs `core` on PYTHONPATH
+    # (as in the Docker image); otherwise the import is skipped and each worker sets Django up itself.
+    context.set_forkserver_preload(["core.process_pool_preload"])
+    return context
+
+
+def process_pool(
+    max_workers: int, initializer_path: str | None = None, initargs: tuple = ()
+) -> ProcessPoolExecutor:
+    """
+    Return a pool whose workers come from a forkserver rather than a plain `fork`. The
+    parent may already run threads (MinIO uploads, lease renewals, DB drivers), and a
+    forked child can deadlock on a lock one of them held; nor does a worker inherit the
+    parent's DB or MinIO connections. The optional initializer is named by dotted path
+    and its arguments are unpickled only once Django is set up, so both may reference
+    models.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=_forkserver_context(),
+        initializer=_init_process,
+        initargs=(initializer_path, pickle.dumps(initargs)),
+    )
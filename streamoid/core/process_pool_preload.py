@@ -0,0 +1,5 @@
+"""Imported once by the forkserver, so pool workers fork from an interpreter with Django already set up."""
+
+import django
+
+django.setup()
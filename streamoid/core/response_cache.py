@@ -0,0 +1,144 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from loguru import logger
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.constants import HEAD_DATA, RESPONSE_CACHE_ALIAS
+
+log = logger.bind(component="response_cache")
+
+GENERATION_KEY = "response_cache:generation:{label}"
+STATS_KEY = "response_cache:stats:{endpoint}:{outcome}"
+
+
+def _cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def _increment(key, initial=1):
+    cache = _cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if not cache.add(key, initial, timeout=None):
+            return cache.incr(key)
+        return initial
+
+
+def _bump_generation(key):
+    # A missing generation (never set or culled) is seeded from the clock rather than 1, so a
+    # re-created counter never matches one that cached responses were stored under.
+    return _increment(key, initial=time.time_ns())
+
+
+class ResponseCache:
+    """
+    Cache successful read responses per endpoint, keyed by the request path and query params.
+    Every key embeds a generation counter for each model the endpoint renders; saving or
+    deleting one of those models bumps its generation, so stale entries are never read
+    again and simply age out. TTLs come from `RESPONSE_CACHE_TTLS` (0 disables an endpoint).
+    """
+
+    def __init__(self, endpoint: str, models):
+        self.endpoint = endpoint
+        self.models = tuple(models)
+
+    @property
+    def ttl(self) -> int:
+        return settings.RESPONSE_CACHE_TTLS.get(self.endpoint, 0)
+
+    @staticmethod
+    def _generation_key(model) -> str:
+        return GENERATION_KEY.format(label=model._meta.label_lower)
+
+    def _generations(self) -> list:
+        keys = [self._generation_key(model) for model in self.models]
+        generations = _cache().get_many(keys)
+        return [generations[key] if key in generations else _bump_generation(key) for key in keys]
+
+    def key(self, request) -> str:
+        query = sorted(request.query_params.lists())
+        request_key = hashlib.sha256(f"{request.path}?{query}".encode("utf-8")).hexdigest()
+        generations = ".".join(str(generation) for generation in self._generations())
+        return f"response_cache:{self.endpoint}:{generations}:{request_key}"
+
+    def get(self, key):
+        data = _cache().get(key)
+        self._count("hits" if data is not None else "misses")
+        return data
+
+    def set(self, key, data) -> None:
+        _cache().set(key, data, timeout=self.ttl)
+
+    def _count(self, outcome: str) -> None:
+        try:
+            _increment(STATS_KEY.format(endpoint=self.endpoint, outcome=outcome))
+        except Exception as e:
+            log.warning(f"Failed to count response cache {outcome} | Error: {e}")
+
+    @staticmethod
+    def invalidate(*models) -> None:
+        for model in models:
+            try:
+                _bump_generation(ResponseCache._generation_key(model))
+            except Exception as e:
+                # A missed bump only leaves entries stale until their TTL.
+                log.warning(f"Failed to invalidate response cache for {model._meta.label} | Error: {e}")
+
+    @staticmethod
+    def stats() -> dict:
+        endpoints = settings.RESPONSE_CACHE_TTLS
+        keys = {
+            (endpoint, outcome): STATS_KEY.format(endpoint=endpoint, outcome=outcome)
+            for endpoint in endpoints
+            for outcome in ("hits", "misses")
+        }
+        counters = _cache().get_many(list(keys.values()))
+        return {
+            endpoint: {outcome: counters.get(keys[endpoint, outcome], 0) for outcome in ("hits", "misses")}
+            for endpoint in endpoints
+        }
+
+    @classmethod
+    def watch(cls, *models) -> None:
+        """Invalidate on `post_save`/`post_delete`; call from the owning app's `ready()`."""
+        for model in models:
+            dispatch_uid = f"response_cache:{model._meta.label_lower}"
+            post_save.connect(_invalidate_on_signal, sender=model, dispatch_uid=f"{dispatch_uid}:save")
+            post_delete.connect(_invalidate_on_signal, sender=model, dispatch_uid=f"{dispatch_uid}:delete")
+
+
+def _invalidate_on_signal(sender, **kwargs):
+    ResponseCache.invalidate(sender)
+
+
+def cached_response(endpoint: str, models):
+    """
+    Decorate an `APIView.get` whose body is a service response dict.
+    Only 200 responses are stored; hits are rebuilt without calling the service.
+    """
+    response_cache = ResponseCache(endpoint, models)
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            if response_cache.ttl <= 0:
+                return view_method(view, request, *args, **kwargs)
+            key = response_cache.key(request)
+            data = response_cache.get(key)
+            if data is not None:
+                return Response(data, status=data.get("code"), headers=HEAD_DATA)
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response_cache.set(key, response.data)
+            return response
+
+        return wrapper
+
+    return decorator
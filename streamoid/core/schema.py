@@ -12,3 +12,21 @@ PAGE_SIZE_PARAMETER = OpenApiParameter(
     location=OpenApiParameter.QUERY,
     description="Page size for pagination. Must be supplied with page_number.",
 )
+CURSOR_PARAMETER = OpenApiParameter(
+    name="cursor",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description="Opaque cursor for keyset pagination; pass an empty value for the first page, then next_cursor.",
+)
+FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description="Comma-separated fields to return; dotted paths select inside nested objects.",
+)
+EXPAND_PARAMETER = OpenApiParameter(
+    name="expand",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description="Comma-separated nested objects to return in full when fields/expand are used.",
+)
@@ -9,6 +9,17 @@ from rest_framework.serializers import (
 
 
 class DetailsBaseSerializer(ModelSerializer):
+    def __init__(self, *args, fieldset=None, **kwargs):
+        # A `SparseFieldset` from the request's `fields`/`expand` params, if any.
+        self.fieldset = fieldset
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.fieldset is None:
+            return fields
+        return self.fieldset.prune(fields)
+
     class Meta:
         fields = ("id", "created_at", "updated_at")
 
@@ -33,8 +44,9 @@ class BaseListResponseSerializer(Serializer):
     data = JSONField()
     errors = JSONField()
     message = CharField()
-    total_page_number = IntegerField()
-    total_count = IntegerField()
+    total_page_number = IntegerField(required=False)
+    total_count = IntegerField(required=False)
+    next_cursor = CharField(required=False, allow_null=True)
 
 
 class ErrorResponseSerializer(BaseDetailResponseSerializer):
@@ -0,0 +1,202 @@
+from core.helpers import ValidationHelpers
+
+# Bump when the canonical layout changes; stored schemas with another version are recomputed on read.
+TEMPLATE_SCHEMA_VERSION = 3
+
+FIELD_TYPE_STRING = "string"
+FIELD_TYPE_NUMBER = "number"
+FIELD_TYPE_ENUM = "enum"
+FIELD_TYPE_ARRAY = "array"
+FIELD_TYPE_URL = "url"
+FIELD_TYPE_JSON = "json"
+
+# Spellings accepted in raw templates for each canonical type.
+FIELD_TYPE_ALIASES = {
+    FIELD_TYPE_STRING: frozenset({"string", "str"}),
+    FIELD_TYPE_NUMBER: frozenset({"number", "float", "int", "integer"}),
+    FIELD_TYPE_ENUM: frozenset({"enum", "choice", "choices"}),
+    FIELD_TYPE_ARRAY: frozenset({"array", "list"}),
+    FIELD_TYPE_URL: frozenset({"url", "uri"}),
+}
+
+# Types whose `min`/`max` may be `"$field"` references, compared against another field of the same type.
+REFERENCE_FIELD_TYPES = frozenset({FIELD_TYPE_STRING, FIELD_TYPE_NUMBER})
+REFERENCE_BOUNDS = ("min", "max")
+# What a reference compares: the two values, or a string's length with the referenced string's length
+# (or with the referenced number).
+REFERENCE_MEASURE_VALUE = "value"
+REFERENCE_MEASURE_LENGTH = "length"
+
+DEFAULT_MAX_DIGITS = 12
+DEFAULT_DECIMAL_PLACES = 2
+
+
+class TemplateSchemaError(ValueError):
+    pass
+
+
+class TemplateReferenceError(TemplateSchemaError):
+    """A `$field` reference forms a cycle or compares fields of different types."""
+
+
+def canonical_type(raw_type):
+    if raw_type is not None and not isinstance(raw_type, str):
+        raise TemplateSchemaError(f"Field type must be a string, got {raw_type!r}.")
+    field_type = (raw_type or "").lower()
+    for canonical, aliases in FIELD_TYPE_ALIASES.items():
+        if field_type in aliases:
+            return canonical
+    return None
+
+
+def extract_reference(value):
+    """Return the referenced field for `"$name"` bounds, else None."""
+    if isinstance(value, str) and value.startswith("$") and len(value) > 1:
+        return value[1:]
+    return None
+
+
+def _normalize_items(items):
+    items = items or {}
+    if not isinstance(items, dict):
+        raise TemplateSchemaError("List `items` must be an object.")
+    item_type = canonical_type(items.get("type"))
+    if item_type == FIELD_TYPE_ARRAY or item_type is None:
+        item_type = FIELD_TYPE_JSON
+    normalized = {"type": item_type}
+    if item_type == FIELD_TYPE_ENUM:
+        normalized["choices"] = items.get("choices") or []
+    return normalized
+
+
+def _normalize_bounds(field, rules, suffix):
+    for bound in REFERENCE_BOUNDS:
+        # `maxLength: "$field"` bounds the length; the short `max: "$field"` compares the values themselves.
+        value = ValidationHelpers.get_variant_value(rules, bound, suffix, include_short=False)
+        measure = REFERENCE_MEASURE_LENGTH if suffix == REFERENCE_MEASURE_LENGTH else REFERENCE_MEASURE_VALUE
+        if value is None:
+            value = rules.get(bound)
+            measure = REFERENCE_MEASURE_VALUE
+        reference = extract_reference(value)
+        field[f"{bound}_reference"] = reference
+        field[f"{bound}_reference_measure"] = measure if reference else None
+        # Referenced bounds are compared against the other field's value, not used as literals.
+        field[f"{bound}_{suffix}"] = None if reference else value
+
+
+def _normalize_field(name, rules):
+    if not isinstance(rules, dict):
+        raise TemplateSchemaError(f"Rules for '{name}' must be an object.")
+    field_type = canonical_type(rules.get("type"))
+    unique = ValidationHelpers.get_variant_value(rules, "unique", default=False)
+    field = {
+        "name": name,
+        # None for unsupported types: the key is part of the template but is not validated.
+        "type": field_type,
+        "required": ValidationHelpers.evaluate_boolean(rules.get("required"), False),
+        "unique": ValidationHelpers.evaluate_boolean(unique, False),
+        "is_list": field_type == FIELD_TYPE_ARRAY,
+    }
+    if field_type == FIELD_TYPE_STRING:
+        _normalize_bounds(field, rules, "length")
+    elif field_type == FIELD_TYPE_NUMBER:
+        _normalize_bounds(field, rules, "value")
+        field["max_digits"] = rules.get("max_digits") or rules.get("maxDigits") or DEFAULT_MAX_DIGITS
+        field["decimal_places"] = (
+            rules.get("decimal_places") or rules.get("decimalPlaces") or DEFAULT_DECIMAL_PLACES
+        )
+    elif field_type == FIELD_TYPE_ENUM:
+        field["choices"] = rules.get("choices") or []
+    elif field_type == FIELD_TYPE_ARRAY:
+        field["items"] = _normalize_items(rules.get("items"))
+    return field
+
+
+def _field_references(field):
+    if field["type"] not in REFERENCE_FIELD_TYPES:
+        return []
+    return [
+        (bound, field[f"{bound}_reference"], field[f"{bound}_reference_measure"])
+        for bound in REFERENCE_BOUNDS
+        if field[f"{bound}_reference"]
+    ]
+
+
+def _order_references(fields):
+    """
+    Return the `$field` comparisons in dependency order: a field's comparisons come
+    after those of every field it references, so a value that failed its own
+    comparison is never compared against. Raises on cycles and on value
+    comparisons between fields of different types; a length may be compared
+    with a string or a number.
+    """
+    fields_by_name = {field["name"]: field for field in fields}
+    depends_on = {}
+    for field in fields:
+        depends_on[field["name"]] = []
+        for _bound, reference, measure in _field_references(field):
+            referenced = fields_by_name.get(reference)
+            # References to unknown or unvalidated keys have nothing to compare against and are skipped at runtime.
+            if referenced is None or referenced["type"] is None:
+                continue
+            if measure == REFERENCE_MEASURE_LENGTH:
+                comparable = referenced["type"] in REFERENCE_FIELD_TYPES
+            else:
+                comparable = referenced["type"] == field["type"]
+            if not comparable:
+                raise TemplateReferenceError(
+                    f"'{field['name']}' ({field['type']}) cannot be compared with '{reference}' ({referenced['type']})."
+                )
+            depends_on[field["name"]].append(reference)
+
+    order, visited = [], set()
+
+    def visit(name, path):
+        if name in visited:
+            return
+        if name in path:
+            cycle = path[path.index(name) :] + [name]
+            raise TemplateReferenceError(f"Circular field reference: {' -> '.join(cycle)}.")
+        path.append(name)
+        for reference in depends_on[name]:
+            visit(reference, path)
+        path.pop()
+        visited.add(name)
+        order.append(name)
+
+    for field in fields:
+        visit(field["name"], [])
+    return [
+        {"field": name, "bound": bound, "reference": reference, "measure": measure}
+        for name in order
+        for bound, reference, measure in _field_references(fields_by_name[name])
+    ]
+
+
+def normalize_template(template) -> dict:
+    """
+    Resolve a free-form template into its canonical schema.
+    Key spellings (`maxLength`/`max_length`/`max`), boolean strings and `$field`
+    references are resolved once, so validators and row mapping read plain keys.
+    Fields keep the template's order; `references` are in dependency order.
+    Raises `TemplateSchemaError` for templates that cannot be validated.
+    """
+    if not isinstance(template, dict):
+        raise TemplateSchemaError("Template must be an object.")
+    fields = [_normalize_field(name, rules) for name, rules in template.items()]
+    references = _order_references(fields)
+    return {
+        "version": TEMPLATE_SCHEMA_VERSION,
+        "fields": fields,
+        "references": references,
+        "unique_fields": [field["name"] for field in fields if field["unique"]],
+        "list_fields": [field["name"] for field in fields if field["is_list"]],
+    }
+
+
+def get_template_schema(marketplace_template) -> dict:
+    """Return the stored canonical schema, normalizing on the fly for unsaved or outdated templates."""
+    schema = getattr(marketplace_template, "schema", None)
+    if isinstance(schema, dict) and schema.get("version") == TEMPLATE_SCHEMA_VERSION:
+        return schema
+    return normalize_template(marketplace_template.template)
@@ -0,0 +1,86 @@
+import pytest
+
+from core.base_service import PaginationService
+from seller.models import Seller
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sellers():
+    return [Seller.objects.create(name=f"Seller {index}") for index in range(5)]
+
+
+def test_queryset_pages_are_fetched_with_count_and_limit(sellers, django_assert_num_queries):
+    queryset = Seller.objects.order_by("id")
+
+    with django_assert_num_queries(2) as context:
+        response = PaginationService(page_number=2, page_size=2).paginated_response(queryset)
+
+    assert [seller.id for seller in response["data"]] == [sellers[2].id, sellers[3].id]
+    assert response["total_count"] == 5
+    assert response["total_page_number"] == 3
+    page_sql = context.captured_queries[1]["sql"]
+    assert "LIMIT 2" in page_sql and "OFFSET 2" in page_sql
+
+
+def test_queryset_page_past_the_end_is_empty(sellers):
+    response = PaginationService(page_number=9, page_size=2).paginated_response(Seller.objects.order_by("id"))
+
+    assert response["code"] == 200
+    assert response["data"] == []
+    assert response["total_count"] == 5
+    assert response["total_page_number"] == 3
+
+
+def test_lists_are_still_paginated():
+    response = PaginationService(page_number=2, page_size=2).paginated_response(["a", "b", "c"])
+
+    assert response["data"] == ["c"]
+    assert response["total_count"] == 3
+    assert response["total_page_number"] == 2
+
+
+def test_unpaginated_queryset_returns_every_row(sellers):
+    response = PaginationService().paginated_response(Seller.objects.order_by("id"))
+
+    assert len(response["data"]) == 5
+    assert response["total_count"] == 5
+    assert response["total_page_number"] == 1
+
+
+def test_invalid_page_params_return_400():
+    response = PaginationService(page_number=0, page_size="x").paginated_response([])
+
+    assert response["code"] == 400
+    assert set(response["errors"]) == {"page_number", "page_size"}
+
+
+def test_cursor_pages_walk_the_table_without_counting(sellers, django_assert_num_queries):
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        with django_assert_num_queries(1):
+            response = PaginationService(page_size=2, cursor=cursor).paginated_response(Seller.objects.all())
+        assert "total_count" not in response
+        seen.extend(seller.id for seller in response["data"])
+        cursor = response["next_cursor"]
+
+    assert seen == [seller.id for seller in reversed(sellers)]
+
+
+def test_cursor_breaks_created_at_ties_by_id(sellers):
+    Seller.objects.update(created_at=sellers[0].created_at)
+
+    first = PaginationService(page_size=3, cursor="").paginated_response(Seller.objects.all())
+    second = PaginationService(page_size=3, cursor=first["next_cursor"]).paginated_response(Seller.objects.all())
+
+    assert [seller.id for seller in first["data"] + second["data"]] == [seller.id for seller in reversed(sellers)]
+    assert second["next_cursor"] is None
+
+
+def test_invalid_cursor_returns_400():
+    response = PaginationService(cursor="not-a-cursor").paginated_response(Seller.objects.all())
+
+    assert response["code"] == 400
+    assert response["errors"] == {"cursor": "Invalid cursor."}
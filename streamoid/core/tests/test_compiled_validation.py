@@ -0,0 +1,386 @@
+from types import SimpleNamespace
+
+import pytest
+from rest_framework import serializers
+
+from core.compiled_validation import CompiledValidator
+from core.constants import VALIDATION_ENGINE_COMPILED, VALIDATION_ENGINE_DRF
+from core.custom_validation import CustomValidatior
+from core.file_validation import validate_file
+
+TEMPLATE = {
+    "productName": {"type": "string", "maxLength": 10, "minLength": 2, "required": True},
+    "brand": {"type": "string", "required": True},
+    "color": {"type": "string"},
+    "gender": {"type": "enum", "choices": ["Men", "Women", "Unisex"], "required": True},
+    "size": {"type": "enum", "choices": ["S", "M", "L"]},
+    "mrp": {"type": "number", "min": 0, "max": 10000, "required": True},
+    "price": {"type": "number", "min": 0, "max": "$mrp", "required": True},
+    "discount": {"type": "number", "min": "$floor", "decimalPlaces": 3, "maxDigits": 6},
+    "floor": {"type": "number"},
+    "website": {"type": "url"},
+    "images": {"type": "array", "items": {"type": "url"}},
+    "tags": {"type": "array", "items": {"type": "string"}, "required": True},
+    "sizes": {"type": "array", "items": {"type": "enum", "choices": ["S", "M"]}},
+    "extra": {"type": "array"},
+}
+
+VALID_ROW = {
+    "productName": "Tee",
+    "brand": "Acme",
+    "color": "Blue",
+    "gender": "Men",
+    "size": "M",
+    "mrp": "100",
+    "price": "99.99",
+    "discount": "1.5",
+    "floor": "1",
+    "website": "https://example.com",
+    "images": ["https://example.com/a.jpg"],
+    "tags": ["new"],
+    "sizes": ["S"],
+    "extra": ["anything"],
+}
+
+CELL_VALUES = [
+    "",
+    "   ",
+    " padded ",
+    "x",
+    "a" * 11,
+    "Men",
+    "men",
+    "M",
+    "0",
+    "-1",
+    "100",
+    "100.005",
+    "10000.01",
+    "1e3",
+    "1_000",
+    "NaN",
+    "Infinity",
+    "12345678901",
+    "0.0001",
+    "abc",
+    "null\x00byte",
+    "surrogate\ud800",
+    "naïve",
+    "https://example.com/a.jpg",
+    "ftp://example.com/a.jpg",
+    "not a url",
+    "http://[::1]:80/",
+    None,
+    1,
+    True,
+    [],
+    ["S"],
+    ["S", "XL"],
+    ["https://example.com/a.jpg", "bad"],
+    [""],
+    {"a": 1},
+]
+
+
+def _template(template):
+    return SimpleNamespace(template=template)
+
+
+def _validate_with_serializer(template, data):
+    serializer_class = CustomValidatior(template=_template(template)).build()
+    serializer = serializer_class(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer.validated_data, None
+
+
+def _validate_compiled(template, data):
+    return CompiledValidator(template=_template(template)).build()(data)
+
+
+def _assert_parity(template, data):
+    expected_data, expected_errors = _validate_with_serializer(template, data)
+    validated_data, errors = _validate_compiled(template, data)
+    assert validated_data == expected_data
+    assert errors == expected_errors
+    if errors:
+        assert list(errors) == list(expected_errors)
+        for name, detail in errors.items():
+            assert [getattr(item, "code", None) for item in detail] == [
+                getattr(item, "code", None) for item in expected_errors[name]
+            ]
+
+
+def test_compiled_validator_matches_serializer_for_valid_row():
+    validated_data, errors = _validate_compiled(TEMPLATE, VALID_ROW)
+
+    assert errors is None
+    _assert_parity(TEMPLATE, VALID_ROW)
+    assert list(validated_data) == list(TEMPLATE)
+
+
+@pytest.mark.parametrize("field_name", list(TEMPLATE))
+@pytest.mark.parametrize("value", CELL_VALUES, ids=repr)
+def test_compiled_validator_matches_serializer_per_cell(field_name, value):
+    data = dict(VALID_ROW, **{field_name: value})
+    _assert_parity(TEMPLATE, data)
+
+
+@pytest.mark.parametrize("field_name", list(TEMPLATE))
+def test_compiled_validator_matches_serializer_for_missing_field(field_name):
+    data = {key: value for key, value in VALID_ROW.items() if key != field_name}
+    _assert_parity(TEMPLATE, data)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"price": "101", "mrp": "100"},
+        {"price": "101", "mrp": "bad"},
+        {"price": "101", "mrp": ""},
+        {"price": "", "mrp": "100", "productName": ""},
+        {"discount": "0.5", "floor": "1"},
+        {"discount": "0.5", "floor": ""},
+        {"price": "101", "discount": "0.5", "gender": "Other"},
+    ],
+)
+def test_compiled_validator_matches_serializer_for_references(overrides):
+    _assert_parity(TEMPLATE, dict(VALID_ROW, **overrides))
+
+
+def test_compiled_validator_applies_both_references_like_serializer():
+    template = {
+        "floor": {"type": "number"},
+        "ceiling": {"type": "number"},
+        "value": {"type": "number", "min": "$floor", "max": "$ceiling"},
+    }
+
+    for data in ({"floor": "5", "ceiling": "10", "value": "1"}, {"floor": "5", "ceiling": "10", "value": "11"}):
+        _assert_parity(template, data)
+        assert "value" in CompiledValidator(template=_template(template)).build()(data)[1]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"cost": "5", "mrp": "4", "price": "3"},
+        {"cost": "5", "mrp": "10", "price": "11"},
+        {"cost": "", "mrp": "10", "price": "9"},
+        {"starts": "2024-02-01", "ends": "2024-01-31"},
+        {"starts": "2024-01-01", "ends": ""},
+    ],
+)
+def test_compiled_validator_matches_serializer_for_reference_chains(data):
+    template = {
+        "price": {"type": "number", "max": "$mrp"},
+        "mrp": {"type": "number", "min": "$cost"},
+        "cost": {"type": "number"},
+        "ends": {"type": "string", "min": "$starts"},
+        "starts": {"type": "string"},
+    }
+    _assert_parity(template, data)
+
+
+@pytest.mark.parametrize(
+    "data, failed",
+    [
+        ({"title": "b", "name": "aaaa", "code": "a", "limit": "1"}, []),
+        ({"title": "bbbbb", "name": "aaaa", "code": "abc", "limit": "3"}, ["title"]),
+        ({"title": "bb", "name": "aaaa", "code": "abc", "limit": "3"}, ["title"]),
+        ({"title": "bbb", "name": "aaaa", "code": "ab", "limit": "3"}, ["code"]),
+        ({"title": "bbbb", "name": "aaaa", "code": "abcd", "limit": "3.5"}, []),
+    ],
+)
+def test_length_references_compare_lengths(data, failed):
+    template = {
+        "title": {"type": "string", "maxLength": "$name", "minLength": "$code"},
+        "name": {"type": "string"},
+        "code": {"type": "string", "min_length": "$limit"},
+        "limit": {"type": "number"},
+    }
+
+    _validated_data, errors = CompiledValidator(template=_template(template)).build()(data)
+
+    assert list(errors or {}) == failed
+    _assert_parity(template, data)
+
+
+def test_failed_reference_is_not_compared_against():
+    template = {
+        "price": {"type": "number", "max": "$mrp"},
+        "mrp": {"type": "number", "min": "$cost"},
+        "cost": {"type": "number"},
+    }
+
+    _validated_data, errors = CompiledValidator(template=_template(template)).build()(
+        {"cost": "5", "mrp": "4", "price": "30"}
+    )
+
+    assert list(errors) == ["mrp"]
+
+
+def test_serializer_parses_each_cell_once(monkeypatch):
+    template = {
+        "price": {"type": "number", "max": "$mrp"},
+        "sale": {"type": "number", "max": "$price"},
+        "mrp": {"type": "number"},
+    }
+    calls = []
+    run_validation = serializers.DecimalField.run_validation
+
+    def counting_run_validation(field, data):
+        calls.append(field.field_name)
+        return run_validation(field, data)
+
+    monkeypatch.setattr(serializers.DecimalField, "run_validation", counting_run_validation)
+    serializer_class = CustomValidatior(template=_template(template)).build()
+    serializer = serializer_class(data={"price": "10", "sale": "9", "mrp": "12"})
+
+    assert serializer.is_valid(), serializer.errors
+    assert sorted(calls) == ["mrp", "price", "sale"]
+
+
+@pytest.mark.parametrize(
+    "template", [None, [], {"sku": "string"}, {"n": {"type": "array", "items": {"type": "number"}}}]
+)
+def test_compiled_validator_rejects_invalid_template(template):
+    assert CustomValidatior(template=_template(template)).build() is None
+    assert CompiledValidator(template=_template(template)).build() is None
+
+
+def test_validate_file_engines_return_same_rows():
+    template = _template(TEMPLATE)
+    headers = ["name", "brand", "gender", "mrp", "price", "tag", "image1", "image2"]
+    mappings = [
+        {"seller": "name", "marketplace": "productName"},
+        {"seller": "brand", "marketplace": "brand"},
+        {"seller": "gender", "marketplace": "gender"},
+        {"seller": "mrp", "marketplace": "mrp"},
+        {"seller": "price", "marketplace": "price"},
+        {"seller": "tag", "marketplace": "tags"},
+        {"seller": "image1", "marketplace": "images"},
+        {"seller": "image2", "marketplace": "images"},
+    ]
+    rows = [
+        ["Tee", "Acme", "Men", "499.00", "399.00", "new", "https://example.com/1.jpg", ""],
+        ["Jeans", "Denim", "Women", "1299", "1299", "sale", "", "https://example.com/2.jpg"],
+    ]
+
+    expected = validate_file(template, mappings, headers, rows, engine=VALIDATION_ENGINE_DRF)
+    validated = validate_file(template, mappings, headers, rows, engine=VALIDATION_ENGINE_COMPILED)
+
+    assert validated == expected
+
+
+def test_validate_file_engines_raise_same_row_error():
+    template = _template(TEMPLATE)
+    headers = ["name", "brand", "gender", "mrp", "price", "tag"]
+    mappings = [
+        {"seller": "name", "marketplace": "productName"},
+        {"seller": "brand", "marketplace": "brand"},
+        {"seller": "gender", "marketplace": "gender"},
+        {"seller": "mrp", "marketplace": "mrp"},
+        {"seller": "price", "marketplace": "price"},
+        {"seller": "tag", "marketplace": "tags"},
+    ]
+    rows = [
+        ["Tee", "Acme", "Men", "499.00", "399.00", "new"],
+        ["A very long name", "Acme", "Other", "100", "150", "new"],
+    ]
+
+    details = []
+    for engine in (VALIDATION_ENGINE_DRF, VALIDATION_ENGINE_COMPILED):
+        with pytest.raises(serializers.ValidationError) as exc:
+            validate_file(template, mappings, headers, rows, engine=engine)
+        details.append(exc.value.detail)
+
+    assert details[0] == details[1]
+    assert int(details[1]["row"]) == 1
+    assert set(details[1]["errors"]) == {"productName", "gender", "price"}
+
+
+def _memoized_validator(template, settings, memo_size=8):
+    settings.VALIDATION_MEMO_SIZE = memo_size
+    return CompiledValidator(template=_template(template)).build()
+
+
+@pytest.mark.parametrize("field_name", list(TEMPLATE))
+def test_memoized_validator_matches_serializer(settings, field_name):
+    row_validator = _memoized_validator(TEMPLATE, settings)
+
+    for value in CELL_VALUES * 2:
+        data = dict(VALID_ROW, **{field_name: value})
+        assert row_validator(data) == _validate_with_serializer(TEMPLATE, data)
+
+
+def test_memoized_validator_skips_referenced_unique_and_list_columns(settings):
+    template = dict(TEMPLATE, color={"type": "string", "unique": True})
+    row_validator = _memoized_validator(template, settings)
+    memoized = {name for name, validate_value in row_validator.columns if hasattr(validate_value, "cache_info")}
+
+    assert memoized == {"productName", "brand", "gender", "size", "website"}
+
+
+def test_memoized_validator_reuses_outcomes_within_bound(settings):
+    row_validator = _memoized_validator({"gender": TEMPLATE["gender"]}, settings, memo_size=2)
+    validate_gender = dict(row_validator.columns)["gender"]
+
+    for value in ["Men", "Other", "Men", "Other", "Women", "Unisex"]:
+        row_validator({"gender": value})
+
+    info = validate_gender.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 4, 2)
+    assert list(row_validator({"gender": "Other"})[1]["gender"]) == ['"Other" is not a valid choice.']
+
+
+NUMBER_CELLS = [
+    "0",
+    "-0",
+    "+0.0",
+    "-0.00",
+    "007.5",
+    "1.",
+    ".5",
+    "399",
+    "399.9",
+    "399.99",
+    "399.999",
+    "-12.30",
+    "+12.3",
+    "9999999999",
+    "99999999999",
+    "9999999999.99",
+    "1e2",
+    "1_000",
+    "١٢",
+    "²",
+    "12.x",
+    "--1",
+    "+",
+    "-",
+    "1.2.3",
+]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"max_digits": 12, "decimal_places": 2},
+        {"max_digits": 6, "decimal_places": 3, "min_value": 0},
+        {"max_digits": 4, "decimal_places": 0, "max_value": 1000},
+    ],
+)
+def test_compiled_decimal_is_bit_identical_to_drf(kwargs):
+    field = serializers.DecimalField(required=True, **kwargs)
+    validate_decimal = CompiledValidator(template=_template({}))._compile_decimal(field)
+
+    for value in NUMBER_CELLS:
+        try:
+            expected = field.run_validation(value)
+        except serializers.ValidationError as exc:
+            with pytest.raises(serializers.ValidationError) as compiled_exc:
+                validate_decimal(value)
+            assert compiled_exc.value.detail == exc.detail, value
+            continue
+        number = validate_decimal(value)
+        assert number.as_tuple() == expected.as_tuple(), value
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from mapping.models import Mappings
+from marketplace.models import Marketplace, MarketplaceTempate
+from seller.constants import CSV
+from seller.models import Seller, SellerFiles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def mapping():
+    marketplace = Marketplace.objects.create(name="Demo Marketplace")
+    template = MarketplaceTempate.objects.create(marketplace=marketplace, template={"sku": {"type": "string"}})
+    seller = Seller.objects.create(name="Demo Seller")
+    seller_file = SellerFiles.objects.create(seller=seller, name="items.csv", file_type=CSV, path="b/items.csv")
+    return Mappings.objects.create(marketplace_template=template, seller_file=seller_file, mappings=[])
+
+
+def test_detail_returns_304_for_matching_etag_without_serializing(client, mapping, django_assert_num_queries):
+    url = f"/api/v1/mapping/{mapping.id}/"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first["ETag"].startswith('W/"')
+    assert "Last-Modified" in first
+
+    with django_assert_num_queries(1):
+        second = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert second.status_code == 304
+    assert second["ETag"] == first["ETag"]
+    assert not second.content
+
+
+@pytest.mark.parametrize(
+    "model, lookup",
+    [
+        (SellerFiles, "seller_file_id"),
+        (Seller, "seller_file__seller_id"),
+        (MarketplaceTempate, "marketplace_template_id"),
+        (Marketplace, "marketplace_template__marketplace_id"),
+    ],
+)
+def test_detail_etag_changes_when_the_row_or_a_nested_row_changes(client, mapping, model, lookup):
+    url = f"/api/v1/mapping/{mapping.id}/"
+    etag = client.get(url)["ETag"]
+
+    nested_id = Mappings.objects.values_list(lookup, flat=True).get(id=mapping.id)
+    model.objects.filter(id=nested_id).update(updated_at=timezone.now() + timedelta(seconds=5))
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_list_etag_changes_on_delete_and_if_modified_since_is_honoured(client, mapping):
+    url = "/api/v1/mapping/"
+    first = client.get(url)
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code == 304
+
+    mapping.delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+def test_seller_file_detail_skips_validators_without_a_seller(client, mapping):
+    response = client.get(f"/api/v1/seller/files/{mapping.seller_file_id}/")
+
+    assert response.status_code == 412
+    assert "ETag" not in response
@@ -0,0 +1,101 @@
+import pytest
+from django.http import QueryDict
+
+from core.base_service import PaginationService
+from core.fieldsets import SparseFieldset
+from mapping.models import Mappings
+from mapping.serializers import MappingsListSerializer
+from marketplace.models import Marketplace, MarketplaceTempate
+from seller.constants import CSV
+from seller.models import Seller, SellerFiles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def mapping():
+    marketplace = Marketplace.objects.create(name="Demo Marketplace")
+    template = MarketplaceTempate.objects.create(marketplace=marketplace, template={"sku": {"type": "string"}})
+    seller = Seller.objects.create(name="Demo Seller")
+    seller_file = SellerFiles.objects.create(
+        seller=seller,
+        name="items.csv",
+        file_type=CSV,
+        path="b/items.csv",
+        headers=["sku"],
+        sample_rows=[["1"]],
+    )
+    return Mappings.objects.create(marketplace_template=template, seller_file=seller_file, mappings=[])
+
+
+def _list(query, queryset=None):
+    fieldset = SparseFieldset.from_query_params(QueryDict(query))
+    queryset = queryset if queryset is not None else Mappings.objects.select_related("seller_file__seller")
+    return PaginationService(fieldset=fieldset).paginated_response(queryset, MappingsListSerializer)
+
+
+def test_without_params_the_full_representation_is_kept(mapping):
+    assert SparseFieldset.from_query_params(QueryDict("")) is None
+
+    response = _list("")
+
+    assert response["data"][0]["seller_file"]["sample_rows"] == [["1"]]
+    assert response["data"][0]["marketplace_template"]["template"] == {"sku": {"type": "string"}}
+
+
+def test_fields_collapse_nested_objects_to_ids(mapping, django_assert_num_queries):
+    with django_assert_num_queries(1) as context:
+        response = _list("fields=id,evaluation_status,seller_file")
+
+    assert response["data"] == [
+        {"id": mapping.id, "evaluation_status": mapping.evaluation_status, "seller_file": mapping.seller_file_id}
+    ]
+    sql = context.captured_queries[0]["sql"]
+    assert "JOIN" not in sql
+    assert '"mapping_mappings"."mappings"' not in sql
+
+
+def test_dotted_fields_select_inside_nested_objects_and_defer_json(mapping, django_assert_num_queries):
+    with django_assert_num_queries(1) as context:
+        response = _list("fields=id,seller_file.name,seller_file.seller&expand=seller_file.seller")
+
+    assert response["data"] == [
+        {
+            "id": mapping.id,
+            "seller_file": {
+                "name": "items.csv",
+                "seller": {
+                    "id": mapping.seller_file.seller.id,
+                    "created_at": response["data"][0]["seller_file"]["seller"]["created_at"],
+                    "updated_at": response["data"][0]["seller_file"]["seller"]["updated_at"],
+                    "name": "Demo Seller",
+                },
+            },
+        }
+    ]
+    sql = context.captured_queries[0]["sql"]
+    assert "sample_rows" not in sql and "headers" not in sql and "template" not in sql
+
+
+def test_expand_alone_keeps_every_field_but_collapses_other_relations(mapping):
+    response = _list("expand=marketplace_template")
+
+    row = response["data"][0]
+    assert row["seller_file"] == mapping.seller_file_id
+    assert row["marketplace_template"]["marketplace"] == mapping.marketplace_template.marketplace_id
+    assert row["marketplace_template"]["template"] == {"sku": {"type": "string"}}
+
+
+@pytest.mark.parametrize(
+    "query, errors",
+    [
+        ("fields=id,nope", {"fields": "Unknown field(s): nope."}),
+        ("expand=evaluation_status", {"expand": "Cannot expand: evaluation_status."}),
+        ("fields=seller_file.nope", {"fields": "Unknown field(s): nope."}),
+    ],
+)
+def test_unknown_fields_return_400(mapping, query, errors):
+    response = _list(query)
+
+    assert response["code"] == 400
+    assert response["errors"] == errors
@@ -1,4 +1,5 @@
 from types import SimpleNamespace
+from unittest.mock import patch
 
 import pytest
 from rest_framework import serializers
@@ -193,3 +194,103 @@ def test_file_validator_rejects_invalid_template():
         validator.validate()
 
     assert "Invalid template schema." in str(exc.value.detail)
+
+
+def _build_rows(count, sku=lambda index: f"SKU-{index}", price=lambda index: "399.00"):
+    _mappings, _headers, rows = _build_mapping_data()
+    template_row = rows[0]
+    built = []
+    for index in range(count):
+        row = list(template_row)
+        row[0] = sku(index)
+        row[8] = price(index)
+        built.append(row)
+    return built
+
+
+def _validate_outcome(rows, **kwargs):
+    template = SimpleNamespace(template=_build_template())
+    mappings, headers, _ = _build_mapping_data()
+    validated = []
+    try:
+        for row in FileValidator(template, mappings, headers, iter(rows), **kwargs).iter_validated_rows():
+            validated.append(row)
+    except serializers.ValidationError as exc:
+        return validated, exc.detail
+    return validated, None
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        _build_rows(23),
+        _build_rows(23, price=lambda index: "9999.00" if index in (11, 17) else "399.00"),
+        _build_rows(23, sku=lambda index: "SKU-3" if index == 19 else f"SKU-{index}"),
+        _build_rows(
+            23,
+            sku=lambda index: "SKU-3" if index == 19 else f"SKU-{index}",
+            price=lambda index: "x" if index == 20 else "399.00",
+        ),
+        _build_rows(23, sku=lambda index: "SKU-9" if index == 10 else f"SKU-{index}"),
+        [],
+    ],
+    ids=[
+        "valid",
+        "invalid-rows",
+        "duplicate-across-chunks",
+        "duplicate-before-invalid",
+        "duplicate-in-chunk",
+        "empty",
+    ],
+)
+def test_chunked_validation_matches_sequential(rows):
+    expected = _validate_outcome(rows)
+
+    assert _validate_outcome(rows, workers=2, chunk_size=4) == expected
+
+
+def test_chunked_validation_builds_the_row_validator_only_in_workers():
+    rows = _build_rows(9)
+    expected = _validate_outcome(rows)
+
+    # Workers come from a forkserver, so the parent's patch does not reach them.
+    with patch.object(FileValidator, "_build_row_validator", side_effect=AssertionError("built in the parent")):
+        assert _validate_outcome(rows, workers=2, chunk_size=4) == expected
+
+
+def test_chunked_validation_rejects_invalid_template():
+    validator = FileValidator(SimpleNamespace(template=None), [], ["SKU"], [["SKU-1"]], workers=2)
+    with pytest.raises(serializers.ValidationError) as exc:
+        validator.validate()
+
+    assert "Invalid template schema." in str(exc.value.detail)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_error_budget_reports_failing_rows_and_keeps_valid_ones(workers):
+    rows = _build_rows(
+        23,
+        sku=lambda index: "SKU-3" if index == 19 else f"SKU-{index}",
+        price=lambda index: "x" if index in (5, 12) else "399.00",
+    )
+    reported = []
+
+    validated, error = _validate_outcome(
+        rows, workers=workers, chunk_size=4, error_budget=3, on_error=reported.append
+    )
+
+    assert error is None
+    assert [row["sku"] for row in validated] == [f"SKU-{index}" for index in range(23) if index not in (5, 12, 19)]
+    assert [report["row"] for report in reported] == [5, 12, 19]
+    assert reported[2] == {"row": 19, "field": "sku", "error": "Duplicate value for unique field."}
+
+
+def test_error_budget_aborts_once_exceeded():
+    rows = _build_rows(10, price=lambda index: "x" if index in (2, 4, 6) else "399.00")
+    reported = []
+
+    validated, error = _validate_outcome(rows, error_budget=2, on_error=reported.append)
+
+    assert [report["row"] for report in reported] == [2, 4, 6]
+    assert error == {"row": "6", "error": "More than 2 rows failed validation."}
+    assert len(validated) == 4
@@ -0,0 +1,60 @@
+import pytest
+
+from core.minio import MinioUploadStream, UploadAborted
+
+
+class FakeClient:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.parts = []
+        self.error = None
+
+    def put_object(self, bucket_name, object_name, data, length, part_size, num_parallel_uploads):
+        assert length == -1
+        try:
+            while True:
+                if self.fail:
+                    raise ConnectionError("connection reset")
+                part = data.read(part_size)
+                if part:
+                    self.parts.append(part)
+                if len(part) < part_size:
+                    return object_name
+        except Exception as exc:
+            self.error = exc
+            raise
+
+
+def test_upload_stream_sends_fixed_size_parts_on_commit():
+    client = FakeClient()
+
+    with MinioUploadStream(client, "bucket", "out.csv", part_size=4) as stream:
+        stream.write(b"abc")
+        stream.write(b"defgh")
+        stream.write(b"ij")
+
+    assert client.parts == [b"abcd", b"efgh", b"ij"]
+    assert stream.closed
+
+
+def test_upload_stream_aborts_when_block_raises():
+    client = FakeClient()
+
+    with pytest.raises(ValueError):
+        with MinioUploadStream(client, "bucket", "out.csv", part_size=4) as stream:
+            stream.write(b"abcdefgh")
+            raise ValueError("bad row")
+
+    assert isinstance(client.error, UploadAborted)
+    assert stream.closed
+
+
+def test_upload_stream_surfaces_upload_errors():
+    client = FakeClient(fail=True)
+
+    with pytest.raises(OSError):
+        with MinioUploadStream(client, "bucket", "out.csv", part_size=4) as stream:
+            for _ in range(100):
+                stream.write(b"abcd")
+
+    assert isinstance(client.error, ConnectionError)
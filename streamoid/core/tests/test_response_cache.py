@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from core.constants import RESPONSE_CACHE_ALIAS
+from core.response_cache import ResponseCache
+from mapping.models import Mappings
+from mapping.services.mapping_claims import MappingClaimService
+from marketplace.models import Marketplace, MarketplaceTempate
+from seller.constants import CSV
+from seller.models import Seller, SellerFiles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    # Caching is off by default unless the cache is shared between processes.
+    settings.RESPONSE_CACHE_TTLS = {
+        "sellers": 60,
+        "seller_files": 10,
+        "marketplaces": 300,
+        "marketplace_templates": 300,
+        "mappings": 5,
+    }
+    caches[RESPONSE_CACHE_ALIAS].clear()
+    yield
+    caches[RESPONSE_CACHE_ALIAS].clear()
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def template():
+    marketplace = Marketplace.objects.create(name="Demo Marketplace")
+    return MarketplaceTempate.objects.create(marketplace=marketplace, template={"sku": {"type": "string"}})
+
+
+def _template_url(template):
+    return f"/api/v1/marketplace/templates/{template.id}/?marketplace_id={template.marketplace_id}"
+
+
+def test_second_read_is_served_from_cache(client, template, django_assert_num_queries):
+    first = client.get(_template_url(template))
+    assert first.status_code == 200
+
+    # Only the conditional-GET version check (marketplace lookup + aggregate) reaches the database.
+    with django_assert_num_queries(2):
+        second = client.get(_template_url(template))
+
+    assert second.json() == first.json()
+    assert ResponseCache.stats()["marketplace_templates"] == {"hits": 1, "misses": 1}
+
+
+def test_query_params_are_part_of_the_key(client, template):
+    full = client.get(_template_url(template)).json()
+    sparse = client.get(_template_url(template) + "&fields=id").json()
+
+    assert sparse["data"] == [{"id": template.id}]
+    assert "template" in full["data"][0]
+
+
+def test_save_and_delete_invalidate_dependent_endpoints(client, template):
+    client.get(_template_url(template))
+
+    template.template = {"sku": {"type": "integer"}}
+    template.save()
+    assert client.get(_template_url(template)).json()["data"][0]["template"] == {"sku": {"type": "integer"}}
+
+    template.marketplace.delete()
+    assert client.get("/api/v1/marketplace/").json()["data"] == []
+
+
+def test_bulk_claims_invalidate_mapping_responses(client, template):
+    seller = Seller.objects.create(name="Demo Seller")
+    seller_file = SellerFiles.objects.create(seller=seller, name="items.csv", file_type=CSV, path="b/items.csv")
+    mapping = Mappings.objects.create(marketplace_template=template, seller_file=seller_file, mappings=[])
+    url = f"/api/v1/mapping/{mapping.id}/"
+    assert client.get(url).json()["data"][0]["evaluation_status"] == "pending"
+
+    MappingClaimService(owner="worker-a").claim_group_ids(batch_size=1)
+
+    assert client.get(url).json()["data"][0]["evaluation_status"] == "processing"
+
+
+def test_error_responses_are_not_cached(client, template):
+    url = f"/api/v1/marketplace/templates/{template.id + 1}/?marketplace_id={template.marketplace_id}"
+    assert client.get(url).status_code == 404
+    assert client.get(url).status_code == 404
+
+    assert ResponseCache.stats()["marketplace_templates"] == {"hits": 0, "misses": 2}
+
+
+def test_stats_command_prints_hit_rate_per_endpoint(client, template):
+    url = f"/api/v1/marketplace/templates/?marketplace_id={template.marketplace_id}"
+    client.get(url)
+    client.get(url)
+    output = StringIO()
+
+    call_command("response_cache_stats", stdout=output)
+
+    assert "marketplace_templates: hits=1 misses=1 hit_rate=50.0%" in output.getvalue()
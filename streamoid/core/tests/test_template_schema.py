@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.template_schema import (
+    TEMPLATE_SCHEMA_VERSION,
+    TemplateSchemaError,
+    get_template_schema,
+    normalize_template,
+)
+from marketplace.models import Marketplace, MarketplaceTempate
+
+TEMPLATE = {
+    "sku": {"type": "String", "unique": "true", "required": True, "maxLength": 20},
+    "mrp": {"type": "float", "min_value": 0, "required": "yes"},
+    "price": {"type": "number", "min": "0", "max": "$mrp"},
+    "gender": {"type": "choice", "choices": ["Men", "Women"]},
+    "images": {"type": "list", "items": {"type": "uri"}},
+    "notes": {"type": "markdown"},
+}
+
+
+def _field(schema, name):
+    return next(field for field in schema["fields"] if field["name"] == name)
+
+
+def test_normalize_resolves_types_bounds_and_flags():
+    schema = normalize_template(TEMPLATE)
+
+    assert schema["version"] == TEMPLATE_SCHEMA_VERSION
+    assert [field["name"] for field in schema["fields"]] == list(TEMPLATE)
+    assert _field(schema, "sku") == {
+        "name": "sku",
+        "type": "string",
+        "required": True,
+        "unique": True,
+        "is_list": False,
+        "min_reference": None,
+        "min_reference_measure": None,
+        "min_length": None,
+        "max_reference": None,
+        "max_reference_measure": None,
+        "max_length": 20,
+    }
+    mrp = _field(schema, "mrp")
+    assert (mrp["type"], mrp["required"], mrp["min_value"], mrp["max_digits"]) == ("number", True, 0, 12)
+    assert _field(schema, "gender")["type"] == "enum"
+    assert _field(schema, "images")["items"] == {"type": "url"}
+    assert _field(schema, "notes")["type"] is None
+    assert schema["unique_fields"] == ["sku"]
+    assert schema["list_fields"] == ["images"]
+
+
+def test_normalize_separates_references_from_literal_bounds():
+    price = _field(normalize_template(TEMPLATE), "price")
+
+    assert (price["min_value"], price["min_reference"]) == ("0", None)
+    assert (price["max_value"], price["max_reference"]) == (None, "mrp")
+    assert normalize_template(TEMPLATE)["references"] == [
+        {"field": "price", "bound": "max", "reference": "mrp", "measure": "value"}
+    ]
+
+
+def test_length_keys_reference_lengths_and_short_keys_reference_values():
+    template = {
+        "title": {"type": "string", "maxLength": "$name", "min": "$code"},
+        "code": {"type": "string", "min_length": "$limit"},
+        "name": {"type": "string"},
+        "limit": {"type": "number"},
+    }
+
+    references = normalize_template(template)["references"]
+
+    assert [(reference["field"], reference["bound"], reference["measure"]) for reference in references] == [
+        ("code", "min", "length"),
+        ("title", "min", "value"),
+        ("title", "max", "length"),
+    ]
+
+
+def test_references_are_ordered_by_dependency():
+    template = {
+        "sale": {"type": "number", "max": "$price"},
+        "price": {"type": "number", "max": "$mrp"},
+        "mrp": {"type": "number", "min": "$cost"},
+        "cost": {"type": "number"},
+        "ends": {"type": "string", "min": "$starts"},
+        "starts": {"type": "string"},
+    }
+
+    references = normalize_template(template)["references"]
+
+    assert [reference["field"] for reference in references] == ["mrp", "price", "sale", "ends"]
+
+
+@pytest.mark.parametrize(
+    "template, message",
+    [
+        ({"a": {"type": "number", "min": "$a"}}, "a -> a"),
+        (
+            {
+                "a": {"type": "number", "max": "$b"},
+                "b": {"type": "number", "max": "$c"},
+                "c": {"type": "number", "min": "$a"},
+            },
+            "a -> b -> c -> a",
+        ),
+        ({"a": {"type": "number", "max": "$b"}, "b": {"type": "string"}}, "cannot be compared"),
+        ({"a": {"type": "string", "max": "$b"}, "b": {"type": "number"}}, "cannot be compared"),
+        ({"a": {"type": "string", "maxLength": "$b"}, "b": {"type": "enum"}}, "cannot be compared"),
+    ],
+)
+def test_invalid_references_are_rejected(template, message):
+    with pytest.raises(TemplateSchemaError, match=message):
+        normalize_template(template)
+
+
+@pytest.mark.parametrize(
+    "template", [None, [], {"sku": "string"}, {"sku": {"type": 1}}, {"n": {"type": "array", "items": "url"}}]
+)
+def test_normalize_rejects_invalid_templates(template):
+    with pytest.raises(TemplateSchemaError):
+        normalize_template(template)
+
+
+def test_get_template_schema_recomputes_outdated_schemas():
+    stored = {"version": TEMPLATE_SCHEMA_VERSION, "fields": [], "references": []}
+
+    assert get_template_schema(SimpleNamespace(template=TEMPLATE, schema=stored)) is stored
+    outdated = SimpleNamespace(template=TEMPLATE, schema={"version": 0})
+    assert get_template_schema(outdated) == normalize_template(TEMPLATE)
+    assert get_template_schema(SimpleNamespace(template=TEMPLATE)) == normalize_template(TEMPLATE)
+
+
+@pytest.mark.django_db
+def test_schema_is_persisted_and_kept_in_sync_on_save():
+    marketplace = Marketplace.objects.create(name="Myntra")
+    marketplace_template = MarketplaceTempate.objects.create(marketplace=marketplace, template=TEMPLATE)
+
+    marketplace_template.refresh_from_db()
+    assert marketplace_template.schema == normalize_template(TEMPLATE)
+
+    marketplace_template.template = {"sku": {"type": "string"}}
+    marketplace_template.save(update_fields=["template"])
+    marketplace_template.refresh_from_db()
+    assert [field["name"] for field in marketplace_template.schema["fields"]] == ["sku"]
+
+    marketplace_template.template = {"sku": "string"}
+    marketplace_template.save()
+    marketplace_template.refresh_from_db()
+    assert marketplace_template.schema == {}
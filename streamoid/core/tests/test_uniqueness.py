@@ -0,0 +1,103 @@
+import os
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from rest_framework import serializers
+
+from core.constants import UNIQUENESS_TRACKER_DIGEST, UNIQUENESS_TRACKER_MEMORY, UNIQUENESS_TRACKER_SPILL
+from core.file_validation import FileValidator
+from core.uniqueness import (
+    RECORD_LENGTH,
+    DigestUniquenessTracker,
+    SpillingUniquenessTracker,
+    build_uniqueness_tracker,
+    encode_unique_value,
+)
+
+TRACKERS = [UNIQUENESS_TRACKER_MEMORY, UNIQUENESS_TRACKER_DIGEST, UNIQUENESS_TRACKER_SPILL]
+
+
+@pytest.mark.parametrize("kind", TRACKERS)
+def test_trackers_report_values_seen_before(kind):
+    with build_uniqueness_tracker(kind) as tracker:
+        assert [tracker.add(value) for value in ("A", "B", "A", Decimal("1.0"), Decimal("1.00"), "1")] == [
+            True,
+            True,
+            False,
+            True,
+            False,
+            True,
+        ]
+
+
+def test_encoded_values_follow_set_equality():
+    assert encode_unique_value(Decimal("1.0")) == encode_unique_value(Decimal("1"))
+    assert encode_unique_value(Decimal("-0.00")) == encode_unique_value(Decimal("0"))
+    assert encode_unique_value(1) != encode_unique_value("1")
+
+
+def test_digest_tracker_grows_and_keeps_every_value():
+    with DigestUniquenessTracker(initial_capacity=4) as tracker:
+        assert all(tracker.add(f"SKU-{index}") for index in range(1000))
+        assert not tracker.add("SKU-500")
+        assert len(tracker._digests) >= 1000 / tracker.MAX_LOAD
+
+
+def test_digest_collisions_are_confirmed_against_the_values(monkeypatch):
+    monkeypatch.setattr(DigestUniquenessTracker, "_digest", staticmethod(lambda encoded: 7))
+
+    with DigestUniquenessTracker() as tracker:
+        assert tracker.add("A")
+        assert tracker.add("B")
+        assert tracker.add("C")
+        assert not tracker.add("B")
+        assert not tracker.add("C")
+
+
+def test_digest_tracker_reads_only_the_record_of_a_matching_digest(monkeypatch):
+    with DigestUniquenessTracker() as tracker:
+        for index in range(100):
+            tracker.add(f"SKU-{index}")
+        reads = []
+        read = tracker._values.read
+        monkeypatch.setattr(tracker._values, "read", lambda size=-1: reads.append(size) or read(size))
+
+        assert not tracker.add("SKU-50")
+        assert reads == [RECORD_LENGTH.size, len(encode_unique_value("SKU-50"))]
+
+
+def test_spilling_tracker_moves_values_to_sqlite():
+    tracker = SpillingUniquenessTracker(spill_bytes=500)
+
+    assert all(tracker.add(f"SKU-{index}") for index in range(20))
+    assert tracker.spilled
+    assert not tracker.add("SKU-3")
+    assert not tracker.add("SKU-19")
+    assert tracker.add("SKU-20")
+
+    directory = tracker._directory
+    tracker.close()
+    assert not os.path.exists(directory)
+
+
+@pytest.mark.parametrize("kind", TRACKERS)
+@pytest.mark.parametrize("workers", [1, 2])
+def test_file_validator_reports_same_duplicate_row_with_every_tracker(settings, kind, workers):
+    settings.UNIQUENESS_TRACKER = kind
+    settings.UNIQUENESS_SPILL_BYTES = 200
+    template = SimpleNamespace(template={"sku": {"type": "string", "unique": True}, "tags": {"type": "array"}})
+    rows = [[f"SKU-{index}", "x"] for index in range(50)] + [["SKU-7", "x"]]
+    validator = FileValidator(
+        template,
+        [{"seller": "SKU", "marketplace": "sku"}, {"seller": "Tag", "marketplace": "tags"}],
+        ["SKU", "Tag"],
+        rows,
+        workers=workers,
+        chunk_size=8,
+    )
+
+    with pytest.raises(serializers.ValidationError) as exc_info:
+        validator.validate()
+
+    assert exc_info.value.detail == {"row": "50", "field": "sku", "error": "Duplicate value for unique field."}
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.compiled_validation import CompiledValidator
+from core.custom_validation import CustomValidatior
+from core.validator_cache import ValidatorCache, validator_cache
+from marketplace.models import Marketplace, MarketplaceTempate
+
+TEMPLATE = {"sku": {"type": "string", "required": True}, "mrp": {"type": "number", "min": 0}}
+
+
+@pytest.fixture(autouse=True)
+def clear_validator_cache():
+    validator_cache.clear()
+    yield
+    validator_cache.clear()
+
+
+def test_same_rules_reuse_the_built_validator():
+    first = CompiledValidator.cached(SimpleNamespace(template=dict(TEMPLATE)))
+    second = CompiledValidator.cached(SimpleNamespace(template=dict(reversed(TEMPLATE.items()))))
+
+    assert first is second
+    assert (validator_cache.hits, validator_cache.misses) == (1, 1)
+    assert first({"sku": "A1", "mrp": "10"})[1] is None
+
+
+def test_builders_and_rules_are_keyed_separately():
+    compiled = CompiledValidator.cached(SimpleNamespace(template=TEMPLATE))
+    serializer_class = CustomValidatior.cached(SimpleNamespace(template=TEMPLATE))
+    changed = CompiledValidator.cached(SimpleNamespace(template={**TEMPLATE, "brand": {"type": "string"}}))
+
+    assert compiled is not serializer_class
+    assert changed is not compiled
+    assert len(validator_cache) == 3
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = ValidatorCache(max_entries=2)
+    templates = [SimpleNamespace(template={f"field_{index}": {"type": "string"}}) for index in range(3)]
+    first = cache.get_or_build(CompiledValidator, templates[0])
+    cache.get_or_build(CompiledValidator, templates[1])
+    cache.get_or_build(CompiledValidator, templates[0])
+    cache.get_or_build(CompiledValidator, templates[2])
+
+    assert len(cache) == 2
+    assert cache.get_or_build(CompiledValidator, templates[0]) is first
+    assert cache.misses == 3
+
+
+def test_evicted_entries_leave_the_template_index():
+    cache = ValidatorCache(max_entries=1)
+    shared = {"sku": {"type": "string"}}
+    cache.get_or_build(CompiledValidator, SimpleNamespace(id=1, template=shared))
+    cache.get_or_build(CompiledValidator, SimpleNamespace(id=2, template=shared))
+    cache.get_or_build(CompiledValidator, SimpleNamespace(id=3, template={"brand": {"type": "string"}}))
+
+    assert len(cache) == 1
+    assert list(cache._keys_by_template_id) == [3]
+    assert len(cache._template_ids_by_key) == 1
+
+    cache.invalidate(3)
+    assert (len(cache), cache._keys_by_template_id, cache._template_ids_by_key) == (0, {}, {})
+
+
+def test_failed_builds_are_not_cached():
+    invalid = SimpleNamespace(template={"sku": "not-a-rule-dict"})
+
+    assert CompiledValidator.cached(invalid) is None
+    assert len(validator_cache) == 0
+
+
+@pytest.mark.django_db
+def test_saving_a_template_drops_its_entries():
+    marketplace = Marketplace.objects.create(name="Demo Marketplace")
+    template = MarketplaceTempate.objects.create(marketplace=marketplace, template=TEMPLATE)
+    CompiledValidator.cached(template)
+    assert len(validator_cache) == 1
+
+    template.template = {"sku": {"type": "string"}}
+    template.save()
+
+    assert len(validator_cache) == 0
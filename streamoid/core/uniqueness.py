@@ -0,0 +1,211 @@
+import hashlib
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+from array import array
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from loguru import logger
+
+from core.constants import UNIQUENESS_TRACKER_DIGEST, UNIQUENESS_TRACKER_MEMORY, UNIQUENESS_TRACKER_SPILL
+
+log = logger.bind(component="uniqueness")
+
+# Rough per-entry cost of a `set` slot on top of the value itself.
+SET_ENTRY_OVERHEAD = 32
+RECORD_LENGTH = struct.Struct("<I")
+
+
+def encode_unique_value(value) -> bytes:
+    """
+    Encode a validated value so that equal values (as a `set` would compare them) get equal bytes.
+    The type is part of the key, so `1` and `"1"` stay distinct. Validated values are never
+    bytes, so bytes are taken to be encoded already.
+    """
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return b"s:" + value.encode("utf-8", "surrogatepass")
+    if isinstance(value, Decimal):
+        # `Decimal("1.0") == Decimal("1")` and `-0 == 0`; normalize both away.
+        return b"d:" + str((value + 0).normalize()).encode("ascii")
+    return f"{type(value).__name__}:{value!r}".encode("utf-8", "surrogatepass")
+
+
+class UniquenessTracker:
+    """Remember the values of one `unique` column; `add` returns False for a value seen before."""
+
+    def add(self, value) -> bool:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemoryUniquenessTracker(UniquenessTracker):
+    """Exact `set` of the values; fastest, but memory grows with every distinct value."""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, value) -> bool:
+        if value in self._seen:
+            return False
+        self._seen.add(value)
+        return True
+
+
+class DigestUniquenessTracker(UniquenessTracker):
+    """
+    Open-addressing table of 8-byte BLAKE2b digests packed in an `array`, with the file
+    offset of each value in a parallel `array`, so memory stays at 21-43 bytes per value
+    whatever the value length. Values are appended to a temporary file; a matching digest
+    is confirmed by reading back the one record its slot points to, so digest collisions
+    never fail a row and a duplicate costs a single seek and read.
+    """
+
+    EMPTY = 0
+    MAX_LOAD = 0.75
+
+    def __init__(self, initial_capacity: int = 1024):
+        capacity = 1 << max(initial_capacity - 1, 1).bit_length()
+        self._digests = array("Q", bytes(8 * capacity))
+        self._offsets = array("Q", bytes(8 * capacity))
+        self._count = 0
+        self._values = tempfile.TemporaryFile()
+        self._end = 0
+
+    @staticmethod
+    def _digest(encoded: bytes) -> int:
+        # 0 marks an empty slot.
+        return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little") or 1
+
+    def add(self, value) -> bool:
+        encoded = encode_unique_value(value)
+        digest = self._digest(encoded)
+        digests = self._digests
+        mask = len(digests) - 1
+        index = digest & mask
+        while (slot := digests[index]) != self.EMPTY:
+            # A different value with the same digest is stored alongside; keep probing.
+            if slot == digest and self._matches(self._offsets[index], encoded):
+                return False
+            index = (index + 1) & mask
+        digests[index] = digest
+        self._offsets[index] = self._append(encoded)
+        self._count += 1
+        if self._count > len(digests) * self.MAX_LOAD:
+            self._grow()
+        return True
+
+    def _append(self, encoded: bytes) -> int:
+        offset = self._end
+        self._values.seek(offset)
+        self._values.write(RECORD_LENGTH.pack(len(encoded)))
+        self._values.write(encoded)
+        self._end = self._values.tell()
+        return offset
+
+    def _matches(self, offset: int, encoded: bytes) -> bool:
+        self._values.seek(offset)
+        (length,) = RECORD_LENGTH.unpack(self._values.read(RECORD_LENGTH.size))
+        return length == len(encoded) and self._values.read(length) == encoded
+
+    def _grow(self) -> None:
+        digests = array("Q", bytes(16 * len(self._digests)))
+        offsets = array("Q", bytes(16 * len(self._offsets)))
+        mask = len(digests) - 1
+        for digest, offset in zip(self._digests, self._offsets):
+            if digest == self.EMPTY:
+                continue
+            index = digest & mask
+            while digests[index] != self.EMPTY:
+                index = (index + 1) & mask
+            digests[index] = digest
+            offsets[index] = offset
+        self._digests = digests
+        self._offsets = offsets
+
+    def close(self) -> None:
+        self._values.close()
+
+
+class SpillingUniquenessTracker(UniquenessTracker):
+    """
+    Exact `set` until its estimated size crosses `spill_bytes`, then an on-disk SQLite
+    index in a temporary directory. Small files never touch disk; large ones keep a
+    bounded footprint at the cost of one indexed insert per value.
+    """
+
+    def __init__(self, spill_bytes: int | None = None):
+        self.spill_bytes = settings.UNIQUENESS_SPILL_BYTES if spill_bytes is None else spill_bytes
+        self._seen = set()
+        self._bytes = 0
+        self._directory = None
+        self._db = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._db is not None
+
+    def add(self, value) -> bool:
+        if self._db is not None:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO seen (value) VALUES (?)", (encode_unique_value(value),)
+            )
+            return cursor.rowcount == 1
+        if value in self._seen:
+            return False
+        self._seen.add(value)
+        self._bytes += sys.getsizeof(value) + SET_ENTRY_OVERHEAD
+        if self._bytes > self.spill_bytes:
+            self._spill()
+        return True
+
+    def _spill(self) -> None:
+        self._directory = tempfile.mkdtemp(prefix="streamoid-unique-")
+        self._db = sqlite3.connect(Path(self._directory) / "seen.sqlite3", isolation_level=None)
+        # Scratch data: nothing needs to survive a crash.
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("CREATE TABLE seen (value BLOB PRIMARY KEY) WITHOUT ROWID")
+        # Left open: one transaction for the whole file avoids a commit per insert.
+        self._db.execute("BEGIN")
+        self._db.executemany(
+            "INSERT INTO seen (value) VALUES (?)", ((encode_unique_value(value),) for value in self._seen)
+        )
+        log.info("Spilled {} unique values ({} bytes) to {}", len(self._seen), self._bytes, self._directory)
+        self._seen = set()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+UNIQUENESS_TRACKERS = {
+    UNIQUENESS_TRACKER_MEMORY: MemoryUniquenessTracker,
+    UNIQUENESS_TRACKER_DIGEST: DigestUniquenessTracker,
+    UNIQUENESS_TRACKER_SPILL: SpillingUniquenessTracker,
+}
+
+
+def build_uniqueness_tracker(kind: str | None = None) -> UniquenessTracker:
+    kind = kind or settings.UNIQUENESS_TRACKER
+    tracker_class = UNIQUENESS_TRACKERS.get(kind)
+    if tracker_class is None:
+        raise ValueError(f"Unsupported uniqueness tracker: {kind}")
+    return tracker_class()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from loguru import logger
+
+log = logger.bind(component="validator_cache")
+
+
+class ValidatorCache:
+    """
+    Process-wide LRU of built row validators.
+    Entries are keyed by the builder class and a hash of the template JSON, so
+    unsaved templates (serializer validation) share entries with saved ones and
+    an edited template can never be served a validator built from old rules.
+    Saving or deleting a template drops the entries built for it to free memory.
+    Worker processes start from a forkserver and build their own entries.
+    """
+
+    def __init__(self, max_entries: int | None = None):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        # Both directions, so an evicted key also leaves the templates that share it.
+        self._keys_by_template_id = {}
+        self._template_ids_by_key = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self) -> int:
+        return settings.VALIDATOR_CACHE_MAX_ENTRIES if self._max_entries is None else self._max_entries
+
+    @staticmethod
+    def build_key(builder_class, template: dict) -> tuple:
+        content = json.dumps(template, sort_keys=True, separators=(",", ":"), default=str)
+        return builder_class.__qualname__, hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_or_build(self, builder_class, marketplace_template):
+        """Return `builder_class(template=...).build()`, reusing a cached result when possible."""
+        template = marketplace_template.template or {}
+        try:
+            key = self.build_key(builder_class, template)
+        except (TypeError, ValueError):
+            # Not JSON-serializable; build() will reject it anyway.
+            return builder_class(template=marketplace_template).build()
+
+        with self._lock:
+            validator = self._entries.get(key)
+            if validator is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return validator
+            self.misses += 1
+
+        validator = builder_class(template=marketplace_template).build()
+        if validator is None or self.max_entries <= 0:
+            # Failed builds are not cached; the template is invalid and gets rebuilt to report it.
+            return validator
+
+        template_id = getattr(marketplace_template, "id", None)
+        with self._lock:
+            self._entries[key] = validator
+            self._entries.move_to_end(key)
+            if template_id is not None:
+                self._keys_by_template_id.setdefault(template_id, set()).add(key)
+                self._template_ids_by_key.setdefault(key, set()).add(template_id)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+        return validator
+
+    def _discard(self, key) -> None:
+        # Callers hold the lock.
+        self._entries.pop(key, None)
+        for template_id in self._template_ids_by_key.pop(key, ()):
+            keys = self._keys_by_template_id.get(template_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_template_id[template_id]
+
+    def invalidate(self, template_id) -> None:
+        with self._lock:
+            for key in list(self._keys_by_template_id.get(template_id, ())):
+                self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_template_id.clear()
+            self._template_ids_by_key.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+validator_cache = ValidatorCache()
+
+
+def invalidate_template_validators(sender, instance, **kwargs):
+    validator_cache.invalidate(instance.id)
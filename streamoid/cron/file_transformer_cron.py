@@ -1,82 +1,495 @@
 import csv
 import json
+import shutil
+import time
 from collections.abc import Iterable
-from io import BytesIO, TextIOWrapper
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import ExitStack, contextmanager
+from io import BufferedReader, BufferedWriter, TextIOWrapper
+from itertools import batched
 from pathlib import Path
-from tempfile import SpooledTemporaryFile
+from queue import Full, Queue
+from tempfile import NamedTemporaryFile
+from threading import Event, Thread
+from typing import BinaryIO
 
+from django.conf import settings
+from django.db import connections
 from loguru import logger
 from openpyxl import Workbook, load_workbook
 
 from core.file_validation import validate_file_iter
 from core.minio import MinioHandler
-from mapping.constants import EVALUATION_STATUS_FAILED, EVALUATION_STATUS_SUCCESS, TRANSFORMED_FOLDER
+from core.process_pool import process_pool
+from core.template_schema import get_template_schema
+from mapping.constants import (
+    EVALUATION_STATUS_FAILED,
+    EVALUATION_STATUS_PROCESSING,
+    EVALUATION_STATUS_SUCCESS,
+)
 from mapping.models import Mappings
-from seller.constants import CSV, MAX_FILE_SIZE, XLSX
+from mapping.services.error_report import ErrorReportService
+from mapping.services.mapping_claims import MappingClaimService
+from mapping.services.row_manifest import RowManifestService
+from mapping.services.transform_cache import TransformCacheService
+from mapping.services.unique_index import UniqueValueIndexService
+from seller.constants import CSV, STREAM_CHUNK_SIZE, XLSX
 from seller.file_parser import FileParser
 
 log = logger.bind(component="file_transformer_cron")
 
+JOB_STATUS_SKIPPED = "skipped"
+JOB_STATUS_CRASHED = "crashed"
+MAPPING_RESULT_FIELDS = [
+    "evaluation_status",
+    "transformed_file_path",
+    "lease_owner",
+    "lease_expires_at",
+    "valid_rows_count",
+    "error_rows_count",
+    "error_report_path",
+    "updated_at",
+]
+# Mappings of one seller file share a single read: rows are handed to each mapping's thread in
+# batches, with at most FAN_OUT_QUEUE_BATCHES batches waiting per mapping.
+FAN_OUT_BATCH_ROWS = 500
+FAN_OUT_QUEUE_BATCHES = 4
+FAN_OUT_POLL_SECONDS = 1
+# Leases of a group being transformed are renewed this many times per lease period.
+LEASE_RENEWALS_PER_LEASE = 3
+_END_OF_ROWS = object()
 
-class FileTransformerCron:
-    """Stream validation/output generation to avoid loading all rows into memory."""
 
-    @classmethod
-    def run(cls):
-        pending_mappings = (
-            Mappings.objects.filter(evaluation_status="pending")
-            .select_related("marketplace_template", "seller_file")
-            .iterator()
+def _transform_group(mapping_ids: list[int], lease_owner: str) -> list[dict]:
+    started_at = time.monotonic()
+    mappings = list(
+        Mappings.objects.filter(
+            id__in=mapping_ids, evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner=lease_owner
         )
-        for mapping in pending_mappings:
-            cls._process_mapping(mapping)
+        .select_related("marketplace_template", "seller_file")
+        .order_by("id")
+    )
+    results = FileTransformerCron._timed_process_group(mappings, started_at) if mappings else []
+    processed_ids = {result["mapping_id"] for result in results}
+    skipped = [
+        {"mapping_id": mapping_id, "status": JOB_STATUS_SKIPPED, "duration": time.monotonic() - started_at}
+        for mapping_id in mapping_ids
+        if mapping_id not in processed_ids
+    ]
+    return results + skipped
 
-    @classmethod
-    def _process_mapping(cls, mapping: Mappings) -> None:
-        log_context = log.bind(mapping_id=mapping.id)
+
+def _never_stop() -> bool:
+    return False
+
+
+class RowFeed:
+    """
+    Bounded hand-off of parsed row batches from the shared reader to one mapping's
+    transform thread. The thread abandons its feed when it stops early, so a failed
+    mapping never blocks the reader or the other mappings.
+    """
+
+    def __init__(self, max_batches: int = FAN_OUT_QUEUE_BATCHES):
+        self._batches = Queue(maxsize=max_batches)
+        self.open = True
+
+    def put(self, item) -> None:
+        while self.open:
+            try:
+                self._batches.put(item, timeout=FAN_OUT_POLL_SECONDS)
+                return
+            except Full:
+                continue
+
+    def abandon(self) -> None:
+        self.open = False
+
+    def __iter__(self):
+        while True:
+            item = self._batches.get()
+            if item is _END_OF_ROWS:
+                return
+            if isinstance(item, Exception):
+                raise ValueError(f"Failed to read seller file rows: {item}") from item
+            yield from item
+
+
+class MappingTransformJob:
+    """
+    Transform one mapping from rows read by its group: output, error report, row
+    manifest and unique index. Failures are recorded on the mapping, never raised.
+    """
+
+    def __init__(self, mapping: Mappings):
+        self.mapping = mapping
+        self.log = log.bind(mapping_id=mapping.id)
+        self.claims = MappingClaimService(owner=mapping.lease_owner)
+        self.unique_index = None
+        self.done = False
+        # Set by `LeaseHeartbeat` once another worker has taken the mapping over.
+        self.lease_lost = False
+        mapping.valid_rows_count = None
+        mapping.error_rows_count = None
+        mapping.error_report_path = None
+
+    @property
+    def object_name(self) -> str:
+        return Mappings.transformed_object_name(
+            self.mapping.seller_file.name, self.mapping.marketplace_template_id
+        )
+
+    def prepare(self) -> bool:
+        """Return whether the file has to be read; a reusable cached output finishes the job."""
+        mapping = self.mapping
         try:
             seller_file = mapping.seller_file
             marketplace_template = mapping.marketplace_template
             if not seller_file or not marketplace_template:
                 raise ValueError("Mapping missing seller file or marketplace template.")
 
-            file_bytes = cls._read_file_bytes(seller_file)
-            if file_bytes is None:
-                raise ValueError("Failed to read seller file from storage.")
+            self.template_keys = [field["name"] for field in get_template_schema(marketplace_template)["fields"]]
+            self.bucket_name = seller_file.seller.bucket_name
+            self.unique_index = UniqueValueIndexService.for_mapping(mapping)
+            self.cache = TransformCacheService()
+            self.cache_key = None
+            if self.unique_index is None:
+                # A cached output carries no unique values, so indexed transforms always re-validate.
+                self.cache_key = self.cache.build_key(seller_file, marketplace_template, mapping.mappings)
+            cached_path = self.cache.lookup(self.cache_key) if self.cache_key else None
+            if cached_path:
+                self.log.info("Reusing cached transformation: {}", cached_path)
+                self._succeed(cached_path)
+                return False
 
-            template_keys = list((marketplace_template.template or {}).keys())
-            headers, rows = cls._parse_rows(file_bytes, seller_file.file_type)
-            # Stream validation/output to keep memory bounded for large files.
-            validated_rows = validate_file_iter(marketplace_template, mapping.mappings, headers, rows)
-            output_file = cls._build_transformed_file(template_keys, validated_rows, seller_file.file_type)
+            if self.unique_index is not None:
+                # Values from an earlier run of this mapping are replaced by this one.
+                self.unique_index.discard()
+        except Exception as exc:
+            self.fail(exc)
+            return False
+        return True
+
+    def transform(self, headers: list[str], rows: Iterable[list[str]], workers: int) -> None:
+        try:
+            self._transform(headers, rows, workers)
+        except Exception as exc:
+            self.fail(exc)
 
-            bucket_name = seller_file.seller.bucket_name
-            object_name = str(Path(TRANSFORMED_FOLDER).joinpath(seller_file.name))
-            transformed_path = str(Path(bucket_name).joinpath(object_name))
+    def _transform(self, headers, rows, workers) -> None:
+        mapping = self.mapping
+        bucket_name, object_name = self.bucket_name, self.object_name
+        error_report = ErrorReportService(bucket_name, object_name)
+        row_manifest = RowManifestService.for_mapping(mapping, self.template_keys, bucket_name, object_name)
+        try:
+            if row_manifest is not None:
+                # Indexed before the new output is opened, since it replaces the previous one.
+                row_manifest.load()
+            with ExitStack() as stack:
+                # Parts are uploaded while rows are validated; an exception aborts the upload.
+                output_stream = stack.enter_context(MinioHandler().open_upload_stream(bucket_name, object_name))
+                if row_manifest is not None:
+                    # Exits first, so the manifest is committed only if the output will be.
+                    stack.enter_context(row_manifest.open_writer())
+                validated_rows = validate_file_iter(
+                    mapping.marketplace_template,
+                    mapping.mappings,
+                    headers,
+                    rows,
+                    workers=workers,
+                    unique_index=self.unique_index,
+                    error_budget=settings.VALIDATION_ERROR_BUDGET,
+                    on_error=error_report.write,
+                    row_manifest=row_manifest,
+                )
+                mapping.valid_rows_count = FileTransformerCron._write_transformed_file(
+                    self.template_keys, validated_rows, mapping.seller_file.file_type, output_stream
+                )
+                if error_report.count and not settings.VALIDATION_EMIT_VALID_ROWS:
+                    # Raised inside the stack so the partial output is not uploaded.
+                    raise ValueError(f"{error_report.count} rows failed validation.")
+                if self.lease_lost:
+                    raise ValueError("Mapping lease expired and was claimed by another worker.")
+        finally:
+            # Errors collected before a failure are still reported.
+            mapping.error_rows_count = error_report.count
+            error_report.close()
+            mapping.error_report_path = error_report.path
+            if row_manifest is not None:
+                row_manifest.close()
 
+        output_etag = getattr(output_stream.result, "etag", None)
+        if self.cache_key and not error_report.count:
+            self.cache.store(self.cache_key, bucket_name, object_name, output_etag)
+        if row_manifest is not None:
+            row_manifest.store(output_etag)
+        if self.unique_index is not None:
+            self.unique_index.activate()
+        self._succeed(str(Path(bucket_name).joinpath(object_name)))
+
+    def _succeed(self, transformed_path: str) -> None:
+        self.mapping.evaluation_status = EVALUATION_STATUS_SUCCESS
+        self.mapping.transformed_file_path = transformed_path
+        self.done = True
+
+    def fail(self, exc: Exception) -> None:
+        self.mapping.evaluation_status = EVALUATION_STATUS_FAILED
+        self.mapping.transformed_file_path = None
+        self.done = True
+        self.log.exception("File transformation failed: {}", exc)
+        # Staged values belong to the mapping, so a taken-over job leaves them to the new owner.
+        if self.unique_index is not None and not self.lease_lost:
             try:
-                is_stored = MinioHandler().store_file(bucket_name, object_name, output_file)
-                if not is_stored:
-                    raise ValueError("Failed to store transformed file.")
-            finally:
-                output_file.close()
+                self.unique_index.discard()
+            except Exception as discard_exc:
+                # Staged rows stay inactive, so they never block other files.
+                self.log.warning(f"Failed to discard staged unique values | Error: {discard_exc}")
+
+    def save(self) -> None:
+        if not self.claims.finish(self.mapping, MAPPING_RESULT_FIELDS):
+            self.log.warning(
+                "Mapping lease was taken over; dropping the {} result", self.mapping.evaluation_status
+            )
+            return
+        self.mapping.lease_owner = None
+        self.mapping.lease_expires_at = None
+
+
+class LeaseHeartbeat:
+    """
+    Renew the leases of a group's mappings while they are transformed, so a long
+    transform is not returned to `pending` and claimed again. Jobs whose lease was
+    lost anyway (e.g. the worker stalled) are marked and never publish their result.
+    """
+
+    def __init__(self, jobs: list[MappingTransformJob]):
+        self.jobs = jobs
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, daemon=True)
 
-            mapping.evaluation_status = EVALUATION_STATUS_SUCCESS
-            mapping.transformed_file_path = transformed_path
+    def __enter__(self):
+        if self.jobs:
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        return False
+
+    def _run(self) -> None:
+        claims = self.jobs[0].claims
+        try:
+            while not self._stopped.wait(claims.lease_seconds / LEASE_RENEWALS_PER_LEASE):
+                self.renew(claims)
+        finally:
+            connections.close_all()
+
+    def renew(self, claims: MappingClaimService) -> None:
+        held = [job for job in self.jobs if not job.lease_lost]
+        try:
+            renewed = set(claims.renew([job.mapping.id for job in held]))
         except Exception as exc:
-            mapping.evaluation_status = EVALUATION_STATUS_FAILED
-            mapping.transformed_file_path = None
-            log_context.exception("File transformation failed: {}", exc)
+            # The next beat retries; the lease only lapses if renewals keep failing.
+            log.warning(f"Failed to renew mapping leases | Error: {exc}")
+            return
+        for job in held:
+            if job.mapping.id not in renewed:
+                job.lease_lost = True
+                job.log.warning("Mapping lease was lost during the transform")
+
+
+class FileTransformerCron:
+    """Stream validation/output generation to avoid loading all rows into memory."""
+
+    @classmethod
+    def run(cls, workers: int | None = None) -> list[dict]:
+        cls.reap()
+        return cls.process_pending(workers)
+
+    @staticmethod
+    def reap() -> None:
+        MappingClaimService.release_expired()
+        TransformCacheService.evict()
+        RowManifestService.evict()
+
+    @classmethod
+    def process_pending(cls, workers: int | None = None, should_stop=_never_stop) -> list[dict]:
+        """
+        Claim and transform pending mappings until none are left, all mappings of a
+        seller file together. `should_stop` is checked between files; once it returns
+        True no new file is started, and claimed mappings that were not started are released.
+        """
+        workers = settings.FILE_TRANSFORMER_WORKERS if workers is None else workers
+        claims = MappingClaimService()
+        if workers > 1:
+            return cls._run_concurrent(workers, claims, should_stop)
+
+        results = []
+        while not should_stop():
+            groups = claims.claim_groups(settings.MAPPING_CLAIM_BATCH_SIZE)
+            if not groups:
+                break
+            for index, group in enumerate(groups):
+                if should_stop():
+                    claims.release([mapping.id for pending in groups[index:] for mapping in pending])
+                    break
+                results.extend(cls._timed_process_group(group))
+        return results
+
+    @classmethod
+    def _run_concurrent(cls, workers: int, claims: MappingClaimService, should_stop=_never_stop) -> list[dict]:
+        groups = [] if should_stop() else claims.claim_group_ids(workers)
+        if not groups:
+            return []
+
+        started_at = time.monotonic()
+        results = []
+        # Forkserver workers: this process runs lease-heartbeat and fan-out threads, which a forked child
+        # could deadlock on, and workers open their own DB and MinIO connections.
+        with process_pool(workers) as executor:
+            in_flight = {}
+            while groups or in_flight:
+                # Claim only what the pool can start now so leases don't age in a local queue.
+                for mapping_ids in groups:
+                    in_flight[executor.submit(_transform_group, mapping_ids, claims.owner)] = mapping_ids
+                done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results.extend(cls._collect_results(future, in_flight.pop(future)))
+                groups = [] if should_stop() else claims.claim_group_ids(workers - len(in_flight))
+
+        cls._log_run_summary(results, time.monotonic() - started_at)
+        return results
+
+    @classmethod
+    def _timed_process_group(cls, mappings: list[Mappings], started_at: float | None = None) -> list[dict]:
+        started_at = time.monotonic() if started_at is None else started_at
+        cls._process_group(mappings)
+        duration = time.monotonic() - started_at
+        return [
+            {"mapping_id": mapping.id, "status": mapping.evaluation_status, "duration": duration}
+            for mapping in mappings
+        ]
+
+    @staticmethod
+    def _collect_results(future, mapping_ids: list[int]) -> list[dict]:
+        try:
+            results = future.result()
+        except Exception as exc:
+            # Leases are left to expire so the mappings are retried by a later run.
+            log.bind(mapping_ids=mapping_ids).exception("File transformation worker crashed: {}", exc)
+            results = [
+                {"mapping_id": mapping_id, "status": JOB_STATUS_CRASHED, "duration": None}
+                for mapping_id in mapping_ids
+            ]
+        for result in results:
+            log.bind(mapping_id=result["mapping_id"]).info(
+                "File transformation finished: status={}, duration={}", result["status"], result["duration"]
+            )
+        return results
+
+    @staticmethod
+    def _log_run_summary(results: list[dict], elapsed: float) -> None:
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        log.info("Processed {} mappings in {:.2f}s: {}", len(results), elapsed, counts)
+
+    @classmethod
+    def _process_mapping(cls, mapping: Mappings) -> None:
+        cls._process_group([mapping])
+
+    @classmethod
+    def _process_group(cls, mappings: list[Mappings]) -> None:
+        """
+        Transform mappings of one seller file, reading the file once per pass and feeding
+        every row to each mapping. Mappings writing the same output object (same template)
+        go in separate passes. One mapping failing never fails the others.
+        """
+        jobs = [MappingTransformJob(mapping) for mapping in mappings]
+        try:
+            with LeaseHeartbeat(jobs):
+                cls._run_passes(jobs)
+        finally:
+            for job in jobs:
+                job.save()
+
+    @classmethod
+    def _run_passes(cls, jobs: list[MappingTransformJob]) -> None:
+        passes = []
+        for job in jobs:
+            if not job.prepare():
+                continue
+            target = next((jobs_pass for jobs_pass in passes if job.object_name not in jobs_pass), None)
+            if target is None:
+                target = {}
+                passes.append(target)
+            target[job.object_name] = job
+        for jobs_pass in passes:
+            cls._run_pass(list(jobs_pass.values()))
+
+    @classmethod
+    def _run_pass(cls, jobs: list[MappingTransformJob]) -> None:
+        seller_file = jobs[0].mapping.seller_file
+        try:
+            with ExitStack() as stack:
+                file_stream = stack.enter_context(cls._open_file_stream(seller_file))
+                headers, rows = stack.enter_context(cls._parse_rows(file_stream, seller_file.file_type))
+                if len(jobs) == 1:
+                    jobs[0].transform(headers, rows, settings.FILE_VALIDATION_WORKERS)
+                else:
+                    cls._fan_out(jobs, headers, rows)
+        except Exception as exc:
+            for job in jobs:
+                if not job.done:
+                    job.fail(exc)
+
+    @classmethod
+    def _fan_out(cls, jobs: list[MappingTransformJob], headers: list[str], rows: Iterable[list[str]]) -> None:
+        """Feed each parsed row batch to every job, each transforming in its own thread."""
+        feeds = [RowFeed() for _job in jobs]
+        threads = [
+            Thread(target=cls._transform_from_feed, args=(job, headers, feed), daemon=True)
+            for job, feed in zip(jobs, feeds, strict=True)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for batch in batched(rows, FAN_OUT_BATCH_ROWS):
+                if not any(feed.open for feed in feeds):
+                    break
+                for feed in feeds:
+                    feed.put(batch)
+        except Exception as exc:
+            # Every job fails with the read error; its upload is aborted.
+            for feed in feeds:
+                feed.put(exc)
+        else:
+            for feed in feeds:
+                feed.put(_END_OF_ROWS)
         finally:
-            mapping.save(update_fields=["evaluation_status", "transformed_file_path", "updated_at"])
+            for thread in threads:
+                thread.join()
 
     @staticmethod
-    def _read_file_bytes(seller_file) -> bytes | None:
+    def _transform_from_feed(job: MappingTransformJob, headers: list[str], feed: RowFeed) -> None:
+        try:
+            # Jobs already run side by side; a chunk pool per job would multiply the worker processes.
+            job.transform(headers, feed, workers=1)
+        finally:
+            feed.abandon()
+            # Unique index lookups open a connection per thread.
+            connections.close_all()
+
+    @staticmethod
+    @contextmanager
+    def _open_file_stream(seller_file):
         file_object = seller_file.file
         if not file_object:
-            return None
+            raise ValueError("Failed to read seller file from storage.")
         try:
-            return file_object.read()
+            yield file_object
         finally:
             try:
                 file_object.close()
@@ -86,116 +499,103 @@ class FileTransformerCron:
                     release()
 
     @classmethod
-    def _parse_rows(cls, file_bytes: bytes, file_type: str) -> tuple[list[str], Iterable[list[str]]]:
+    def _parse_rows(cls, file_stream, file_type: str):
         if file_type == CSV:
-            return cls._parse_csv_rows(file_bytes)
+            return cls._parse_csv_rows(file_stream)
         if file_type == XLSX:
-            return cls._parse_excel_rows(file_bytes)
+            return cls._parse_excel_rows(file_stream)
         raise ValueError("Unsupported file type.")
 
     @staticmethod
-    def _parse_csv_rows(file_bytes: bytes) -> tuple[list[str], Iterable[list[str]]]:
-        buffer = BytesIO(file_bytes)
-        text_stream = TextIOWrapper(buffer, encoding="utf-8-sig", newline="")
-        reader = csv.reader(text_stream)
-
-        header_row = []
-        for row in reader:
-            row_values = FileParser.normalize_row(row)
-            if not any(row_values):
-                continue
-            header_row = row_values
-            break
-
+    def _iter_data_rows(rows) -> tuple[list[str], Iterable[list[str]]]:
+        header_row = FileParser.find_first_non_empty_row(rows)
         if not header_row:
-            text_stream.detach()
-            buffer.close()
             return [], iter(())
 
         def row_iter():
-            try:
-                for row in reader:
-                    row_values = FileParser.normalize_row(row)
-                    if not any(row_values):
-                        continue
-                    yield row_values
-            finally:
-                text_stream.detach()
-                buffer.close()
+            for row in rows:
+                row_values = FileParser.normalize_row(row)
+                if not any(row_values):
+                    continue
+                yield row_values
 
         return header_row, row_iter()
 
     @staticmethod
-    def _parse_excel_rows(file_bytes: bytes) -> tuple[list[str], Iterable[list[str]]]:
-        workbook = load_workbook(filename=BytesIO(file_bytes), read_only=True, data_only=True)
-        sheet = workbook.active
-        rows = sheet.iter_rows(values_only=True)
-
-        header_row = []
-        for row in rows:
-            row_values = FileParser.normalize_row(row)
-            if not any(row_values):
-                continue
-            header_row = row_values
-            break
-
-        if not header_row:
-            workbook.close()
-            return [], iter(())
+    @contextmanager
+    def _parse_csv_rows(file_stream):
+        # Decode straight off the response so only one buffer of the file is held at a time.
+        text_stream = TextIOWrapper(
+            BufferedReader(file_stream, buffer_size=STREAM_CHUNK_SIZE), encoding="utf-8-sig", newline=""
+        )
+        try:
+            yield FileTransformerCron._iter_data_rows(csv.reader(text_stream))
+        finally:
+            text_stream.detach().detach()
 
-        def row_iter():
+    @staticmethod
+    @contextmanager
+    def _parse_excel_rows(file_stream):
+        # openpyxl needs a seekable file, so spool the object to disk rather than memory.
+        with NamedTemporaryFile(suffix=XLSX) as spool_file:
+            shutil.copyfileobj(file_stream, spool_file, STREAM_CHUNK_SIZE)
+            spool_file.flush()
+            workbook = load_workbook(filename=spool_file.name, read_only=True, data_only=True)
             try:
-                for row in rows:
-                    row_values = FileParser.normalize_row(row)
-                    if not any(row_values):
-                        continue
-                    yield row_values
+                yield FileTransformerCron._iter_data_rows(workbook.active.iter_rows(values_only=True))
             finally:
                 workbook.close()
 
-        return header_row, row_iter()
-
     @classmethod
-    def _build_transformed_file(
+    def _write_transformed_file(
         cls,
         template_keys: list[str],
         validated_rows: Iterable[dict],
         file_type: str,
-    ) -> BytesIO:
+        output: BinaryIO,
+    ) -> int:
+        """Write the header and rows to `output`; returns the number of rows written."""
         if file_type == CSV:
-            return cls._build_csv(template_keys, validated_rows)
+            return cls._write_csv(template_keys, validated_rows, output)
         if file_type == XLSX:
-            return cls._build_excel(template_keys, validated_rows)
+            return cls._write_excel(template_keys, validated_rows, output)
         raise ValueError("Unsupported file type.")
 
     @staticmethod
-    def _build_csv(template_keys: list[str], validated_rows: Iterable[dict]) -> BytesIO:
-        output = SpooledTemporaryFile(max_size=MAX_FILE_SIZE, mode="w+b")
-        text_stream = TextIOWrapper(output, encoding="utf-8", newline="")
+    def _write_csv(template_keys: list[str], validated_rows: Iterable[dict], output: BinaryIO) -> int:
+        text_stream = TextIOWrapper(
+            BufferedWriter(output, buffer_size=STREAM_CHUNK_SIZE), encoding="utf-8", newline=""
+        )
+        row_count = 0
         try:
             writer = csv.writer(text_stream)
             writer.writerow(template_keys)
             for row in validated_rows:
                 writer.writerow([FileTransformerCron._format_cell(row.get(key)) for key in template_keys])
+                row_count += 1
             text_stream.flush()
-            output.seek(0)
-            return output
+            return row_count
         finally:
-            text_stream.detach()
+            # Detach both layers; a collected BufferedWriter would otherwise close the upload.
+            text_stream.detach().detach()
 
     @staticmethod
-    def _build_excel(template_keys: list[str], validated_rows: Iterable[dict]) -> BytesIO:
+    def _write_excel(template_keys: list[str], validated_rows: Iterable[dict], output: BinaryIO) -> int:
         workbook = Workbook(write_only=True)
-        output = SpooledTemporaryFile(max_size=MAX_FILE_SIZE, mode="w+b")
+        buffered_output = BufferedWriter(output, buffer_size=STREAM_CHUNK_SIZE)
+        row_count = 0
         try:
-            sheet = workbook.active
+            # Write-only workbooks start without a sheet.
+            sheet = workbook.create_sheet()
             sheet.append(template_keys)
             for row in validated_rows:
                 sheet.append([FileTransformerCron._format_cell(row.get(key)) for key in template_keys])
-            workbook.save(output)
-            output.seek(0)
-            return output
+                row_count += 1
+            workbook.save(buffered_output)
+            buffered_output.flush()
+            return row_count
         finally:
+            buffered_output.detach()
             workbook.close()
 
     @staticmethod
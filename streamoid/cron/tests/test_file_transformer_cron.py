@@ -1,15 +1,26 @@
+from contextlib import nullcontext
 from io import BytesIO
 from types import SimpleNamespace
 from unittest.mock import patch
 
-from cron.file_transformer_cron import FileTransformerCron
+import pytest
+from cron.file_transformer_cron import (
+    JOB_STATUS_CRASHED,
+    JOB_STATUS_SKIPPED,
+    MAPPING_RESULT_FIELDS,
+    FileTransformerCron,
+    LeaseHeartbeat,
+    MappingTransformJob,
+    _transform_group,
+)
+from openpyxl import Workbook
 
 from mapping.constants import (
     EVALUATION_STATUS_FAILED,
     EVALUATION_STATUS_SUCCESS,
     TRANSFORMED_FOLDER,
 )
-from seller.constants import CSV
+from seller.constants import CSV, XLSX
 
 
 class FakeMapping:
@@ -17,36 +28,96 @@ class FakeMapping:
         self.id = 1
         self.seller_file = seller_file
         self.marketplace_template = marketplace_template
+        self.marketplace_template_id = 5
         self.mappings = mappings
         self.evaluation_status = None
         self.transformed_file_path = None
+        self.lease_owner = "worker-a"
         self.saved_update_fields = None
 
-    def save(self, update_fields=None):
-        self.saved_update_fields = update_fields
 
+@pytest.fixture(autouse=True)
+def finish_mapping():
+    def finish(claims, mapping, update_fields):
+        mapping.saved_update_fields = update_fields
+        return True
 
-class FakeQuerySet:
-    def __init__(self, items):
-        self._items = items
+    with patch(
+        "cron.file_transformer_cron.MappingClaimService.finish", autospec=True, side_effect=finish
+    ) as finish_mock:
+        yield finish_mock
 
-    def select_related(self, *args, **kwargs):
-        return self
 
-    def iterator(self):
-        return iter(self._items)
+@pytest.fixture(autouse=True)
+def transform_cache():
+    with patch("cron.file_transformer_cron.TransformCacheService") as cache_mock:
+        cache_mock.return_value.build_key.return_value = None
+        yield cache_mock
+
+
+@pytest.fixture(autouse=True)
+def row_manifest():
+    with patch("cron.file_transformer_cron.RowManifestService") as manifest_mock:
+        manifest_mock.for_mapping.return_value = None
+        yield manifest_mock
+
+
+def _claimed(mapping_id):
+    return SimpleNamespace(id=mapping_id, evaluation_status=EVALUATION_STATUS_SUCCESS)
+
+
+def test_run_processes_claimed_mappings(transform_cache):
+    batches = [[[_claimed(1), _claimed(2)]], [[_claimed(3)]], []]
+
+    with patch("cron.file_transformer_cron.MappingClaimService.release_expired") as release_mock:
+        with patch(
+            "cron.file_transformer_cron.MappingClaimService.claim_groups", side_effect=batches
+        ) as claim_mock:
+            with patch.object(FileTransformerCron, "_process_group") as process_mock:
+                results = FileTransformerCron.run(workers=1)
 
+    release_mock.assert_called_once()
+    transform_cache.evict.assert_called_once()
+    assert claim_mock.call_count == 3
+    assert process_mock.call_count == 2
+    assert [result["mapping_id"] for result in results] == [1, 2, 3]
 
-def test_run_processes_pending_mappings():
-    mappings = [SimpleNamespace(), SimpleNamespace()]
-    queryset = FakeQuerySet(mappings)
 
-    with patch("cron.file_transformer_cron.Mappings.objects.filter", return_value=queryset) as filter_mock:
-        with patch.object(FileTransformerCron, "_process_mapping") as process_mock:
-            FileTransformerCron.run()
+def test_process_pending_releases_unstarted_mappings_when_stopping():
+    stop_checks = iter([False, False, True, True])
+    groups = [[_claimed(1)], [_claimed(2), _claimed(3)]]
 
-    filter_mock.assert_called_once_with(evaluation_status="pending")
-    assert process_mock.call_count == len(mappings)
+    with patch("cron.file_transformer_cron.MappingClaimService.claim_groups", return_value=groups):
+        with patch("cron.file_transformer_cron.MappingClaimService.release") as release_mock:
+            with patch.object(FileTransformerCron, "_process_group") as process_mock:
+                results = FileTransformerCron.process_pending(workers=1, should_stop=lambda: next(stop_checks))
+
+    assert [result["mapping_id"] for result in results] == [1]
+    process_mock.assert_called_once()
+    release_mock.assert_called_once_with([2, 3])
+
+
+class FakeUploadStream(BytesIO):
+    def __init__(self, fail_on_commit=False):
+        super().__init__()
+        self.fail_on_commit = fail_on_commit
+        self.data = None
+        self.committed = False
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                if self.fail_on_commit:
+                    raise OSError("upload failed")
+                self.data = self.getvalue()
+                self.committed = True
+        finally:
+            self.close()
+        return False
 
 
 def test_process_mapping_success_updates_status_and_path():
@@ -54,26 +125,66 @@ def test_process_mapping_success_updates_status_and_path():
     seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
     marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
     mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
-    output_file = BytesIO(b"data")
+    upload_stream = FakeUploadStream()
 
-    with patch.object(FileTransformerCron, "_read_file_bytes", return_value=b"file"):
-        with patch.object(FileTransformerCron, "_parse_rows", return_value=(["sku"], [["1"]])):
+    with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+        with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"]]))):
             with patch("cron.file_transformer_cron.validate_file_iter", return_value=iter([{"sku": "1"}])):
-                with patch.object(FileTransformerCron, "_build_transformed_file", return_value=output_file):
-                    with patch(
-                        "cron.file_transformer_cron.MinioHandler.store_file", return_value=True
-                    ) as store_mock:
+                with patch(
+                    "cron.file_transformer_cron.MinioHandler.open_upload_stream", return_value=upload_stream
+                ) as open_mock:
+                    with patch("cron.file_transformer_cron.MinioHandler._get_client"):
+                        FileTransformerCron._process_mapping(mapping)
+
+    assert mapping.evaluation_status == EVALUATION_STATUS_SUCCESS
+    assert mapping.transformed_file_path == f"bucket/{TRANSFORMED_FOLDER}/5/items.csv"
+    assert mapping.saved_update_fields == MAPPING_RESULT_FIELDS
+    open_mock.assert_called_once_with("bucket", f"{TRANSFORMED_FOLDER}/5/items.csv")
+    assert upload_stream.committed
+    assert upload_stream.data == b"sku\r\n1\r\n"
+
+
+def test_process_mapping_stores_cache_entry_after_upload(transform_cache):
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+    upload_stream = FakeUploadStream()
+    upload_stream.result = SimpleNamespace(etag="etag-1")
+    cache = transform_cache.return_value
+    cache.build_key.return_value = "key"
+    cache.lookup.return_value = None
+
+    with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+        with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"]]))):
+            with patch("cron.file_transformer_cron.validate_file_iter", return_value=iter([{"sku": "1"}])):
+                with patch(
+                    "cron.file_transformer_cron.MinioHandler.open_upload_stream", return_value=upload_stream
+                ):
+                    with patch("cron.file_transformer_cron.MinioHandler._get_client"):
                         FileTransformerCron._process_mapping(mapping)
 
     assert mapping.evaluation_status == EVALUATION_STATUS_SUCCESS
-    assert mapping.transformed_file_path == f"bucket/{TRANSFORMED_FOLDER}/items.csv"
-    assert mapping.saved_update_fields == ["evaluation_status", "transformed_file_path", "updated_at"]
-    assert output_file.closed
-    store_mock.assert_called_once()
-    args, _kwargs = store_mock.call_args
-    assert args[0] == "bucket"
-    assert args[1] == f"{TRANSFORMED_FOLDER}/items.csv"
-    assert args[2] is output_file
+    cache.store.assert_called_once_with("key", "bucket", f"{TRANSFORMED_FOLDER}/5/items.csv", "etag-1")
+
+
+def test_process_mapping_reuses_cached_transformation(transform_cache):
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+    cache = transform_cache.return_value
+    cache.build_key.return_value = "key"
+    cache.lookup.return_value = f"bucket/{TRANSFORMED_FOLDER}/other.csv"
+
+    with patch.object(FileTransformerCron, "_open_file_stream") as open_mock:
+        FileTransformerCron._process_mapping(mapping)
+
+    assert mapping.evaluation_status == EVALUATION_STATUS_SUCCESS
+    assert mapping.transformed_file_path == f"bucket/{TRANSFORMED_FOLDER}/other.csv"
+    assert mapping.saved_update_fields == MAPPING_RESULT_FIELDS
+    open_mock.assert_not_called()
+    cache.store.assert_not_called()
 
 
 def test_process_mapping_sets_failed_when_storage_fails():
@@ -81,16 +192,359 @@ def test_process_mapping_sets_failed_when_storage_fails():
     seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
     marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
     mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
-    output_file = BytesIO(b"data")
+    upload_stream = FakeUploadStream(fail_on_commit=True)
 
-    with patch.object(FileTransformerCron, "_read_file_bytes", return_value=b"file"):
-        with patch.object(FileTransformerCron, "_parse_rows", return_value=(["sku"], [["1"]])):
+    with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+        with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"]]))):
             with patch("cron.file_transformer_cron.validate_file_iter", return_value=iter([{"sku": "1"}])):
-                with patch.object(FileTransformerCron, "_build_transformed_file", return_value=output_file):
-                    with patch("cron.file_transformer_cron.MinioHandler.store_file", return_value=False):
+                with patch(
+                    "cron.file_transformer_cron.MinioHandler.open_upload_stream", return_value=upload_stream
+                ):
+                    with patch("cron.file_transformer_cron.MinioHandler._get_client"):
                         FileTransformerCron._process_mapping(mapping)
 
     assert mapping.evaluation_status == EVALUATION_STATUS_FAILED
     assert mapping.transformed_file_path is None
-    assert mapping.saved_update_fields == ["evaluation_status", "transformed_file_path", "updated_at"]
-    assert output_file.closed
+    assert mapping.saved_update_fields == MAPPING_RESULT_FIELDS
+    assert upload_stream.closed
+
+
+def test_process_mapping_aborts_upload_when_validation_fails():
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+    upload_stream = FakeUploadStream()
+
+    with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+        with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"]]))):
+            with patch("cron.file_transformer_cron.validate_file_iter", side_effect=ValueError("bad row")):
+                with patch(
+                    "cron.file_transformer_cron.MinioHandler.open_upload_stream", return_value=upload_stream
+                ):
+                    with patch("cron.file_transformer_cron.MinioHandler._get_client"):
+                        FileTransformerCron._process_mapping(mapping)
+
+    assert mapping.evaluation_status == EVALUATION_STATUS_FAILED
+    assert not upload_stream.committed
+    assert upload_stream.closed
+
+
+def test_process_mapping_indexes_unique_values_without_the_cache(transform_cache):
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string", "unique": True}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+
+    with patch("cron.file_transformer_cron.UniqueValueIndexService.for_mapping") as for_mapping_mock:
+        unique_index = for_mapping_mock.return_value
+        with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+            with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"]]))):
+                with patch(
+                    "cron.file_transformer_cron.validate_file_iter", return_value=iter([{"sku": "1"}])
+                ) as validate_mock:
+                    with patch(
+                        "cron.file_transformer_cron.MinioHandler.open_upload_stream",
+                        return_value=FakeUploadStream(),
+                    ):
+                        with patch("cron.file_transformer_cron.MinioHandler._get_client"):
+                            FileTransformerCron._process_mapping(mapping)
+
+    assert mapping.evaluation_status == EVALUATION_STATUS_SUCCESS
+    transform_cache.return_value.build_key.assert_not_called()
+    assert validate_mock.call_args.kwargs["unique_index"] is unique_index
+    unique_index.discard.assert_called_once()
+    unique_index.activate.assert_called_once()
+
+
+def test_process_mapping_discards_unique_values_when_validation_fails():
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string", "unique": True}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+
+    with patch("cron.file_transformer_cron.UniqueValueIndexService.for_mapping") as for_mapping_mock:
+        unique_index = for_mapping_mock.return_value
+        with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+            with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"]]))):
+                with patch("cron.file_transformer_cron.validate_file_iter", side_effect=ValueError("duplicate")):
+                    with patch(
+                        "cron.file_transformer_cron.MinioHandler.open_upload_stream",
+                        return_value=FakeUploadStream(),
+                    ):
+                        with patch("cron.file_transformer_cron.MinioHandler._get_client"):
+                            FileTransformerCron._process_mapping(mapping)
+
+    assert mapping.evaluation_status == EVALUATION_STATUS_FAILED
+    assert unique_index.discard.call_count == 2
+    unique_index.activate.assert_not_called()
+
+
+def _fail_rows(*args, on_error=None, **kwargs):
+    on_error({"row": 1, "errors": {"sku": ["This field may not be blank."]}})
+    return iter([{"sku": "1"}])
+
+
+@pytest.mark.parametrize(
+    "emit_valid_rows, expected_status", [(False, EVALUATION_STATUS_FAILED), (True, EVALUATION_STATUS_SUCCESS)]
+)
+def test_process_mapping_reports_row_errors(settings, transform_cache, emit_valid_rows, expected_status):
+    settings.VALIDATION_ERROR_BUDGET = 5
+    settings.VALIDATION_EMIT_VALID_ROWS = emit_valid_rows
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+    upload_stream, report_stream = FakeUploadStream(), FakeUploadStream()
+    streams = {
+        f"{TRANSFORMED_FOLDER}/5/items.csv": upload_stream,
+        f"{TRANSFORMED_FOLDER}/5/items.csv.errors.jsonl": report_stream,
+    }
+    transform_cache.return_value.build_key.return_value = "key"
+    transform_cache.return_value.lookup.return_value = None
+
+    with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+        with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku"], [["1"], [""]]))):
+            with patch("cron.file_transformer_cron.validate_file_iter", side_effect=_fail_rows) as validate_mock:
+                with patch(
+                    "core.minio.MinioHandler.open_upload_stream",
+                    side_effect=lambda bucket_name, object_name: streams[object_name],
+                ):
+                    with patch("core.minio.MinioHandler._get_client"):
+                        FileTransformerCron._process_mapping(mapping)
+
+    assert validate_mock.call_args.kwargs["error_budget"] == 5
+    assert mapping.evaluation_status == expected_status
+    assert upload_stream.committed is emit_valid_rows
+    assert report_stream.committed
+    assert report_stream.data == b'{"row": 1, "errors": {"sku": ["This field may not be blank."]}}\n'
+    assert (mapping.valid_rows_count, mapping.error_rows_count) == (1, 1)
+    assert mapping.error_report_path == f"bucket/{TRANSFORMED_FOLDER}/5/items.csv.errors.jsonl"
+    # Partial outputs are never cached.
+    transform_cache.return_value.store.assert_not_called()
+
+
+def _fan_out_mapping(mapping_id, template_id, template):
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    mapping = FakeMapping(
+        seller_file,
+        SimpleNamespace(template=template),
+        mappings=[{"seller": "sku", "marketplace": "sku"}, {"seller": "price", "marketplace": "price"}],
+    )
+    mapping.id = mapping_id
+    mapping.marketplace_template_id = template_id
+    return mapping
+
+
+def test_process_group_reads_the_file_once_and_isolates_failures():
+    rows = [[f"SKU-{index}", f"{index}.5"] for index in range(50)]
+    mappings = [
+        _fan_out_mapping(1, 11, {"sku": {"type": "string"}, "price": {"type": "number"}}),
+        _fan_out_mapping(2, 12, {"sku": {"type": "string"}}),
+        # Every price exceeds the maximum, so only this mapping fails.
+        _fan_out_mapping(3, 13, {"sku": {"type": "string"}, "price": {"type": "number", "max": 0}}),
+    ]
+    streams = {}
+
+    def open_upload_stream(bucket_name, object_name):
+        streams[object_name] = FakeUploadStream()
+        return streams[object_name]
+
+    with patch.object(
+        FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))
+    ) as open_mock:
+        with patch.object(FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku", "price"], rows))):
+            with patch("cron.file_transformer_cron.FAN_OUT_BATCH_ROWS", 2):
+                with patch("core.minio.MinioHandler.open_upload_stream", side_effect=open_upload_stream):
+                    with patch("core.minio.MinioHandler._get_client"):
+                        FileTransformerCron._process_group(mappings)
+
+    open_mock.assert_called_once()
+    assert [mapping.evaluation_status for mapping in mappings] == [
+        EVALUATION_STATUS_SUCCESS,
+        EVALUATION_STATUS_SUCCESS,
+        EVALUATION_STATUS_FAILED,
+    ]
+    assert mappings[0].transformed_file_path == f"bucket/{TRANSFORMED_FOLDER}/11/items.csv"
+    assert streams[f"{TRANSFORMED_FOLDER}/11/items.csv"].data.splitlines()[-1] == b"SKU-49,49.50"
+    assert streams[f"{TRANSFORMED_FOLDER}/12/items.csv"].data.splitlines()[-1] == b"SKU-49"
+    assert not streams[f"{TRANSFORMED_FOLDER}/13/items.csv"].committed
+    assert all(mapping.saved_update_fields == MAPPING_RESULT_FIELDS for mapping in mappings)
+
+
+def test_process_group_fails_every_mapping_when_the_file_cannot_be_read():
+    mappings = [_fan_out_mapping(1, 11, {"sku": {"type": "string"}}), _fan_out_mapping(2, 12, {"sku": {}})]
+
+    def broken_rows():
+        yield ["SKU-1", "1"]
+        raise ValueError("truncated file")
+
+    with patch.object(FileTransformerCron, "_open_file_stream", return_value=nullcontext(BytesIO(b"file"))):
+        with patch.object(
+            FileTransformerCron, "_parse_rows", return_value=nullcontext((["sku", "price"], broken_rows()))
+        ):
+            with patch("core.minio.MinioHandler.open_upload_stream", side_effect=lambda *args: FakeUploadStream()):
+                FileTransformerCron._process_group(mappings)
+
+    assert [mapping.evaluation_status for mapping in mappings] == [EVALUATION_STATUS_FAILED] * 2
+
+
+def test_process_group_runs_mappings_to_the_same_template_in_separate_passes():
+    mappings = [_fan_out_mapping(1, 11, {"sku": {"type": "string"}}), _fan_out_mapping(2, 11, {"sku": {}})]
+
+    with patch.object(
+        FileTransformerCron, "_open_file_stream", side_effect=lambda *args: nullcontext(BytesIO(b"file"))
+    ) as open_mock:
+        with patch.object(
+            FileTransformerCron,
+            "_parse_rows",
+            side_effect=lambda *args: nullcontext((["sku", "price"], iter([["SKU-1", "1"]]))),
+        ):
+            with patch("core.minio.MinioHandler.open_upload_stream", side_effect=lambda *args: FakeUploadStream()):
+                FileTransformerCron._process_group(mappings)
+
+    assert open_mock.call_count == 2
+    assert [mapping.evaluation_status for mapping in mappings] == [EVALUATION_STATUS_SUCCESS] * 2
+
+
+def test_process_mapping_drops_the_result_once_its_lease_is_lost(finish_mapping):
+    seller = SimpleNamespace(bucket_name="bucket")
+    seller_file = SimpleNamespace(name="items.csv", path="bucket/items.csv", file_type=CSV, seller=seller)
+    marketplace_template = SimpleNamespace(template={"sku": {"type": "string"}})
+    mapping = FakeMapping(seller_file, marketplace_template, mappings=[{"seller": "sku", "marketplace": "sku"}])
+    job = MappingTransformJob(mapping)
+    upload_stream = FakeUploadStream()
+    finish_mapping.side_effect = None
+    finish_mapping.return_value = False
+
+    # Another worker claimed the mapping after its lease expired.
+    with patch("cron.file_transformer_cron.MappingClaimService.renew", return_value=[]):
+        LeaseHeartbeat([job]).renew(job.claims)
+    assert job.prepare()
+    with patch("cron.file_transformer_cron.MinioHandler.open_upload_stream", return_value=upload_stream):
+        with patch("cron.file_transformer_cron.MinioHandler._get_client"):
+            job.transform(["sku"], [["1"]], workers=1)
+    job.save()
+
+    assert job.lease_lost
+    assert mapping.evaluation_status == EVALUATION_STATUS_FAILED
+    assert not upload_stream.committed
+    assert mapping.lease_owner == "worker-a"
+
+
+class FakeFuture:
+    def __init__(self, fn, *args):
+        self._fn = fn
+        self._args = args
+
+    def result(self):
+        return self._fn(*self._args)
+
+
+class FakeExecutor:
+    def __init__(self, max_workers=None, initializer_path=None, initargs=()):
+        self.max_workers = max_workers
+        self.initializer_path = initializer_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        return FakeFuture(fn, *args)
+
+
+def test_run_with_workers_dispatches_each_claimed_group():
+    def transform(mapping_ids, lease_owner):
+        if 3 in mapping_ids:
+            raise RuntimeError("worker died")
+        return [
+            {"mapping_id": mapping_id, "status": EVALUATION_STATUS_SUCCESS, "duration": 0.1}
+            for mapping_id in mapping_ids
+        ]
+
+    def wait(futures, return_when=None):
+        return set(futures), set()
+
+    with patch("cron.file_transformer_cron.MappingClaimService.release_expired"):
+        with patch(
+            "cron.file_transformer_cron.MappingClaimService.claim_group_ids",
+            side_effect=[[[1, 2], [4]], [[3, 5]], []],
+        ):
+            with patch("cron.file_transformer_cron.process_pool", side_effect=FakeExecutor) as process_pool:
+                with patch("cron.file_transformer_cron.wait", side_effect=wait):
+                    with patch("cron.file_transformer_cron._transform_group", side_effect=transform):
+                        results = FileTransformerCron.run(workers=2)
+
+    process_pool.assert_called_once_with(2)
+    assert {result["mapping_id"]: result["status"] for result in results} == {
+        1: EVALUATION_STATUS_SUCCESS,
+        2: EVALUATION_STATUS_SUCCESS,
+        4: EVALUATION_STATUS_SUCCESS,
+        3: JOB_STATUS_CRASHED,
+        5: JOB_STATUS_CRASHED,
+    }
+
+
+def test_transform_group_reports_outcome_and_skips_processed_mappings():
+    mapping = SimpleNamespace(id=7, evaluation_status="pending")
+
+    def process(mappings):
+        for item in mappings:
+            item.evaluation_status = EVALUATION_STATUS_FAILED
+
+    queryset = SimpleNamespace(select_related=lambda *args: SimpleNamespace(order_by=lambda *args: [mapping]))
+    with patch("cron.file_transformer_cron.Mappings.objects.filter", return_value=queryset):
+        with patch.object(FileTransformerCron, "_process_group", side_effect=process):
+            results = _transform_group([7, 8], "owner")
+
+    assert [(result["mapping_id"], result["status"]) for result in results] == [
+        (7, EVALUATION_STATUS_FAILED),
+        (8, JOB_STATUS_SKIPPED),
+    ]
+    assert all(result["duration"] >= 0 for result in results)
+
+
+class FakeResponse(BytesIO):
+    def __init__(self, payload):
+        super().__init__(payload)
+        self.released = False
+
+    def release_conn(self):
+        self.released = True
+
+
+def test_open_file_stream_closes_and_releases_response():
+    response = FakeResponse(b"sku\n1\n")
+    seller_file = SimpleNamespace(file=response)
+
+    with FileTransformerCron._open_file_stream(seller_file) as file_stream:
+        assert file_stream is response
+
+    assert response.closed
+    assert response.released
+
+
+def test_parse_csv_rows_streams_from_response():
+    response = FakeResponse("\ufeff\n sku , name \n1,Widget\n,\n2,Gadget\n".encode("utf-8"))
+
+    with FileTransformerCron._parse_rows(response, CSV) as (headers, rows):
+        assert headers == ["sku", "name"]
+        assert list(rows) == [["1", "Widget"], ["2", "Gadget"]]
+
+
+def test_parse_excel_rows_spools_response_to_disk():
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["sku", "price"])
+    sheet.append([1, 9.5])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    response = FakeResponse(buffer.getvalue())
+
+    with FileTransformerCron._parse_rows(response, XLSX) as (headers, rows):
+        assert headers == ["sku", "price"]
+        assert list(rows) == [["1", "9.5"]]
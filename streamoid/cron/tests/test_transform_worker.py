@@ -0,0 +1,118 @@
+import os
+import signal
+import time
+from unittest.mock import patch
+
+import pytest
+from cron.transform_worker import TransformWorker
+
+
+@pytest.fixture(autouse=True)
+def profiler():
+    with patch("cron.transform_worker.SellerFileProfilingService") as profiler_mock:
+        profiler_mock.return_value.process_pending.return_value = 0
+        yield profiler_mock.return_value
+
+
+def _worker(tmp_path, **kwargs):
+    return TransformWorker(
+        workers=1,
+        poll_seconds=0.01,
+        max_poll_seconds=0.04,
+        reap_seconds=60,
+        heartbeat_file=str(tmp_path / "heartbeat"),
+        **kwargs,
+    )
+
+
+def test_worker_backs_off_while_idle_and_resets_after_work(tmp_path):
+    worker = _worker(tmp_path)
+    polls = iter([[], [], [], [{"mapping_id": 1}], []])
+    waits = []
+
+    def process_pending(workers, should_stop):
+        result = next(polls, None)
+        if result is None:
+            worker.stop()
+            return []
+        return result
+
+    with patch("cron.transform_worker.FileTransformerCron.reap") as reap_mock:
+        with patch("cron.transform_worker.FileTransformerCron.process_pending", side_effect=process_pending):
+            with patch.object(worker._stop, "wait", side_effect=waits.append):
+                worker.run()
+
+    reap_mock.assert_called_once()
+    assert waits == [0.01, 0.02, 0.04, 0.01, 0.02]
+
+
+def test_worker_profiles_uploads_before_transforming(tmp_path, profiler):
+    worker = _worker(tmp_path)
+    calls = []
+    profiler.process_pending.side_effect = lambda should_stop: calls.append("ingest") or 1
+
+    def process_pending(workers, should_stop):
+        calls.append("transform")
+        worker.stop()
+        return []
+
+    with patch("cron.transform_worker.FileTransformerCron.reap"):
+        with patch("cron.transform_worker.FileTransformerCron.process_pending", side_effect=process_pending):
+            with patch.object(worker._stop, "wait") as wait_mock:
+                worker.run()
+
+    assert calls == ["ingest", "transform"]
+    wait_mock.assert_not_called()
+
+
+def test_worker_survives_failed_poll(tmp_path):
+    worker = _worker(tmp_path)
+    calls = []
+
+    def process_pending(workers, should_stop):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("database went away")
+        worker.stop()
+        return []
+
+    with patch("cron.transform_worker.FileTransformerCron.reap"):
+        with patch("cron.transform_worker.FileTransformerCron.process_pending", side_effect=process_pending):
+            worker.run()
+
+    assert len(calls) == 2
+
+
+def test_sigterm_stops_worker_after_current_mapping(tmp_path):
+    worker = _worker(tmp_path)
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        worker.install_signal_handlers()
+
+        def process_pending(workers, should_stop):
+            os.kill(os.getpid(), signal.SIGTERM)
+            # The current mapping still completes; the stop is only observed between mappings.
+            assert should_stop()
+            return [{"mapping_id": 1}]
+
+        with patch("cron.transform_worker.FileTransformerCron.reap"):
+            with patch("cron.transform_worker.FileTransformerCron.process_pending", side_effect=process_pending):
+                worker.run()
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    assert worker._stop.is_set()
+
+
+def test_is_alive_reads_heartbeat_age(tmp_path):
+    heartbeat_file = str(tmp_path / "heartbeat")
+    worker = _worker(tmp_path)
+
+    assert not TransformWorker.is_alive(heartbeat_file, max_age_seconds=60)
+    worker.heartbeat()
+    assert TransformWorker.is_alive(heartbeat_file, max_age_seconds=60)
+
+    stale = time.time() - 120
+    os.utime(heartbeat_file, (stale, stale))
+    assert not TransformWorker.is_alive(heartbeat_file, max_age_seconds=60)
@@ -0,0 +1,102 @@
+import os
+import signal
+import time
+from pathlib import Path
+from threading import Event
+
+from cron.file_transformer_cron import FileTransformerCron
+from django.conf import settings
+from loguru import logger
+
+from seller.services.file_ingestion import SellerFileProfilingService
+
+log = logger.bind(component="transform_worker")
+
+
+class TransformWorker:
+    """
+    Long-running replacement for the periodic transformer cron.
+    Pending mappings are the job queue: `MappingService.create` saves them as
+    `pending` and the worker claims them within a poll interval. Seller files
+    uploaded in async mode are profiled by the same loop. Idle polls back
+    off exponentially up to `max_poll_seconds`; SIGTERM/SIGINT let the current
+    mapping finish and release anything claimed but not started.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        poll_seconds: float | None = None,
+        max_poll_seconds: float | None = None,
+        reap_seconds: int | None = None,
+        heartbeat_file: str | None = None,
+    ):
+        self.workers = settings.FILE_TRANSFORMER_WORKERS if workers is None else workers
+        self.poll_seconds = poll_seconds or settings.TRANSFORM_WORKER_POLL_SECONDS
+        self.max_poll_seconds = max(
+            max_poll_seconds or settings.TRANSFORM_WORKER_MAX_POLL_SECONDS, self.poll_seconds
+        )
+        self.reap_seconds = settings.TRANSFORM_WORKER_REAP_SECONDS if reap_seconds is None else reap_seconds
+        self.heartbeat_file = Path(heartbeat_file or settings.TRANSFORM_WORKER_HEARTBEAT_FILE)
+        self.profiler = SellerFileProfilingService()
+        self._stop = Event()
+        self._pid = os.getpid()
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+    def _handle_signal(self, signum, _frame) -> None:
+        # Forked pool processes inherit the handler; only the parent drives shutdown.
+        if os.getpid() != self._pid:
+            return
+        log.info("Received {}, stopping after the current mapping", signal.Signals(signum).name)
+        self._stop.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def should_stop(self) -> bool:
+        self.heartbeat()
+        return self._stop.is_set()
+
+    def heartbeat(self) -> None:
+        try:
+            self.heartbeat_file.touch()
+        except OSError as e:
+            log.warning(f"Failed to write worker heartbeat: {self.heartbeat_file} | Error: {e}")
+
+    def run(self) -> None:
+        log.info("Transform worker started: workers={}, poll={}s", self.workers, self.poll_seconds)
+        idle_seconds = self.poll_seconds
+        reaped_at = None
+        while not self.should_stop():
+            if reaped_at is None or time.monotonic() - reaped_at >= self.reap_seconds:
+                FileTransformerCron.reap()
+                reaped_at = time.monotonic()
+
+            try:
+                # Profile async uploads first; their mappings can only be created once they are ready.
+                ingested = self.profiler.process_pending(should_stop=self.should_stop)
+                results = FileTransformerCron.process_pending(self.workers, should_stop=self.should_stop)
+            except Exception as exc:
+                # A DB/MinIO outage should not kill the worker; back off and retry.
+                log.exception("Transform worker poll failed: {}", exc)
+                ingested, results = 0, []
+
+            if ingested or results:
+                idle_seconds = self.poll_seconds
+                continue
+            self._stop.wait(idle_seconds)
+            idle_seconds = min(idle_seconds * 2, self.max_poll_seconds)
+        log.info("Transform worker stopped")
+
+    @staticmethod
+    def is_alive(heartbeat_file: str | None = None, max_age_seconds: int | None = None) -> bool:
+        heartbeat_file = Path(heartbeat_file or settings.TRANSFORM_WORKER_HEARTBEAT_FILE)
+        max_age_seconds = settings.MAPPING_LEASE_SECONDS if max_age_seconds is None else max_age_seconds
+        try:
+            age = time.time() - heartbeat_file.stat().st_mtime
+        except OSError:
+            return False
+        return age <= max_age_seconds
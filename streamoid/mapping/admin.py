@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from mapping.models import Mappings
+from mapping.models import Mappings, RowManifest, TransformCache, UniqueValue
 
 
 @admin.register(Mappings)
@@ -14,3 +14,25 @@ class MappingsAdmin(admin.ModelAdmin):
         "seller_file__path",
     )
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(TransformCache)
+class TransformCacheAdmin(admin.ModelAdmin):
+    list_display = ("id", "bucket_name", "object_name", "hits", "last_used_at", "created_at")
+    search_fields = ("cache_key", "bucket_name", "object_name")
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(UniqueValue)
+class UniqueValueAdmin(admin.ModelAdmin):
+    list_display = ("id", "seller", "marketplace_template", "mapping", "field", "active", "created_at")
+    list_filter = ("active", "field")
+    search_fields = ("value_digest",)
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(RowManifest)
+class RowManifestAdmin(admin.ModelAdmin):
+    list_display = ("id", "bucket_name", "object_name", "rows_count", "updated_at")
+    search_fields = ("lineage_key", "bucket_name", "object_name")
+    readonly_fields = ("created_at", "updated_at")
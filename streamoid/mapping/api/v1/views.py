@@ -6,23 +6,47 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.conditional import conditional_get
 from core.constants import HEAD_DATA
-from core.schema import PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER
+from core.response_cache import cached_response
+from core.schema import (
+    CURSOR_PARAMETER,
+    EXPAND_PARAMETER,
+    FIELDS_PARAMETER,
+    PAGE_NUMBER_PARAMETER,
+    PAGE_SIZE_PARAMETER,
+)
 from core.serializers import ErrorResponseSerializer
 from mapping.api.v1.paramters import MAPPING_ID_PARAMETER, MARKETPLACE_ID_PARAMETER, SELLER_ID_PARAMETER
 from mapping.api.v1.schema_serializers import MappingCreateRequestSerializer, MappingsListResponseSerializer
+from mapping.models import Mappings
 from mapping.services.mapping_base import MappingService
+from marketplace.models import Marketplace, MarketplaceTempate
+from seller.models import Seller, SellerFiles
+
+# Mapping responses nest the seller file and template.
+MAPPING_RESPONSE_MODELS = (Mappings, SellerFiles, Seller, MarketplaceTempate, Marketplace)
 
 
 class MappingsView(APIView):
     @extend_schema(
         operation_id="v1_mapping_list",
-        parameters=[MARKETPLACE_ID_PARAMETER, SELLER_ID_PARAMETER, PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER],
+        parameters=[
+            MARKETPLACE_ID_PARAMETER,
+            SELLER_ID_PARAMETER,
+            PAGE_NUMBER_PARAMETER,
+            PAGE_SIZE_PARAMETER,
+            CURSOR_PARAMETER,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
+        ],
         responses={
             200: MappingsListResponseSerializer,
             400: ErrorResponseSerializer,
         },
     )
+    @conditional_get(lambda request: MappingService(request).list_queryset(request), MappingService.version_fields)
+    @cached_response("mappings", MAPPING_RESPONSE_MODELS)
     def get(self, request: Request, *args, **kwargs):
         response = MappingService(request).list(request)
         return Response(response, status=response.get("code"), headers=HEAD_DATA)
@@ -47,12 +71,17 @@ class MappingsView(APIView):
 class MappingsDetailView(APIView):
     @extend_schema(
         operation_id="v1_mapping_retrieve",
-        parameters=[MAPPING_ID_PARAMETER],
+        parameters=[MAPPING_ID_PARAMETER, FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={
             200: MappingsListResponseSerializer,
             404: ErrorResponseSerializer,
         },
     )
+    @conditional_get(
+        lambda request, mapping_id: MappingService(request).detail_queryset(mapping_id),
+        MappingService.version_fields,
+    )
+    @cached_response("mappings", MAPPING_RESPONSE_MODELS)
     def get(self, request: Request, *args, **kwargs):
         mapping_id = kwargs.get("mapping_id")
         response = MappingService(request).get(mapping_id)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MappingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "mapping"
+
+    def ready(self):
+        from core.response_cache import ResponseCache
+        from mapping.models import Mappings
+
+        ResponseCache.watch(Mappings)
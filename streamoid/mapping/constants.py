@@ -1,11 +1,20 @@
 EVALUATION_STATUS_PENDING = "pending"
+EVALUATION_STATUS_PROCESSING = "processing"
 EVALUATION_STATUS_FAILED = "failed"
 EVALUATION_STATUS_SUCCESS = "success"
 
 EVALUATION_STATUS_CHOICES = (
     (EVALUATION_STATUS_PENDING, "Pending"),
+    (EVALUATION_STATUS_PROCESSING, "Processing"),
     (EVALUATION_STATUS_FAILED, "Failed"),
     (EVALUATION_STATUS_SUCCESS, "Success"),
 )
 
 TRANSFORMED_FOLDER = "transformed"
+# Appended to the transformed object name for the report of rows that failed validation.
+ERROR_REPORT_SUFFIX = ".errors.jsonl"
+# Appended to the transformed object name (with the lineage key prefix) for its gzipped row-hash manifest.
+ROW_MANIFEST_SUFFIX = ".manifest.jsonl.gz"
+
+# Length of a hex SHA-256 transformation fingerprint.
+TRANSFORM_CACHE_KEY_LENGTH = 64
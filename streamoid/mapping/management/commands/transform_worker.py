@@ -0,0 +1,25 @@
+from cron.transform_worker import TransformWorker
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Run the long-lived worker that transforms pending mappings as soon as they are created."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Worker processes per batch.")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit non-zero unless a running worker has written a recent heartbeat.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            if not TransformWorker.is_alive():
+                raise CommandError("Transform worker heartbeat is missing or stale.")
+            self.stdout.write("alive")
+            return
+
+        worker = TransformWorker(workers=options["workers"])
+        worker.install_signal_handlers()
+        worker.run()
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0001_initial'),
+        ('marketplace', '0001_initial'),
+        ('seller', '0002_rename_bucket_name_seller_seller_uuid_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mappings',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='mappings',
+            name='lease_owner',
+            field=models.CharField(blank=True, default=None, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='mappings',
+            name='evaluation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('failed', 'Failed'), ('success', 'Success')], default='pending', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='mappings',
+            index=models.Index(fields=['evaluation_status', 'lease_expires_at'], name='mapping_map_evaluat_ffa982_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0002_mappings_lease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransformCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('bucket_name', models.CharField(max_length=255)),
+                ('object_name', models.CharField(max_length=512)),
+                ('etag', models.CharField(max_length=255)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0003_transform_cache'),
+        ('marketplace', '0002_marketplace_cursor_index'),
+        ('seller', '0005_sellerfiles_cursor_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mappings',
+            index=models.Index(fields=['created_at', 'id'], name='mapping_map_created_0ab49e_idx'),
+        ),
+    ]
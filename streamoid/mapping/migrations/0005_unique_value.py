@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0004_mappings_cursor_index'),
+        ('marketplace', '0004_refresh_marketplacetempate_schema'),
+        ('seller', '0005_sellerfiles_cursor_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UniqueValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('field', models.CharField(max_length=255)),
+                ('value_digest', models.CharField(max_length=64)),
+                ('active', models.BooleanField(default=False)),
+                ('mapping', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unique_values', to='mapping.mappings')),
+                ('marketplace_template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='marketplace.marketplacetempate')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='seller.seller')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seller', 'marketplace_template', 'field', 'value_digest'], name='mapping_uni_seller__b94f10_idx')],
+            },
+        ),
+    ]
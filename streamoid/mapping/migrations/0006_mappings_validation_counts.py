@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0005_unique_value'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mappings',
+            name='error_report_path',
+            field=models.CharField(blank=True, default=None, max_length=512, null=True),
+        ),
+        migrations.AddField(
+            model_name='mappings',
+            name='error_rows_count',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='mappings',
+            name='valid_rows_count',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+    ]
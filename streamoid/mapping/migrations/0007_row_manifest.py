@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0006_mappings_validation_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('lineage_key', models.CharField(max_length=64, unique=True)),
+                ('bucket_name', models.CharField(max_length=255)),
+                ('object_name', models.CharField(max_length=512)),
+                ('output_object_name', models.CharField(max_length=512)),
+                ('etag', models.CharField(max_length=255)),
+                ('output_etag', models.CharField(max_length=255)),
+                ('rows_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
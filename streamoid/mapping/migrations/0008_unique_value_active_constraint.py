@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+def mark_staged_values(apps, schema_editor):
+    # Staged values are NULL rather than False so the constraint only covers published ones.
+    UniqueValue = apps.get_model('mapping', 'UniqueValue')
+    UniqueValue.objects.filter(active=False).update(active=None)
+
+
+def unmark_staged_values(apps, schema_editor):
+    UniqueValue = apps.get_model('mapping', 'UniqueValue')
+    UniqueValue.objects.filter(active__isnull=True).update(active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mapping', '0007_row_manifest'),
+        ('marketplace', '0004_refresh_marketplacetempate_schema'),
+        ('seller', '0005_sellerfiles_cursor_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='uniquevalue',
+            name='mapping_uni_seller__b94f10_idx',
+        ),
+        migrations.AlterField(
+            model_name='uniquevalue',
+            name='active',
+            field=models.BooleanField(default=None, null=True),
+        ),
+        migrations.RunPython(mark_staged_values, unmark_staged_values),
+        migrations.AddConstraint(
+            model_name='uniquevalue',
+            constraint=models.UniqueConstraint(fields=('seller', 'marketplace_template', 'field', 'value_digest', 'active'), name='mapping_unique_active_value'),
+        ),
+    ]
@@ -1,14 +1,20 @@
 from pathlib import Path
 
 from django.db import models
+from django.utils import timezone
 
 from core.constants import MAX_NAME_LENGTH
 from core.minio import MinioHandler
 from core.models import BaseModel
-from mapping.constants import EVALUATION_STATUS_CHOICES, EVALUATION_STATUS_PENDING, TRANSFORMED_FOLDER
+from mapping.constants import (
+    EVALUATION_STATUS_CHOICES,
+    EVALUATION_STATUS_PENDING,
+    TRANSFORM_CACHE_KEY_LENGTH,
+    TRANSFORMED_FOLDER,
+)
 from marketplace.models import MarketplaceTempate
-from seller.constants import MAX_FILE_PATH_LENGTH
-from seller.models import SellerFiles
+from seller.constants import MAX_FILE_PATH_LENGTH, SHA256_HEX_LENGTH
+from seller.models import Seller, SellerFiles
 
 
 class Mappings(BaseModel):
@@ -21,6 +27,20 @@ class Mappings(BaseModel):
         default=EVALUATION_STATUS_PENDING,
     )
     transformed_file_path = models.CharField(max_length=MAX_FILE_PATH_LENGTH, null=True, blank=True, default=None)
+    # Set while a transformer worker holds the mapping in the processing state.
+    lease_owner = models.CharField(max_length=MAX_NAME_LENGTH, null=True, blank=True, default=None)
+    lease_expires_at = models.DateTimeField(null=True, blank=True, default=None)
+    # Outcome of the last validation pass; left empty when a cached transformation was reused.
+    valid_rows_count = models.PositiveIntegerField(null=True, blank=True, default=None)
+    error_rows_count = models.PositiveIntegerField(null=True, blank=True, default=None)
+    error_report_path = models.CharField(max_length=MAX_FILE_PATH_LENGTH, null=True, blank=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["evaluation_status", "lease_expires_at"]),
+            # Backs cursor pagination.
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         return (
@@ -28,8 +48,85 @@ class Mappings(BaseModel):
             f"| Seller File: {self.seller_file_id}"
         )
 
+    @staticmethod
+    def transformed_object_name(seller_file_name, marketplace_template_id) -> str:
+        # One object per template, so a file mapped to several marketplaces keeps every output.
+        return str(Path(TRANSFORMED_FOLDER).joinpath(str(marketplace_template_id), seller_file_name))
+
     @property
     def transformed_file(self):
-        bucket_name = self.seller_file.seller.bucket_name
-        file_name = str(Path(TRANSFORMED_FOLDER).joinpath(self.seller_file.name))
+        if self.transformed_file_path:
+            # Cache hits can point at an object produced for another seller file in the same bucket.
+            bucket_name, _sep, file_name = self.transformed_file_path.partition("/")
+        else:
+            bucket_name = self.seller_file.seller.bucket_name
+            file_name = self.transformed_object_name(self.seller_file.name, self.marketplace_template_id)
         return MinioHandler().get_file(bucket_name, file_name)
+
+
+class TransformCache(BaseModel):
+    """Points a transformation fingerprint at the MinIO object it already produced."""
+
+    cache_key = models.CharField(max_length=TRANSFORM_CACHE_KEY_LENGTH, unique=True)
+    bucket_name = models.CharField(max_length=MAX_NAME_LENGTH)
+    object_name = models.CharField(max_length=MAX_FILE_PATH_LENGTH)
+    # ETag of the object when it was cached; a mismatch means it has since been overwritten.
+    etag = models.CharField(max_length=MAX_NAME_LENGTH)
+    hits = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return (
+            f"<TransformCache: {self.id} | Key: {self.cache_key} | Object: {self.bucket_name}/{self.object_name}"
+        )
+
+    @property
+    def path(self):
+        return str(Path(self.bucket_name).joinpath(self.object_name))
+
+
+class UniqueValue(BaseModel):
+    """
+    Digest of one value of a `unique` template field in a seller's transformed listings.
+    Rows are staged inactive while their mapping is validated and activated when it
+    succeeds; deleting the mapping (or its seller file) removes them.
+    """
+
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE)
+    marketplace_template = models.ForeignKey(MarketplaceTempate, on_delete=models.CASCADE)
+    mapping = models.ForeignKey(Mappings, on_delete=models.CASCADE, related_name="unique_values")
+    field = models.CharField(max_length=MAX_NAME_LENGTH)
+    value_digest = models.CharField(max_length=SHA256_HEX_LENGTH)
+    # True once published, NULL while staged: NULLs never collide in the unique constraint below,
+    # which keeps it portable to MySQL (no partial indexes) while staged rows may repeat values.
+    active = models.BooleanField(null=True, default=None)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "marketplace_template", "field", "value_digest", "active"],
+                name="mapping_unique_active_value",
+            )
+        ]
+
+    def __str__(self):
+        return f"<UniqueValue: {self.id} | Mapping: {self.mapping_id} | Field: {self.field}"
+
+
+class RowManifest(BaseModel):
+    """
+    Points a seller file lineage (same file name, template and mappings) at the row-hash
+    manifest of its last successful transform and the output object it describes.
+    """
+
+    lineage_key = models.CharField(max_length=TRANSFORM_CACHE_KEY_LENGTH, unique=True)
+    bucket_name = models.CharField(max_length=MAX_NAME_LENGTH)
+    object_name = models.CharField(max_length=MAX_FILE_PATH_LENGTH)
+    output_object_name = models.CharField(max_length=MAX_FILE_PATH_LENGTH)
+    # ETags when the manifest was stored; a mismatch means either object has since been overwritten.
+    etag = models.CharField(max_length=MAX_NAME_LENGTH)
+    output_etag = models.CharField(max_length=MAX_NAME_LENGTH)
+    rows_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"<RowManifest: {self.id} | Rows: {self.rows_count} | Object: {self.bucket_name}/{self.object_name}"
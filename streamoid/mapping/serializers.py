@@ -2,9 +2,11 @@ from rest_framework import serializers
 
 from core.file_validation import validate_file
 from core.serializers import DetailsBaseSerializer
+from core.template_schema import TemplateSchemaError, get_template_schema
 from mapping.models import Mappings
 from marketplace.models import MarketplaceTempate
 from marketplace.serializers import MarketplaceTemplateListSerializer
+from seller.constants import INGESTION_STATUS_FAILED, INGESTION_STATUS_INGESTING
 from seller.models import SellerFiles
 from seller.serializers import SellerFilesSerializer
 
@@ -20,6 +22,9 @@ class MappingsListSerializer(DetailsBaseSerializer):
             "seller_file",
             "mappings",
             "evaluation_status",
+            "valid_rows_count",
+            "error_rows_count",
+            "error_report_path",
         )
 
 
@@ -57,6 +62,10 @@ class MappingCreateSerializer(serializers.ModelSerializer):
         seller_file = SellerFiles.objects.filter(id=seller_file_id).select_related("seller").last()
         if not seller_file:
             raise serializers.ValidationError("Invaid seller file Id")
+        if seller_file.ingestion_status == INGESTION_STATUS_INGESTING:
+            raise serializers.ValidationError("Seller file is still being ingested. Please try again shortly.")
+        if seller_file.ingestion_status == INGESTION_STATUS_FAILED:
+            raise serializers.ValidationError("Seller file failed ingestion and cannot be mapped.")
         self._seller_file = seller_file
         return seller_file_id
 
@@ -91,33 +100,30 @@ class MappingCreateSerializer(serializers.ModelSerializer):
         if seller_key in seen_seller:
             raise serializers.ValidationError(f"Seller header '{seller_key}' is mapped more than once.")
 
-    def _allows_multiple(self, marketplace_key, template_rules):
-        rules = template_rules.get(marketplace_key) or {}
-        return (rules.get("type") or "").lower() in {"array", "list"}
-
-    def _validate_unique_marketplace(self, marketplace_key, seen_marketplace, template_rules):
-        if marketplace_key in seen_marketplace and not self._allows_multiple(marketplace_key, template_rules):
+    def _validate_unique_marketplace(self, marketplace_key, seen_marketplace, list_fields):
+        # Only list fields collect several seller columns.
+        if marketplace_key in seen_marketplace and marketplace_key not in list_fields:
             raise serializers.ValidationError(f"Marketplace key '{marketplace_key}' is mapped more than once.")
 
     def _validate_mapping_item(
-        self, mapping, index, template_rules, template_keys, seller_headers, seen_seller, seen_marketplace
+        self, mapping, index, list_fields, template_keys, seller_headers, seen_seller, seen_marketplace
     ):
         self._validate_mapping_dict(mapping, index)
         seller_key, marketplace_key = self._extract_mapping_keys(mapping, index)
         self._validate_seller_header(seller_key, seller_headers)
         self._validate_marketplace_key(marketplace_key, template_keys)
         self._validate_unique_seller(seller_key, seen_seller)
-        self._validate_unique_marketplace(marketplace_key, seen_marketplace, template_rules)
+        self._validate_unique_marketplace(marketplace_key, seen_marketplace, list_fields)
         return seller_key, marketplace_key
 
-    def _validate_mapping_items(self, mappings, template_rules, template_keys, seller_headers):
+    def _validate_mapping_items(self, mappings, list_fields, template_keys, seller_headers):
         seen_seller = set()
         seen_marketplace = set()
         for index, mapping in enumerate(mappings):
             seller_key, marketplace_key = self._validate_mapping_item(
                 mapping,
                 index,
-                template_rules,
+                list_fields,
                 template_keys,
                 seller_headers,
                 seen_seller,
@@ -135,13 +141,17 @@ class MappingCreateSerializer(serializers.ModelSerializer):
 
         self._validate_mappings_list(mappings)
 
-        template_rules = template.template or {}
-        template_keys = set(template_rules)
+        try:
+            schema = get_template_schema(template)
+        except TemplateSchemaError:
+            raise serializers.ValidationError("Invalid template schema.")
+        template_keys = {field["name"] for field in schema["fields"]}
+        list_fields = set(schema["list_fields"])
         seller_headers = set(seller_file.headers or [])
 
         seen_marketplace = self._validate_mapping_items(
             mappings,
-            template_rules,
+            list_fields,
             template_keys,
             seller_headers,
         )
@@ -0,0 +1,52 @@
+import json
+from contextlib import ExitStack
+from io import BufferedWriter
+
+from loguru import logger
+
+from core.minio import MinioHandler
+from mapping.constants import ERROR_REPORT_SUFFIX
+from seller.constants import STREAM_CHUNK_SIZE
+
+log = logger.bind(component="error_report")
+
+
+class ErrorReportService:
+    """
+    Stream the rows that failed validation as JSON lines to MinIO, next to the
+    transformed output (`transformed/<file>.errors.jsonl`). The upload is only
+    opened by the first error, so clean files never create a report.
+    """
+
+    def __init__(self, bucket_name: str, output_name: str):
+        self.bucket_name = bucket_name
+        self.object_name = f"{output_name}{ERROR_REPORT_SUFFIX}"
+        self.count = 0
+        self._stack = ExitStack()
+        self._output = None
+
+    @property
+    def path(self) -> str | None:
+        return f"{self.bucket_name}/{self.object_name}" if self.count else None
+
+    def write(self, error: dict) -> None:
+        if self._output is None:
+            upload = self._stack.enter_context(
+                MinioHandler().open_upload_stream(self.bucket_name, self.object_name)
+            )
+            self._output = BufferedWriter(upload, buffer_size=STREAM_CHUNK_SIZE)
+        self._output.write(json.dumps(error, default=str).encode("utf-8") + b"\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Upload the report; it is kept even when the transform itself failed."""
+        if self._output is not None:
+            try:
+                self._output.flush()
+            finally:
+                # Detach so a collected BufferedWriter does not close the upload before it is committed.
+                self._output.detach()
+                self._output = None
+        self._stack.close()
+        if self.count:
+            log.info("Reported {} invalid rows: {}", self.count, self.path)
@@ -2,12 +2,24 @@ from loguru import logger
 from rest_framework.request import Request
 
 from core.base_service import BaseService, PaginationService
+from core.fieldsets import SparseFieldset
 from mapping.models import Mappings
 from mapping.serializers import MappingCreateSerializer, MappingsListSerializer
 
 
 class MappingService(BaseService):
-    def __init__(self, *args, **kwargs):
+    # Mapping responses nest the seller file and template (and, inside them, the seller and marketplace),
+    # so edits to any of them change the representation too.
+    version_fields = (
+        "updated_at",
+        "seller_file__updated_at",
+        "seller_file__seller__updated_at",
+        "marketplace_template__updated_at",
+        "marketplace_template__marketplace__updated_at",
+    )
+
+    def __init__(self, request: Request | None = None, *args, **kwargs):
+        self.fieldset = SparseFieldset.from_query_params(request.query_params) if request else None
         self.mappings_select_related = [
             "marketplace_template",
             "marketplace_template__marketplace",
@@ -15,27 +27,33 @@ class MappingService(BaseService):
             "seller_file__seller",
         ]
 
-    def list(self, request: Request):
-        query_params = request.query_params.dict()
-        page_number, page_size = query_params.get("page_number"), query_params.get("page_size")
+    def list_queryset(self, request: Request):
+        query_params = request.query_params
         filters = {}
         if query_params.get("marketplace_id"):
             filters["marketplace_template__marketplace_id"] = query_params.get("marketplace_id")
         if query_params.get("seller_id"):
             filters["seller_file__seller_id"] = query_params.get("seller_id")
+        return Mappings.objects.filter(**filters)
 
+    def detail_queryset(self, mapping_id):
+        return Mappings.objects.filter(id=mapping_id)
+
+    def list(self, request: Request):
+        query_params = request.query_params.dict()
+        page_number, page_size = query_params.get("page_number"), query_params.get("page_size")
         mappings = (
-            Mappings.objects.filter(**filters)
-            .select_related(*self.mappings_select_related)
-            .order_by("-created_at")
+            self.list_queryset(request).select_related(*self.mappings_select_related).order_by("-created_at")
         )
-        return PaginationService(page_number, page_size).paginated_response(mappings, MappingsListSerializer)
+        return PaginationService(
+            page_number, page_size, cursor=query_params.get("cursor"), fieldset=self.fieldset
+        ).paginated_response(mappings, MappingsListSerializer)
 
     def get(self, mapping_id):
-        mapping = Mappings.objects.filter(id=mapping_id).select_related(*self.mappings_select_related)
+        mapping = self.detail_queryset(mapping_id).select_related(*self.mappings_select_related)
         if not mapping.exists():
             return self.get_404_response("Mapping Not Found")
-        return PaginationService().paginated_response(mapping, MappingsListSerializer)
+        return PaginationService(fieldset=self.fieldset).paginated_response(mapping, MappingsListSerializer)
 
     def create(self, request: Request):
         data = request.data
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+
+from core.helpers import generate_lease_owner
+from core.response_cache import ResponseCache
+from mapping.constants import EVALUATION_STATUS_PENDING, EVALUATION_STATUS_PROCESSING
+from mapping.models import Mappings
+
+log = logger.bind(component="mapping_claims")
+
+
+class MappingClaimService:
+    """
+    Atomically claim pending mappings for a single transformer worker.
+    Claimed rows move to `processing` with a lease owner and expiry; rows whose
+    lease expires (e.g. the worker died) are returned to `pending` by
+    `release_expired`.
+    """
+
+    def __init__(self, owner: str | None = None, lease_seconds: int | None = None):
+        self.owner = owner or self.generate_owner()
+        self.lease_seconds = lease_seconds or settings.MAPPING_LEASE_SECONDS
+
+    @staticmethod
+    def generate_owner() -> str:
+        return generate_lease_owner()
+
+    def claim_group_ids(self, batch_size: int) -> list[list[int]]:
+        """
+        Claim every pending mapping of up to `batch_size` seller files, so a file is read
+        once for all of its templates. Returns the claimed ids grouped by seller file.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # SKIP LOCKED lets concurrent runners claim disjoint batches on MySQL.
+            seller_file_ids = set(
+                Mappings.objects.select_for_update(skip_locked=True)
+                .filter(evaluation_status=EVALUATION_STATUS_PENDING)
+                .order_by("id")
+                .values_list("seller_file_id", flat=True)[:batch_size]
+            )
+            if not seller_file_ids:
+                return []
+            candidate_ids = list(
+                Mappings.objects.select_for_update(skip_locked=True)
+                .filter(evaluation_status=EVALUATION_STATUS_PENDING, seller_file_id__in=seller_file_ids)
+                .values_list("id", flat=True)
+            )
+            # The status guard keeps the claim safe on backends without row locks.
+            Mappings.objects.filter(id__in=candidate_ids, evaluation_status=EVALUATION_STATUS_PENDING).update(
+                evaluation_status=EVALUATION_STATUS_PROCESSING,
+                lease_owner=self.owner,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                updated_at=now,
+            )
+        # Bulk updates skip `post_save`, so cached mapping responses are invalidated by hand.
+        ResponseCache.invalidate(Mappings)
+        groups = {}
+        for mapping_id, seller_file_id in (
+            Mappings.objects.filter(
+                id__in=candidate_ids, evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner=self.owner
+            )
+            .order_by("id")
+            .values_list("id", "seller_file_id")
+        ):
+            groups.setdefault(seller_file_id, []).append(mapping_id)
+        return list(groups.values())
+
+    def claim_groups(self, batch_size: int) -> list[list[Mappings]]:
+        groups = self.claim_group_ids(batch_size)
+        if not groups:
+            return []
+        mappings = Mappings.objects.filter(id__in=[mapping_id for group in groups for mapping_id in group])
+        by_id = {mapping.id: mapping for mapping in mappings.select_related("marketplace_template", "seller_file")}
+        return [[by_id[mapping_id] for mapping_id in group] for group in groups]
+
+    def renew(self, mapping_ids: list[int]) -> list[int]:
+        """Extend this owner's leases on mappings still being transformed; returns the ids it still holds."""
+        if not mapping_ids:
+            return []
+        held = Mappings.objects.filter(
+            id__in=mapping_ids, evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner=self.owner
+        )
+        # Only the lease moves; `updated_at` drives response validators and stays put.
+        held.update(lease_expires_at=timezone.now() + timedelta(seconds=self.lease_seconds))
+        return list(held.order_by("id").values_list("id", flat=True))
+
+    def finish(self, mapping: Mappings, update_fields: list[str]) -> bool:
+        """
+        Write a transform result and drop the lease, unless another owner has taken the
+        mapping over since; returns whether the result was written.
+        """
+        fields = {field: getattr(mapping, field) for field in update_fields}
+        fields.update(lease_owner=None, lease_expires_at=None, updated_at=timezone.now())
+        finished = Mappings.objects.filter(id=mapping.id, lease_owner=self.owner).update(**fields)
+        # Bulk updates skip `post_save`, so cached mapping responses are invalidated by hand.
+        ResponseCache.invalidate(Mappings)
+        return bool(finished)
+
+    def release(self, mapping_ids: list[int]) -> int:
+        """Return mappings this owner claimed but will not process to `pending`."""
+        if not mapping_ids:
+            return 0
+        released = Mappings.objects.filter(
+            id__in=mapping_ids, evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner=self.owner
+        ).update(
+            evaluation_status=EVALUATION_STATUS_PENDING,
+            lease_owner=None,
+            lease_expires_at=None,
+            updated_at=timezone.now(),
+        )
+        if released:
+            ResponseCache.invalidate(Mappings)
+        return released
+
+    @staticmethod
+    def release_expired() -> int:
+        now = timezone.now()
+        released = Mappings.objects.filter(
+            evaluation_status=EVALUATION_STATUS_PROCESSING, lease_expires_at__lt=now
+        ).update(
+            evaluation_status=EVALUATION_STATUS_PENDING,
+            lease_owner=None,
+            lease_expires_at=None,
+            updated_at=now,
+        )
+        if released:
+            ResponseCache.invalidate(Mappings)
+            log.warning("Released {} mappings with expired leases", released)
+        return released
@@ -0,0 +1,274 @@
+import csv
+import gzip
+import hashlib
+import json
+import shutil
+import sqlite3
+import tempfile
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BufferedReader, TextIOWrapper
+from itertools import zip_longest
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from loguru import logger
+from openpyxl import load_workbook
+
+from core.minio import MinioHandler
+from mapping.constants import ROW_MANIFEST_SUFFIX
+from mapping.models import RowManifest
+from seller.constants import CSV, STREAM_CHUNK_SIZE, XLSX
+
+log = logger.bind(component="row_manifest")
+
+ROW_KEY_BYTES = 16
+# zlib window bits that produce a gzip container.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+# Prefix of the lineage key kept in the manifest object name, so templates of one file never share a manifest.
+LINEAGE_PREFIX_LENGTH = 16
+
+ReusedRow = namedtuple("ReusedRow", ["data", "unique_values"])
+
+
+class RowManifestError(ValueError):
+    pass
+
+
+def _encode_unique_values(unique_values: dict) -> dict:
+    return {key: [item.decode("utf-8", "surrogatepass") for item in items] for key, items in unique_values.items()}
+
+
+def _decode_unique_values(unique_values: dict) -> dict:
+    return {key: [item.encode("utf-8", "surrogatepass") for item in items] for key, items in unique_values.items()}
+
+
+class RowManifestService:
+    """
+    Incremental re-transformation of a seller file lineage: uploads of the same file
+    name mapped to the same template with the same mappings. Each successful transform
+    stores a gzipped JSON-lines manifest next to its output, one line per output row:
+    the hash of the mapped source row and the encoded values of its `unique` fields.
+    The next transform loads the previous manifest and output into a temporary SQLite
+    index; `FileValidator` then copies the output row of every unchanged source row
+    (re-checking only its unique values) and validates the rest.
+    """
+
+    def __init__(self, mapping, template_keys: list[str], bucket_name: str, output_name: str):
+        self.mapping = mapping
+        self.template_keys = list(template_keys)
+        self.file_type = mapping.seller_file.file_type
+        self.bucket_name = bucket_name
+        self.output_name = output_name
+        self.lineage_key = self.build_key(mapping, bucket_name)
+        self.object_name = f"{output_name}.{self.lineage_key[:LINEAGE_PREFIX_LENGTH]}{ROW_MANIFEST_SUFFIX}"
+        self.minio = MinioHandler()
+        self.reused_count = 0
+        self.rows_count = 0
+        self._directory = None
+        self._db = None
+        self._writer = None
+        self._upload = None
+
+    @classmethod
+    def for_mapping(cls, mapping, template_keys: list[str], bucket_name: str, output_name: str):
+        """Return a manifest service for `mapping`, or None when incremental transforms are disabled."""
+        if not settings.INCREMENTAL_TRANSFORM:
+            return None
+        return cls(mapping, template_keys, bucket_name, output_name)
+
+    @staticmethod
+    def build_key(mapping, bucket_name: str) -> str:
+        lineage = json.dumps(
+            {
+                "bucket": bucket_name,
+                "file": mapping.seller_file.name,
+                "template": mapping.marketplace_template.template,
+                "mappings": mapping.mappings,
+                "format": mapping.seller_file.file_type,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(lineage.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def row_key(row_data: dict) -> bytes:
+        """Hash of a source row after header mapping, so unmapped or reordered columns do not matter."""
+        encoded = json.dumps(row_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.blake2b(encoded.encode("utf-8", "surrogatepass"), digest_size=ROW_KEY_BYTES).digest()
+
+    @property
+    def loaded(self) -> bool:
+        return self._db is not None
+
+    def load(self) -> int:
+        """Index the previous manifest of the lineage; returns the rows available for reuse (0 when none)."""
+        entry = RowManifest.objects.filter(lineage_key=self.lineage_key).first()
+        if entry is None:
+            return 0
+        try:
+            if not self._is_current(entry):
+                log.info(
+                    "Previous transform has since been overwritten: {}/{}", entry.bucket_name, entry.object_name
+                )
+                return 0
+            self._open_index()
+            loaded = self._index(entry)
+        except Exception as e:
+            # Reuse is an optimization; fall back to validating every row.
+            log.warning(f"Failed to load row manifest: {entry.bucket_name}/{entry.object_name} | Error: {e}")
+            self.close()
+            return 0
+        log.bind(mapping_id=self.mapping.id).info("Loaded {} reusable rows from {}", loaded, entry.object_name)
+        return loaded
+
+    def _is_current(self, entry: RowManifest) -> bool:
+        for object_name, etag in ((entry.object_name, entry.etag), (entry.output_object_name, entry.output_etag)):
+            stat = self.minio.stat_file(entry.bucket_name, object_name)
+            if stat is None or stat.etag != etag:
+                return False
+        return True
+
+    def _open_index(self) -> None:
+        self._directory = tempfile.mkdtemp(prefix="streamoid-manifest-")
+        self._db = sqlite3.connect(Path(self._directory) / "rows.sqlite3", isolation_level=None)
+        # Scratch data: nothing needs to survive a crash.
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute(
+            "CREATE TABLE rows (row_key BLOB PRIMARY KEY, cells TEXT NOT NULL, unique_values TEXT NOT NULL) "
+            "WITHOUT ROWID"
+        )
+
+    def _index(self, entry: RowManifest) -> int:
+        with (
+            self.minio.open_file_stream(entry.bucket_name, entry.object_name) as manifest_file,
+            self.minio.open_file_stream(entry.bucket_name, entry.output_object_name) as output_file,
+            self._read_output(output_file) as (header, output_rows),
+        ):
+            if header != self.template_keys:
+                raise RowManifestError("Previous output has different columns.")
+            lines = TextIOWrapper(gzip.GzipFile(fileobj=manifest_file), encoding="utf-8")
+            self._db.execute("BEGIN")
+            for offset, (line, cells) in enumerate(zip_longest(lines, output_rows)):
+                if line is None or cells is None:
+                    raise RowManifestError(f"Manifest and output disagree at row {offset}.")
+                row_key, unique_values = json.loads(line)
+                self._db.execute(
+                    "INSERT OR IGNORE INTO rows (row_key, cells, unique_values) VALUES (?, ?, ?)",
+                    (bytes.fromhex(row_key), json.dumps(cells, default=str), json.dumps(unique_values)),
+                )
+            self._db.execute("COMMIT")
+        return self._db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    @contextmanager
+    def _read_output(self, output_file):
+        """Yield the header and rows of a transformed object; Excel rows are padded to the header width."""
+        if self.file_type == CSV:
+            text_stream = TextIOWrapper(
+                BufferedReader(output_file, buffer_size=STREAM_CHUNK_SIZE), encoding="utf-8", newline=""
+            )
+            try:
+                reader = csv.reader(text_stream)
+                yield next(reader, []), reader
+            finally:
+                text_stream.detach().detach()
+            return
+        if self.file_type != XLSX:
+            raise RowManifestError("Unsupported file type.")
+        with tempfile.NamedTemporaryFile(suffix=XLSX) as spool_file:
+            shutil.copyfileobj(output_file, spool_file, STREAM_CHUNK_SIZE)
+            spool_file.flush()
+            workbook = load_workbook(filename=spool_file.name, read_only=True, data_only=True)
+            try:
+                width = len(self.template_keys)
+                rows = (
+                    list(row) + [None] * (width - len(row)) for row in workbook.active.iter_rows(values_only=True)
+                )
+                yield list(next(rows, [])), rows
+            finally:
+                workbook.close()
+
+    def lookup(self, row_key: bytes) -> ReusedRow | None:
+        if self._db is None:
+            return None
+        found = self._db.execute("SELECT cells, unique_values FROM rows WHERE row_key = ?", (row_key,)).fetchone()
+        if found is None:
+            return None
+        self.reused_count += 1
+        cells, unique_values = found
+        return ReusedRow(
+            dict(zip(self.template_keys, json.loads(cells))), _decode_unique_values(json.loads(unique_values))
+        )
+
+    @contextmanager
+    def open_writer(self):
+        """Stream the new manifest next to the output; it is only committed if the block succeeds."""
+        with self.minio.open_upload_stream(self.bucket_name, self.object_name) as upload:
+            self._upload = upload
+            self._writer = zlib.compressobj(wbits=GZIP_WBITS)
+            try:
+                yield self
+                upload.write(self._writer.flush())
+            finally:
+                self._writer = None
+
+    def record(self, row_key: bytes, unique_values: dict) -> None:
+        """Append the next output row; rows must be recorded in output order."""
+        line = json.dumps([row_key.hex(), _encode_unique_values(unique_values)], separators=(",", ":"))
+        compressed = self._writer.compress(line.encode("utf-8") + b"\n")
+        if compressed:
+            self._upload.write(compressed)
+        self.rows_count += 1
+
+    def store(self, output_etag: str | None) -> None:
+        """Point the lineage at the committed manifest and output."""
+        etag = getattr(getattr(self._upload, "result", None), "etag", None)
+        if not etag or not output_etag:
+            return
+        try:
+            RowManifest.objects.update_or_create(
+                lineage_key=self.lineage_key,
+                defaults={
+                    "bucket_name": self.bucket_name,
+                    "object_name": self.object_name,
+                    "output_object_name": self.output_name,
+                    "etag": etag,
+                    "output_etag": output_etag,
+                    "rows_count": self.rows_count,
+                },
+            )
+        except Exception as e:
+            # The output is already stored; a missing manifest only costs a full re-validation next time.
+            log.warning(f"Failed to store row manifest | Error: {e}")
+            return
+        log.bind(mapping_id=self.mapping.id).info(
+            "Stored row manifest: reused {} of {} rows", self.reused_count, self.rows_count
+        )
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    @staticmethod
+    def evict() -> int:
+        """Forget manifests of lineages that have not been transformed within the transform cache TTL."""
+        cutoff = timezone.now() - timedelta(seconds=settings.TRANSFORM_CACHE_TTL_SECONDS)
+        evicted = 0
+        minio = MinioHandler()
+        for entry in RowManifest.objects.filter(updated_at__lt=cutoff).iterator():
+            minio.remove_file(entry.bucket_name, entry.object_name)
+            entry.delete()
+            evicted += 1
+        if evicted:
+            log.info("Evicted {} row manifests", evicted)
+        return evicted
@@ -0,0 +1,103 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from loguru import logger
+
+from core.minio import MinioHandler
+from mapping.models import TransformCache
+
+log = logger.bind(component="transform_cache")
+
+
+class TransformCacheService:
+    """
+    Reuse transformed objects for identical (file content, template, mappings, format) inputs.
+    The seller file is fingerprinted by the SHA-256 recorded at upload (or its
+    MinIO ETag for older files), so no download is needed to compute a key.
+    Entries are verified against the cached object's ETag on lookup, since a
+    later transform of the same seller file overwrites that object.
+    """
+
+    def __init__(self, minio_handler: MinioHandler | None = None):
+        self.minio_handler = minio_handler or MinioHandler()
+
+    def _source_fingerprint(self, seller_file):
+        content_sha256 = getattr(seller_file, "content_sha256", None)
+        if content_sha256:
+            return ["sha256", content_sha256]
+        # Files uploaded before digests were recorded fall back to the object's ETag.
+        stat = self.minio_handler.stat_file(seller_file.seller.bucket_name, seller_file.name)
+        if stat is None or not stat.etag:
+            return None
+        return ["etag", stat.etag, stat.size]
+
+    def build_key(self, seller_file, marketplace_template, mappings) -> str | None:
+        source = self._source_fingerprint(seller_file)
+        if source is None:
+            return None
+        fingerprint = json.dumps(
+            {
+                # Scoped to the bucket so a hit never hands out another seller's object.
+                "bucket": seller_file.seller.bucket_name,
+                "source": source,
+                "template": marketplace_template.template,
+                "mappings": mappings,
+                "format": seller_file.file_type,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def lookup(self, cache_key: str) -> str | None:
+        entry = TransformCache.objects.filter(cache_key=cache_key).first()
+        if entry is None:
+            return None
+        stat = self.minio_handler.stat_file(entry.bucket_name, entry.object_name)
+        if stat is None or stat.etag != entry.etag:
+            log.info("Dropping stale transform cache entry: {}", entry.path)
+            entry.delete()
+            return None
+        TransformCache.objects.filter(id=entry.id).update(
+            hits=F("hits") + 1, last_used_at=timezone.now(), updated_at=timezone.now()
+        )
+        return entry.path
+
+    @staticmethod
+    def store(cache_key: str, bucket_name: str, object_name: str, etag: str | None) -> None:
+        if not etag:
+            return
+        try:
+            TransformCache.objects.update_or_create(
+                cache_key=cache_key,
+                defaults={
+                    "bucket_name": bucket_name,
+                    "object_name": object_name,
+                    "etag": etag,
+                    "last_used_at": timezone.now(),
+                },
+            )
+        except Exception as e:
+            # The transformed object is already stored; a missing cache entry only costs a re-run.
+            log.warning(f"Failed to store transform cache entry | Error: {e}")
+
+    @staticmethod
+    def evict() -> int:
+        cutoff = timezone.now() - timedelta(seconds=settings.TRANSFORM_CACHE_TTL_SECONDS)
+        evicted, _details = TransformCache.objects.filter(last_used_at__lt=cutoff).delete()
+        overflow_ids = list(
+            TransformCache.objects.order_by("-last_used_at", "-id").values_list("id", flat=True)[
+                settings.TRANSFORM_CACHE_MAX_ENTRIES :
+            ]
+        )
+        if overflow_ids:
+            trimmed, _details = TransformCache.objects.filter(id__in=overflow_ids).delete()
+            evicted += trimmed
+        if evicted:
+            log.info("Evicted {} transform cache entries", evicted)
+        return evicted
@@ -0,0 +1,136 @@
+import hashlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from loguru import logger
+from rest_framework.serializers import ValidationError
+
+from core.template_schema import get_template_schema
+from core.uniqueness import encode_unique_value
+from mapping.models import UniqueValue
+
+log = logger.bind(component="unique_index")
+
+
+class UniqueValueIndexService:
+    """
+    Enforce `unique` template fields across a seller's listings: every file whose
+    mapping to the same marketplace template was transformed successfully.
+    `FileValidator` passes each row's unique values to `add` and calls `flush` once
+    `is_full`; each batch is checked with one `IN` query per field and staged as
+    inactive rows for the mapping. `activate` publishes them once the transform succeeds (replacing
+    those of earlier transforms of the same file); `discard` drops them otherwise. A unique
+    constraint on active rows rejects values another worker published since they were checked.
+    """
+
+    def __init__(self, mapping, batch_size: int | None = None):
+        self.mapping = mapping
+        self.seller_id = mapping.seller_file.seller_id
+        self.batch_size = batch_size or settings.UNIQUE_INDEX_BATCH_SIZE
+        self._pending = []
+
+    @classmethod
+    def for_mapping(cls, mapping):
+        """Return an index for `mapping`, or None when there is nothing to enforce."""
+        if not settings.CROSS_FILE_UNIQUENESS:
+            return None
+        if not get_template_schema(mapping.marketplace_template)["unique_fields"]:
+            return None
+        if getattr(mapping.seller_file, "seller_id", None) is None:
+            return None
+        return cls(mapping)
+
+    @staticmethod
+    def digest(value) -> str:
+        return hashlib.sha256(encode_unique_value(value)).hexdigest()
+
+    def add(self, row_index: int, field: str, value) -> None:
+        self._pending.append((row_index, field, self.digest(value)))
+
+    def is_full(self) -> bool:
+        return len(self._pending) >= self.batch_size
+
+    def flush(self) -> list[dict]:
+        """
+        Check pending values against other listings and stage those of rows without a
+        conflict. Returns one error per conflicting row, in row order.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        digests_by_field = {}
+        for _row_index, field, digest in pending:
+            digests_by_field.setdefault(field, set()).add(digest)
+        taken = set()
+        for field, digests in digests_by_field.items():
+            taken.update(
+                (field, digest)
+                for digest in UniqueValue.objects.filter(
+                    seller_id=self.seller_id,
+                    marketplace_template_id=self.mapping.marketplace_template_id,
+                    field=field,
+                    value_digest__in=digests,
+                    active=True,
+                )
+                # Earlier transforms of the same file are being replaced, not duplicated.
+                .exclude(self._replaced())
+                .values_list("value_digest", flat=True)
+            )
+        conflicts = {}
+        for row_index, field, digest in pending:
+            if (field, digest) in taken and row_index not in conflicts:
+                conflicts[row_index] = {
+                    "row": row_index,
+                    "field": field,
+                    "error": "Duplicate value across the seller's listings.",
+                }
+        UniqueValue.objects.bulk_create(
+            [
+                UniqueValue(
+                    seller_id=self.seller_id,
+                    marketplace_template_id=self.mapping.marketplace_template_id,
+                    mapping_id=self.mapping.id,
+                    field=field,
+                    value_digest=digest,
+                )
+                for row_index, field, digest in pending
+                if row_index not in conflicts
+            ],
+            batch_size=self.batch_size,
+        )
+        return sorted(conflicts.values(), key=lambda error: error["row"])
+
+    def _replaced(self) -> Q:
+        """
+        Values of earlier transforms of this file: the same seller file, or an earlier upload
+        of the same file name mapped with the same mappings (each upload is a new seller file).
+        """
+        return Q(mapping__seller_file_id=self.mapping.seller_file_id) | Q(
+            mapping__seller_file__name=self.mapping.seller_file.name,
+            mapping__mappings=self.mapping.mappings,
+        )
+
+    def activate(self) -> None:
+        try:
+            with transaction.atomic():
+                replaced, _details = (
+                    UniqueValue.objects.filter(
+                        self._replaced(),
+                        seller_id=self.seller_id,
+                        marketplace_template_id=self.mapping.marketplace_template_id,
+                    )
+                    .exclude(mapping_id=self.mapping.id)
+                    .delete()
+                )
+                activated = UniqueValue.objects.filter(mapping_id=self.mapping.id).update(active=True)
+        except IntegrityError as e:
+            # Another file published one of these values after `flush` checked it.
+            raise ValidationError({"error": "Duplicate value across the seller's listings."}) from e
+        log.bind(mapping_id=self.mapping.id).info(
+            "Indexed {} unique values, replaced {} from earlier transforms", activated, replaced
+        )
+
+    def discard(self) -> None:
+        self._pending = []
+        UniqueValue.objects.filter(mapping_id=self.mapping.id).delete()
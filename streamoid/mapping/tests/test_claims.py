@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from mapping.constants import EVALUATION_STATUS_PENDING, EVALUATION_STATUS_PROCESSING, EVALUATION_STATUS_SUCCESS
+from mapping.models import Mappings
+from mapping.services.mapping_claims import MappingClaimService
+from marketplace.models import Marketplace, MarketplaceTempate
+from seller.constants import CSV
+from seller.models import Seller, SellerFiles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def build_mapping():
+    marketplace = Marketplace.objects.create(name="Demo Marketplace")
+    template = MarketplaceTempate.objects.create(marketplace=marketplace, template={"sku": {"type": "string"}})
+    seller = Seller.objects.create(name="Demo Seller")
+    seller_file = SellerFiles.objects.create(seller=seller, name="items.csv", file_type=CSV, path="b/items.csv")
+
+    def _build(**kwargs):
+        return Mappings.objects.create(marketplace_template=template, seller_file=seller_file, **kwargs)
+
+    return _build
+
+
+def test_claim_moves_pending_mappings_to_processing(build_mapping):
+    first = build_mapping()
+    second = build_mapping()
+    build_mapping(evaluation_status=EVALUATION_STATUS_SUCCESS)
+
+    groups = MappingClaimService(owner="worker-a", lease_seconds=60).claim_groups(batch_size=10)
+
+    assert [[mapping.id for mapping in group] for group in groups] == [[first.id, second.id]]
+    for mapping in groups[0]:
+        assert mapping.evaluation_status == EVALUATION_STATUS_PROCESSING
+        assert mapping.lease_owner == "worker-a"
+        assert mapping.lease_expires_at > timezone.now()
+
+
+def test_claim_respects_batch_size_and_never_double_claims(build_mapping):
+    first = build_mapping()
+    mappings = [first] + [
+        Mappings.objects.create(
+            marketplace_template=first.marketplace_template,
+            seller_file=SellerFiles.objects.create(
+                seller=first.seller_file.seller,
+                name=f"items-{index}.csv",
+                file_type=CSV,
+                path=f"b/items-{index}.csv",
+            ),
+        )
+        for index in range(2)
+    ]
+
+    first_batch = MappingClaimService(owner="worker-a").claim_group_ids(batch_size=2)
+    second_batch = MappingClaimService(owner="worker-b").claim_group_ids(batch_size=2)
+    third_batch = MappingClaimService(owner="worker-c").claim_group_ids(batch_size=2)
+
+    assert first_batch == [[mappings[0].id], [mappings[1].id]]
+    assert second_batch == [[mappings[2].id]]
+    assert third_batch == []
+
+
+def test_release_expired_returns_stale_leases_to_pending(build_mapping):
+    now = timezone.now()
+    expired = build_mapping(
+        evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner="dead", lease_expires_at=now - timedelta(1)
+    )
+    active = build_mapping(
+        evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner="alive", lease_expires_at=now + timedelta(1)
+    )
+
+    released = MappingClaimService.release_expired()
+
+    expired.refresh_from_db()
+    active.refresh_from_db()
+    assert released == 1
+    assert expired.evaluation_status == EVALUATION_STATUS_PENDING
+    assert expired.lease_owner is None
+    assert expired.lease_expires_at is None
+    assert active.evaluation_status == EVALUATION_STATUS_PROCESSING
+    assert active.lease_owner == "alive"
+
+
+def test_claim_groups_takes_every_pending_mapping_of_a_file(build_mapping):
+    first = build_mapping()
+    other_file = SellerFiles.objects.create(
+        seller=first.seller_file.seller, name="more.csv", file_type=CSV, path="b/more.csv"
+    )
+    other = Mappings.objects.create(marketplace_template=first.marketplace_template, seller_file=other_file)
+    sibling = build_mapping()
+    build_mapping(evaluation_status=EVALUATION_STATUS_SUCCESS)
+
+    groups = MappingClaimService(owner="worker-a").claim_groups(batch_size=1)
+
+    assert [[mapping.id for mapping in group] for group in groups] == [[first.id, sibling.id]]
+    assert MappingClaimService(owner="worker-b").claim_group_ids(batch_size=5) == [[other.id]]
+
+
+def test_renew_extends_only_leases_the_owner_still_holds(build_mapping):
+    now = timezone.now()
+    held = build_mapping(
+        evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner="worker-a", lease_expires_at=now
+    )
+    taken = build_mapping(
+        evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner="worker-b", lease_expires_at=now
+    )
+
+    renewed = MappingClaimService(owner="worker-a", lease_seconds=60).renew([held.id, taken.id])
+
+    held.refresh_from_db()
+    taken.refresh_from_db()
+    assert renewed == [held.id]
+    assert held.lease_expires_at > now + timedelta(seconds=30)
+    assert taken.lease_expires_at == now
+
+
+def test_finish_drops_results_of_mappings_claimed_by_another_owner(build_mapping):
+    mapping = build_mapping(evaluation_status=EVALUATION_STATUS_PROCESSING, lease_owner="worker-a")
+    # The lease expired and another worker claimed the mapping.
+    Mappings.objects.filter(id=mapping.id).update(lease_owner="worker-b")
+    mapping.evaluation_status = EVALUATION_STATUS_SUCCESS
+
+    assert not MappingClaimService(owner="worker-a").finish(mapping, ["evaluation_status"])
+    mapping.refresh_from_db()
+    assert (mapping.evaluation_status, mapping.lease_owner) == (EVALUATION_STATUS_PROCESSING, "worker-b")
+
+    mapping.evaluation_status = EVALUATION_STATUS_SUCCESS
+    assert MappingClaimService(owner="worker-b").finish(mapping, ["evaluation_status"])
+    mapping.refresh_from_db()
+    assert (mapping.evaluation_status, mapping.lease_owner) == (EVALUATION_STATUS_SUCCESS, None)
@@ -0,0 +1,49 @@
+import json
+from io import BytesIO
+from unittest.mock import patch
+
+from mapping.constants import ERROR_REPORT_SUFFIX, TRANSFORMED_FOLDER
+from mapping.services.error_report import ErrorReportService
+
+
+class FakeUploadStream(BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.data = self.getvalue()
+        self.close()
+        return False
+
+
+def test_errors_are_streamed_as_json_lines_next_to_the_output():
+    upload_stream = FakeUploadStream()
+    report = ErrorReportService("bucket", f"{TRANSFORMED_FOLDER}/items.csv")
+
+    with patch(
+        "mapping.services.error_report.MinioHandler.open_upload_stream", return_value=upload_stream
+    ) as open_mock:
+        with patch("mapping.services.error_report.MinioHandler._get_client"):
+            report.write({"row": 3, "errors": {"price": ["A valid number is required."]}})
+            report.write({"row": 7, "field": "sku", "error": "Duplicate value for unique field."})
+            report.close()
+
+    object_name = f"{TRANSFORMED_FOLDER}/items.csv{ERROR_REPORT_SUFFIX}"
+    open_mock.assert_called_once_with("bucket", object_name)
+    assert [json.loads(line)["row"] for line in upload_stream.data.splitlines()] == [3, 7]
+    assert (report.count, report.path) == (2, f"bucket/{object_name}")
+
+
+def test_clean_files_create_no_report():
+    report = ErrorReportService("bucket", f"{TRANSFORMED_FOLDER}/items.csv")
+
+    with patch("mapping.services.error_report.MinioHandler.open_upload_stream") as open_mock:
+        report.close()
+
+    open_mock.assert_not_called()
+    assert report.path is None
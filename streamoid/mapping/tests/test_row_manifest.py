@@ -0,0 +1,116 @@
+import hashlib
+from contextlib import contextmanager
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from cron.file_transformer_cron import FileTransformerCron
+from rest_framework import serializers
+
+from core.file_validation import FileValidator
+from mapping.models import RowManifest
+from mapping.services.row_manifest import RowManifestService
+from seller.constants import CSV
+
+pytestmark = pytest.mark.django_db
+
+TEMPLATE = {"sku": {"type": "string", "unique": True}, "price": {"type": "number", "min": 1}}
+TEMPLATE_KEYS = ["sku", "price"]
+MAPPINGS = [{"seller": "SKU", "marketplace": "sku"}, {"seller": "Price", "marketplace": "price"}]
+HEADERS = ["SKU", "Price"]
+OUTPUT = "transformed/items.csv"
+
+
+class FakeStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def stat_file(self, bucket_name, file_name):
+        data = self.objects.get(file_name)
+        return None if data is None else SimpleNamespace(etag=hashlib.md5(data).hexdigest())
+
+    @contextmanager
+    def open_file_stream(self, bucket_name, file_name):
+        yield BytesIO(self.objects[file_name])
+
+    @contextmanager
+    def open_upload_stream(self, bucket_name, file_name):
+        upload = BytesIO()
+        yield upload
+        self.objects[file_name] = upload.getvalue()
+        upload.result = SimpleNamespace(etag=hashlib.md5(self.objects[file_name]).hexdigest())
+
+
+@pytest.fixture
+def storage():
+    return FakeStorage()
+
+
+@pytest.fixture
+def mapping():
+    return SimpleNamespace(
+        id=1,
+        seller_file=SimpleNamespace(name="items.csv", file_type=CSV),
+        marketplace_template=SimpleNamespace(template=TEMPLATE),
+        mappings=MAPPINGS,
+    )
+
+
+def _transform(mapping, storage, rows):
+    row_manifest = RowManifestService(mapping, TEMPLATE_KEYS, "bucket", OUTPUT)
+    row_manifest.minio = storage
+    try:
+        row_manifest.load()
+        with storage.open_upload_stream("bucket", OUTPUT) as output, row_manifest.open_writer():
+            validated_rows = FileValidator(
+                mapping.marketplace_template, MAPPINGS, HEADERS, rows, row_manifest=row_manifest
+            ).iter_validated_rows()
+            FileTransformerCron._write_transformed_file(TEMPLATE_KEYS, validated_rows, CSV, output)
+    finally:
+        row_manifest.close()
+    row_manifest.store(output.result.etag)
+    return row_manifest
+
+
+def _rows(count, changed=None):
+    changed = changed or {}
+    return [changed.get(index, [f"SKU-{index}", f"{index + 1}.50"]) for index in range(count)]
+
+
+def test_unchanged_rows_are_copied_from_the_previous_output(mapping, storage):
+    first = _transform(mapping, storage, _rows(50))
+    assert (first.reused_count, first.rows_count) == (0, 50)
+
+    rows = _rows(52, changed={7: ["SKU-7", "99"]})
+    rows.insert(0, rows.pop(30))
+    second = _transform(mapping, storage, rows)
+
+    assert (second.reused_count, second.rows_count) == (49, 52)
+    incremental_output = storage.objects[OUTPUT]
+    RowManifest.objects.all().delete()
+    _transform(mapping, storage, rows)
+    assert storage.objects[OUTPUT] == incremental_output
+
+
+def test_uniqueness_is_checked_across_reused_and_changed_rows(mapping, storage):
+    _transform(mapping, storage, _rows(10))
+
+    with pytest.raises(serializers.ValidationError) as exc_info:
+        _transform(mapping, storage, _rows(10, changed={8: ["SKU-2", "5"]}))
+
+    assert exc_info.value.detail == {"row": "8", "field": "sku", "error": "Duplicate value for unique field."}
+
+
+def test_overwritten_outputs_are_not_reused(mapping, storage):
+    _transform(mapping, storage, _rows(10))
+    storage.objects[OUTPUT] = b"sku,price\r\nother,1\r\n"
+
+    assert _transform(mapping, storage, _rows(10)).reused_count == 0
+
+
+def test_lineage_depends_on_template_and_mappings(mapping):
+    key = RowManifestService.build_key(mapping, "bucket")
+    other_template = SimpleNamespace(**{**vars(mapping), "marketplace_template": SimpleNamespace(template={})})
+
+    assert RowManifestService.build_key(other_template, "bucket") != key
+    assert RowManifestService.build_key(SimpleNamespace(**{**vars(mapping), "mappings": []}), "bucket") != key
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from mapping.models import TransformCache
+from mapping.services.transform_cache import TransformCacheService
+from seller.constants import CSV, XLSX
+
+pytestmark = pytest.mark.django_db
+
+
+def _seller_file(name="items.csv", file_type=CSV, bucket_name="bucket"):
+    return SimpleNamespace(name=name, file_type=file_type, seller=SimpleNamespace(bucket_name=bucket_name))
+
+
+def _service(etags):
+    minio_handler = MagicMock()
+
+    def stat_file(bucket_name, file_name):
+        etag = etags.get((bucket_name, file_name))
+        return None if etag is None else SimpleNamespace(etag=etag, size=10)
+
+    minio_handler.stat_file.side_effect = stat_file
+    return TransformCacheService(minio_handler=minio_handler)
+
+
+def test_build_key_depends_on_content_template_mappings_and_format():
+    template = SimpleNamespace(template={"sku": {"type": "string"}})
+    mappings = [{"seller": "sku", "marketplace": "sku"}]
+    service = _service({("bucket", "items.csv"): "a", ("bucket", "copy.csv"): "a", ("bucket", "items.xlsx"): "a"})
+
+    key = service.build_key(_seller_file(), template, mappings)
+
+    assert len(key) == 64
+    assert service.build_key(_seller_file(name="copy.csv"), template, mappings) == key
+    assert service.build_key(_seller_file(name="items.xlsx", file_type=XLSX), template, mappings) != key
+    assert service.build_key(_seller_file(), SimpleNamespace(template={"sku": {"type": "url"}}), mappings) != key
+    assert service.build_key(_seller_file(), template, [{"seller": "id", "marketplace": "sku"}]) != key
+    assert _service({("bucket", "items.csv"): "b"}).build_key(_seller_file(), template, mappings) != key
+    assert _service({}).build_key(_seller_file(), template, mappings) is None
+
+
+def test_lookup_returns_path_and_records_hit():
+    service = _service({("bucket", "transformed/items.csv"): "etag-1"})
+    service.store("key", "bucket", "transformed/items.csv", "etag-1")
+
+    assert service.lookup("key") == "bucket/transformed/items.csv"
+    assert service.lookup("missing") is None
+    assert TransformCache.objects.get(cache_key="key").hits == 1
+
+
+def test_lookup_drops_entry_when_object_was_overwritten():
+    service = _service({("bucket", "transformed/items.csv"): "etag-2"})
+    service.store("key", "bucket", "transformed/items.csv", "etag-1")
+
+    assert service.lookup("key") is None
+    assert not TransformCache.objects.filter(cache_key="key").exists()
+
+
+@override_settings(TRANSFORM_CACHE_TTL_SECONDS=60, TRANSFORM_CACHE_MAX_ENTRIES=2)
+def test_evict_removes_stale_and_least_recently_used_entries():
+    now = timezone.now()
+    for index, age in enumerate([120, 30, 20, 10]):
+        TransformCache.objects.create(
+            cache_key=f"key-{index}",
+            bucket_name="bucket",
+            object_name=f"transformed/{index}.csv",
+            etag="etag",
+            last_used_at=now - timedelta(seconds=age),
+        )
+
+    assert TransformCacheService.evict() == 2
+    assert set(TransformCache.objects.values_list("cache_key", flat=True)) == {"key-2", "key-3"}
+
+
+def test_build_key_prefers_upload_digest_over_etag():
+    template = SimpleNamespace(template={"sku": {"type": "string"}})
+    service = _service({})
+    seller_file = _seller_file()
+    seller_file.content_sha256 = "a" * 64
+
+    key = service.build_key(seller_file, template, [])
+
+    assert key is not None
+    service.minio_handler.stat_file.assert_not_called()
+    seller_file.content_sha256 = "b" * 64
+    assert service.build_key(seller_file, template, []) != key
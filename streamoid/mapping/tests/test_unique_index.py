@@ -0,0 +1,189 @@
+import pytest
+from rest_framework import serializers
+
+from core.file_validation import FileValidator
+from mapping.models import Mappings, UniqueValue
+from mapping.services.unique_index import UniqueValueIndexService
+from marketplace.models import Marketplace, MarketplaceTempate
+from seller.constants import CSV
+from seller.models import Seller, SellerFiles
+
+pytestmark = pytest.mark.django_db
+
+MAPPINGS = [{"seller": "SKU", "marketplace": "sku"}, {"seller": "Name", "marketplace": "name"}]
+
+
+@pytest.fixture
+def seller():
+    return Seller.objects.create(name="Demo Seller")
+
+
+@pytest.fixture
+def template():
+    marketplace = Marketplace.objects.create(name="Demo Marketplace")
+    return MarketplaceTempate.objects.create(
+        marketplace=marketplace, template={"sku": {"type": "string", "unique": True}, "name": {"type": "string"}}
+    )
+
+
+@pytest.fixture
+def build_mapping(seller, template):
+    def _build(name="items.csv", seller_file=None):
+        seller_file = seller_file or SellerFiles.objects.create(
+            seller=seller, name=name, file_type=CSV, path=f"b/{name}"
+        )
+        return Mappings.objects.create(marketplace_template=template, seller_file=seller_file, mappings=MAPPINGS)
+
+    return _build
+
+
+def _transform(mapping, skus, batch_size=None):
+    """Validate like the transformer does and activate the index on success."""
+    unique_index = UniqueValueIndexService(mapping, batch_size=batch_size)
+    unique_index.discard()
+    rows = [[sku, "Tee"] for sku in skus]
+    try:
+        FileValidator(
+            mapping.marketplace_template, MAPPINGS, ["SKU", "Name"], rows, unique_index=unique_index
+        ).validate()
+    except serializers.ValidationError:
+        unique_index.discard()
+        raise
+    unique_index.activate()
+
+
+def test_for_mapping_skips_templates_without_unique_fields(build_mapping, template, settings):
+    mapping = build_mapping()
+    assert UniqueValueIndexService.for_mapping(mapping) is not None
+
+    settings.CROSS_FILE_UNIQUENESS = False
+    assert UniqueValueIndexService.for_mapping(mapping) is None
+
+    settings.CROSS_FILE_UNIQUENESS = True
+    template.template = {"sku": {"type": "string"}}
+    template.save()
+    assert UniqueValueIndexService.for_mapping(mapping) is None
+
+
+def test_values_taken_by_another_file_are_rejected(build_mapping):
+    _transform(build_mapping("first.csv"), ["SKU-1", "SKU-2"])
+
+    second = build_mapping("second.csv")
+    with pytest.raises(serializers.ValidationError) as exc_info:
+        _transform(second, ["SKU-3", "SKU-4", "SKU-2"])
+
+    assert exc_info.value.detail["row"] == "2"
+    assert exc_info.value.detail["field"] == "sku"
+    assert not UniqueValue.objects.filter(mapping=second).exists()
+
+
+def test_conflicts_are_checked_in_batches(build_mapping, django_assert_num_queries):
+    _transform(build_mapping("first.csv"), ["SKU-1"])
+    mapping = build_mapping("second.csv")
+    unique_index = UniqueValueIndexService(mapping, batch_size=50)
+
+    # One IN lookup and one bulk insert per batch of 50 rows.
+    with django_assert_num_queries(4):
+        for row_index in range(100):
+            unique_index.add(row_index, "sku", f"SKU-{row_index + 2}")
+            if unique_index.is_full():
+                assert unique_index.flush() == []
+
+    assert UniqueValue.objects.filter(mapping=mapping, active__isnull=True).count() == 100
+
+
+def test_first_conflicting_row_is_reported_before_later_errors(build_mapping):
+    _transform(build_mapping("first.csv"), ["SKU-1"])
+
+    with pytest.raises(serializers.ValidationError) as exc_info:
+        # Row 1 is taken by the first file; row 3 repeats row 2 within the file.
+        _transform(build_mapping("second.csv"), ["SKU-9", "SKU-1", "SKU-8", "SKU-8"], batch_size=100)
+
+    assert exc_info.value.detail["row"] == "1"
+
+
+def test_staged_values_do_not_block_other_files(build_mapping):
+    pending = build_mapping("first.csv")
+    unique_index = UniqueValueIndexService(pending)
+    unique_index.add(0, "sku", "SKU-1")
+    assert unique_index.flush() == []
+
+    _transform(build_mapping("second.csv"), ["SKU-1"])
+
+
+def test_retransforming_a_file_replaces_its_values(build_mapping):
+    first = build_mapping("first.csv")
+    _transform(first, ["SKU-1", "SKU-2"])
+    _transform(first, ["SKU-2", "SKU-3"])
+    remapped = build_mapping(seller_file=first.seller_file)
+    _transform(remapped, ["SKU-3", "SKU-4"])
+
+    assert set(UniqueValue.objects.values_list("mapping_id", flat=True)) == {remapped.id}
+    assert UniqueValue.objects.filter(active=True).count() == 2
+    _transform(build_mapping("other.csv"), ["SKU-1", "SKU-2"])
+
+
+def test_reuploading_a_file_replaces_its_earlier_values(build_mapping):
+    first = build_mapping("items.csv")
+    _transform(first, ["SKU-1", "SKU-2"])
+
+    # A corrected re-upload is a new seller file with the same name.
+    reupload = build_mapping("items.csv")
+    _transform(reupload, ["SKU-2", "SKU-3"])
+
+    assert set(UniqueValue.objects.values_list("mapping_id", flat=True)) == {reupload.id}
+    _transform(build_mapping("other.csv"), ["SKU-1"])
+    with pytest.raises(serializers.ValidationError):
+        _transform(build_mapping("another.csv"), ["SKU-3"])
+
+
+def test_values_published_after_the_check_fail_activation(build_mapping):
+    first, second = build_mapping("first.csv"), build_mapping("second.csv")
+    staged = []
+    for mapping in (first, second):
+        unique_index = UniqueValueIndexService(mapping)
+        unique_index.add(0, "sku", "SKU-1")
+        # Both pass the check before either is published.
+        assert unique_index.flush() == []
+        staged.append(unique_index)
+
+    staged[0].activate()
+    with pytest.raises(serializers.ValidationError):
+        staged[1].activate()
+
+    assert set(UniqueValue.objects.filter(active=True).values_list("mapping_id", flat=True)) == {first.id}
+
+
+def test_deleting_a_file_prunes_its_values(build_mapping):
+    mapping = build_mapping("first.csv")
+    _transform(mapping, ["SKU-1"])
+
+    mapping.seller_file.delete()
+
+    assert not UniqueValue.objects.exists()
+    _transform(build_mapping("second.csv"), ["SKU-1"])
+
+
+def test_error_budget_skips_rows_taken_by_other_files(build_mapping):
+    _transform(build_mapping("first.csv"), ["SKU-1"])
+    mapping = build_mapping("second.csv")
+    unique_index = UniqueValueIndexService(mapping, batch_size=2)
+    reported = []
+
+    validated = FileValidator(
+        mapping.marketplace_template,
+        MAPPINGS,
+        ["SKU", "Name"],
+        [[sku, "Tee"] for sku in ["SKU-2", "SKU-1", "SKU-3", "SKU-2"]],
+        unique_index=unique_index,
+        error_budget=5,
+        on_error=reported.append,
+    ).validate()
+
+    assert [row["sku"] for row in validated] == ["SKU-2", "SKU-3"]
+    assert [(error["row"], error["error"]) for error in reported] == [
+        (1, "Duplicate value across the seller's listings."),
+        (3, "Duplicate value for unique field."),
+    ]
+    staged = UniqueValue.objects.filter(mapping=mapping).values_list("value_digest", flat=True)
+    assert sorted(staged) == sorted(UniqueValueIndexService.digest(sku) for sku in ["SKU-2", "SKU-3"])
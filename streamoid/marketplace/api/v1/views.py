@@ -6,8 +6,16 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.conditional import conditional_get
 from core.constants import HEAD_DATA
-from core.schema import PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER
+from core.response_cache import cached_response
+from core.schema import (
+    CURSOR_PARAMETER,
+    EXPAND_PARAMETER,
+    FIELDS_PARAMETER,
+    PAGE_NUMBER_PARAMETER,
+    PAGE_SIZE_PARAMETER,
+)
 from core.serializers import ErrorResponseSerializer
 from marketplace.api.v1.parameters import MARKETPLACE_ID_PARAMETER, MARKETPLACE_TEMPLATE_ID_PARAMETER
 from marketplace.api.v1.schema_serializers import (
@@ -16,6 +24,7 @@ from marketplace.api.v1.schema_serializers import (
     MarketplaceTemplateCreateRequestSerializer,
     MarketplaceTemplateListResponseSerializer,
 )
+from marketplace.models import Marketplace, MarketplaceTempate
 from marketplace.serializers import MarketplaceCreateSerializer
 from marketplace.services.marketplace_base import MarketplaceService, MarketplaceTemplateService
 
@@ -23,11 +32,13 @@ from marketplace.services.marketplace_base import MarketplaceService, Marketplac
 class MarketplaceView(APIView):
     @extend_schema(
         operation_id="v1_marketplaces_list",
-        parameters=[PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER],
+        parameters=[PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER, CURSOR_PARAMETER],
         responses={
             200: MarketplaceListResponseSerializer,
         },
     )
+    @conditional_get(lambda request: MarketplaceService().list_queryset())
+    @cached_response("marketplaces", (Marketplace,))
     def get(self, request: Request, *args, **kwargs):
         response = MarketplaceService().list(request)
         return Response(response, status=response.get("code"), headers=HEAD_DATA)
@@ -53,7 +64,13 @@ class MarketplaceView(APIView):
 class MarketplaceTemplateView(APIView):
     @extend_schema(
         operation_id="v1_marketplace_templates_list",
-        parameters=[MARKETPLACE_ID_PARAMETER, PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER],
+        parameters=[
+            MARKETPLACE_ID_PARAMETER,
+            PAGE_NUMBER_PARAMETER,
+            PAGE_SIZE_PARAMETER,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
+        ],
         responses={
             200: MarketplaceTemplateListResponseSerializer,
             400: ErrorResponseSerializer,
@@ -61,6 +78,11 @@ class MarketplaceTemplateView(APIView):
             412: ErrorResponseSerializer,
         },
     )
+    @conditional_get(
+        lambda request: MarketplaceTemplateService(request).list_queryset(),
+        MarketplaceTemplateService.version_fields,
+    )
+    @cached_response("marketplace_templates", (Marketplace, MarketplaceTempate))
     def get(self, request: Request, *args, **kwargs):
         response = MarketplaceTemplateService(request).list(request)
         return Response(response, status=response.get("code"), headers=HEAD_DATA)
@@ -88,13 +110,25 @@ class MarketplaceTemplateView(APIView):
 class MarketplaceTemplateDetailView(APIView):
     @extend_schema(
         operation_id="v1_marketplace_templates_retrieve",
-        parameters=[MARKETPLACE_ID_PARAMETER, MARKETPLACE_TEMPLATE_ID_PARAMETER],
+        parameters=[
+            MARKETPLACE_ID_PARAMETER,
+            MARKETPLACE_TEMPLATE_ID_PARAMETER,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
+        ],
         responses={
             200: MarketplaceTemplateListResponseSerializer,
             404: ErrorResponseSerializer,
             412: ErrorResponseSerializer,
         },
     )
+    @conditional_get(
+        lambda request, marketplace_template_id: MarketplaceTemplateService(request).detail_queryset(
+            marketplace_template_id
+        ),
+        MarketplaceTemplateService.version_fields,
+    )
+    @cached_response("marketplace_templates", (Marketplace, MarketplaceTempate))
     def get(self, request: Request, *args, **kwargs):
         marketplace_template_id = kwargs.get("marketplace_template_id")
         response = MarketplaceTemplateService(request).get(marketplace_template_id)
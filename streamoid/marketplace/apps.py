@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class MarketplaceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "marketplace"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from core.response_cache import ResponseCache
+        from core.validator_cache import invalidate_template_validators
+        from marketplace.models import Marketplace, MarketplaceTempate
+
+        ResponseCache.watch(Marketplace, MarketplaceTempate)
+        post_save.connect(invalidate_template_validators, sender=MarketplaceTempate)
+        post_delete.connect(invalidate_template_validators, sender=MarketplaceTempate)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='marketplace',
+            index=models.Index(fields=['created_at', 'id'], name='marketplace_created_334220_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+from core.template_schema import TemplateSchemaError, normalize_template
+
+
+def backfill_schema(apps, schema_editor):
+    MarketplaceTempate = apps.get_model('marketplace', 'MarketplaceTempate')
+    templates = MarketplaceTempate.objects.only('id', 'template')
+    for marketplace_template in templates.iterator(chunk_size=500):
+        try:
+            marketplace_template.schema = normalize_template(marketplace_template.template)
+        except TemplateSchemaError:
+            continue
+        marketplace_template.save(update_fields=['schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_marketplace_cursor_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marketplacetempate',
+            name='schema',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill_schema, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from core.template_schema import TEMPLATE_SCHEMA_VERSION, TemplateSchemaError, normalize_template
+
+
+def refresh_schema(apps, schema_editor):
+    # Schema version 2 orders `$field` references by dependency and adds string references.
+    MarketplaceTempate = apps.get_model('marketplace', 'MarketplaceTempate')
+    templates = MarketplaceTempate.objects.only('id', 'template', 'schema')
+    for marketplace_template in templates.iterator(chunk_size=500):
+        if (marketplace_template.schema or {}).get('version') == TEMPLATE_SCHEMA_VERSION:
+            continue
+        try:
+            marketplace_template.schema = normalize_template(marketplace_template.template)
+        except TemplateSchemaError:
+            marketplace_template.schema = {}
+        marketplace_template.save(update_fields=['schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0003_marketplacetempate_schema'),
+    ]
+
+    operations = [
+        migrations.RunPython(refresh_schema, migrations.RunPython.noop),
+    ]
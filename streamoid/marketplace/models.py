@@ -2,12 +2,17 @@ from django.db import models
 
 from core.constants import MAX_NAME_LENGTH
 from core.models import BaseModel
+from core.template_schema import TemplateSchemaError, normalize_template
 
 
 class Marketplace(BaseModel):
     name = models.CharField(max_length=MAX_NAME_LENGTH, db_index=True)
     # Future relevant fields related to marketplace
 
+    class Meta:
+        # Backs cursor pagination.
+        indexes = [models.Index(fields=["created_at", "id"])]
+
     def __str__(self):
         return f"<Marketplace: {self.id} | Name: {self.name}"
 
@@ -15,6 +20,20 @@ class Marketplace(BaseModel):
 class MarketplaceTempate(BaseModel):
     marketplace = models.ForeignKey(Marketplace, on_delete=models.CASCADE)
     template = models.JSONField(default=dict)
+    # Canonical form of `template` (see `core.template_schema`), kept in sync on save.
+    schema = models.JSONField(default=dict, editable=False)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "template" in update_fields:
+            try:
+                self.schema = normalize_template(self.template)
+            except TemplateSchemaError:
+                # Validators fail to build for such templates; readers re-normalize and report it.
+                self.schema = {}
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "schema"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"<MarketplaceTempate: {self.id} | Marketplace: {self.marketplace_id}"
@@ -4,6 +4,7 @@ from rest_framework import serializers
 
 from core.custom_validation import CustomValidatior
 from core.serializers import CreateBaseSerializer, DetailsBaseSerializer
+from core.template_schema import TemplateReferenceError, TemplateSchemaError, normalize_template
 from marketplace.models import Marketplace, MarketplaceTempate
 
 
@@ -36,8 +37,13 @@ class MarketplaceTemplateSerializer(serializers.ModelSerializer):
         fields = ("marketplace_id", "template")
 
     def validate_template(self, template):
-        validator = CustomValidatior(template=SimpleNamespace(template=template))
-        serializer_class = validator.build()
+        try:
+            normalize_template(template)
+        except TemplateReferenceError as e:
+            raise serializers.ValidationError(str(e))
+        except TemplateSchemaError:
+            raise serializers.ValidationError("Invalid template schema")
+        serializer_class = CustomValidatior.cached(SimpleNamespace(template=template))
         if serializer_class is None:
             raise serializers.ValidationError("Invalid template schema")
         return template
@@ -2,6 +2,7 @@ from loguru import logger
 from rest_framework.request import Request
 
 from core.base_service import BaseService, PaginationService
+from core.fieldsets import SparseFieldset
 from marketplace.decorators.validation import validate_marketplace
 from marketplace.models import Marketplace, MarketplaceTempate
 from marketplace.serializers import (
@@ -24,42 +25,56 @@ class MarketplaceService(BaseService):
             logger.error(f"Failed to create marketplace | Error: {e}")
             return self.get_500_response(errors="Failed to create marketplace. Please try again later")
 
+    def list_queryset(self):
+        return Marketplace.objects.all()
+
     def list(self, request: Request):
         query_params = request.query_params.dict()
         page_number, page_size = query_params.get("page_number"), query_params.get("page_size")
-        marketplaces = Marketplace.objects.all().order_by("-created_at")
-        return PaginationService(page_number, page_size).paginated_response(marketplaces, MarketplaceSerializer)
+        marketplaces = self.list_queryset().order_by("-created_at")
+        return PaginationService(page_number, page_size, cursor=query_params.get("cursor")).paginated_response(
+            marketplaces, MarketplaceSerializer
+        )
 
 
 class MarketplaceTemplateService(BaseService):
+    version_fields = ("updated_at", "marketplace__updated_at")
+
     def __init__(self, request: Request):
         # Validate the marketplace
         self.marketplace_id = request.query_params.get("marketplace_id")
+        self.fieldset = SparseFieldset.from_query_params(request.query_params)
         self.marketplace = None
         if self.marketplace_id:
             self.marketplace = Marketplace.objects.filter(id=self.marketplace_id).last()
 
+    def list_queryset(self):
+        if not self.marketplace:
+            return None
+        return MarketplaceTempate.objects.filter(marketplace=self.marketplace)
+
+    def detail_queryset(self, marketplace_template_id):
+        if not self.marketplace:
+            return None
+        return MarketplaceTempate.objects.filter(marketplace=self.marketplace, id=marketplace_template_id)
+
     @validate_marketplace
     def list(self, request: Request):
         query_params = request.query_params.dict()
         page_number, page_size = query_params.get("page_number"), query_params.get("page_size")
-        templates = (
-            MarketplaceTempate.objects.filter(marketplace=self.marketplace)
-            .select_related("marketplace")
-            .order_by("-created_at")
-        )
-        return PaginationService(page_number, page_size).paginated_response(
+        templates = self.list_queryset().select_related("marketplace").order_by("-created_at")
+        return PaginationService(page_number, page_size, fieldset=self.fieldset).paginated_response(
             templates, MarketplaceTemplateListSerializer
         )
 
     @validate_marketplace
     def get(self, marketplace_template_id):
-        template = MarketplaceTempate.objects.filter(
-            marketplace=self.marketplace, id=marketplace_template_id
-        ).select_related("marketplace")
+        template = self.detail_queryset(marketplace_template_id).select_related("marketplace")
         if not template.exists():
             return self.get_404_response("File Not Found")
-        return PaginationService().paginated_response(template, MarketplaceTemplateListSerializer)
+        return PaginationService(fieldset=self.fieldset).paginated_response(
+            template, MarketplaceTemplateListSerializer
+        )
 
     @validate_marketplace
     def create(self, request: Request):
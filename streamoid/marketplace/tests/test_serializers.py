@@ -8,3 +8,15 @@ def test_template_serializer_rejects_invalid_schema():
 
     assert not serializer.is_valid()
     assert serializer.errors["template"] == ["Invalid template schema"]
+
+
+def test_template_serializer_rejects_circular_references():
+    serializer = MarketplaceTemplateSerializer(
+        data={
+            "marketplace_id": 1,
+            "template": {"mrp": {"type": "number", "min": "$price"}, "price": {"type": "number", "max": "$mrp"}},
+        },
+    )
+
+    assert not serializer.is_valid()
+    assert serializer.errors["template"] == ["Circular field reference: mrp -> price -> mrp."]
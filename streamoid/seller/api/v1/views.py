@@ -7,8 +7,16 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.conditional import conditional_get
 from core.constants import HEAD_DATA
-from core.schema import PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER
+from core.response_cache import cached_response
+from core.schema import (
+    CURSOR_PARAMETER,
+    EXPAND_PARAMETER,
+    FIELDS_PARAMETER,
+    PAGE_NUMBER_PARAMETER,
+    PAGE_SIZE_PARAMETER,
+)
 from core.serializers import ErrorResponseSerializer
 from seller.api.v1.paramters import FILE_ID_PARAMETER, SELLER_ID_PARAMETER
 from seller.api.v1.schema_serializers import (
@@ -18,6 +26,7 @@ from seller.api.v1.schema_serializers import (
     SellerListResponseSerializer,
     SellerResponseSerializer,
 )
+from seller.models import Seller, SellerFiles
 from seller.serializers import (
     SellerCreateSerializer,
 )
@@ -32,6 +41,8 @@ class SellerView(APIView):
             200: SellerListResponseSerializer,
         },
     )
+    @conditional_get(lambda request: SellerService().list_queryset())
+    @cached_response("sellers", (Seller,))
     def get(self, request: Request, *args, **kwargs):
         response = SellerService().list(request)
         return Response(response, status=response.get("code"), headers=HEAD_DATA)
@@ -60,7 +71,14 @@ class SellerFilesView(APIView):
 
     @extend_schema(
         operation_id="v1_seller_files_list",
-        parameters=[SELLER_ID_PARAMETER, PAGE_NUMBER_PARAMETER, PAGE_SIZE_PARAMETER],
+        parameters=[
+            SELLER_ID_PARAMETER,
+            PAGE_NUMBER_PARAMETER,
+            PAGE_SIZE_PARAMETER,
+            CURSOR_PARAMETER,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
+        ],
         responses={
             200: SellerFilesListResponseSerializer,
             400: ErrorResponseSerializer,
@@ -68,6 +86,10 @@ class SellerFilesView(APIView):
             412: ErrorResponseSerializer,
         },
     )
+    @conditional_get(
+        lambda request: SellerFilesService(request).list_queryset(), SellerFilesService.version_fields
+    )
+    @cached_response("seller_files", (Seller, SellerFiles))
     def get(self, request: Request, *args, **kwargs):
         response = SellerFilesService(request).list(request)
         return Response(response, status=response.get("code"), headers=HEAD_DATA)
@@ -95,13 +117,18 @@ class SellerFilesView(APIView):
 class SellerFilesDetailView(APIView):
     @extend_schema(
         operation_id="v1_seller_files_retrieve",
-        parameters=[SELLER_ID_PARAMETER, FILE_ID_PARAMETER],
+        parameters=[SELLER_ID_PARAMETER, FILE_ID_PARAMETER, FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={
             200: SellerFilesListResponseSerializer,
             404: ErrorResponseSerializer,
             412: ErrorResponseSerializer,
         },
     )
+    @conditional_get(
+        lambda request, file_id: SellerFilesService(request).detail_queryset(file_id),
+        SellerFilesService.version_fields,
+    )
+    @cached_response("seller_files", (Seller, SellerFiles))
     def get(self, request: Request, *args, **kwargs):
         file_id = kwargs.get("file_id")
         response = SellerFilesService(request).get(file_id)
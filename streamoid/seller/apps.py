@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class SellerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "seller"
+
+    def ready(self):
+        from core.response_cache import ResponseCache
+        from seller.models import Seller, SellerFiles
+
+        ResponseCache.watch(Seller, SellerFiles)
@@ -4,3 +4,21 @@ XLSX = ".xlsx"
 ALLOWED_EXTENSIONS = {CSV, XLSX}
 MAX_FILE_PATH_LENGTH = 512
 SAMPLE_ROWS_COUNT = 10
+STREAM_CHUNK_SIZE = 64 * 1024  # 64KB
+# Leading bytes of a CSV upload used to sniff its dialect.
+CSV_SNIFF_BYTES = 8192
+SHA256_HEX_LENGTH = 64
+
+# Lifecycle of a seller file's headers/sample/row-count profile.
+INGESTION_STATUS_INGESTING = "ingesting"
+INGESTION_STATUS_READY = "ready"
+INGESTION_STATUS_FAILED = "failed"
+
+# Async uploads are stored under `staging/<upload id>/<name>` until profiling publishes them under their name.
+INGESTION_STAGING_FOLDER = "staging"
+
+INGESTION_STATUS_CHOICES = (
+    (INGESTION_STATUS_INGESTING, "Ingesting"),
+    (INGESTION_STATUS_READY, "Ready"),
+    (INGESTION_STATUS_FAILED, "Failed"),
+)
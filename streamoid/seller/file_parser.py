@@ -1,7 +1,10 @@
 import csv
-from io import BytesIO, TextIOWrapper
+from io import SEEK_END, BufferedReader, TextIOWrapper
 
 from openpyxl import load_workbook
+from rest_framework.serializers import ValidationError
+
+from seller.constants import CSV_SNIFF_BYTES, STREAM_CHUNK_SIZE
 
 
 class FileParser:
@@ -18,45 +21,83 @@ class FileParser:
         return None
 
     @classmethod
-    def parse_csv(cls, payload_file, sample_limit):
-        payload_file.seek(0)
-        text_stream = TextIOWrapper(payload_file, encoding="utf-8-sig", newline="")
+    def summarize_rows(cls, rows, sample_limit):
+        """Consume the data rows after the header, returning `(sample_rows, row_count)`."""
+        sample_rows = []
+        row_count = 0
+        for row in rows:
+            row_values = cls.normalize_row(row)
+            if not any(row_values):
+                continue
+            row_count += 1
+            if len(sample_rows) < sample_limit:
+                sample_rows.append(row_values)
+        return sample_rows, row_count
+
+    @staticmethod
+    def validate_header_row(cells, file_type):
+        if not cells or any(cell == "" for cell in cells):
+            raise ValidationError(f"{file_type} header row must not contain empty columns.")
+
+    @classmethod
+    def inspect_csv(cls, stream, sample_limit):
+        """
+        Validate and summarize a CSV from a forward-only byte stream in one pass.
+        Raises `ValidationError` for content problems; returns `(columns, sample_rows, row_count)`.
+        """
+        buffered = BufferedReader(stream, buffer_size=STREAM_CHUNK_SIZE)
+        # Peek so the sniffed bytes are parsed again from the buffer rather than re-read.
+        sample_bytes = buffered.peek(CSV_SNIFF_BYTES)[:CSV_SNIFF_BYTES]
+        if not sample_bytes:
+            raise ValidationError("CSV file is empty.")
+        try:
+            sample_text = sample_bytes.decode("utf-8-sig")
+        except UnicodeDecodeError as exc:
+            raise ValidationError("CSV file must be UTF-8 encoded.") from exc
+        try:
+            csv.Sniffer().sniff(sample_text)
+        except csv.Error as exc:
+            raise ValidationError("CSV file does not appear to be valid CSV.") from exc
+
+        text_stream = TextIOWrapper(buffered, encoding="utf-8-sig", newline="")
         try:
             reader = csv.reader(text_stream)
-            columns = cls.find_first_non_empty_row(reader) or []
-            sample_rows = []
-            row_count = 0
-            for row in reader:
-                row_values = cls.normalize_row(row)
-                if not any(row_values):
-                    continue
-                row_count += 1
-                if len(sample_rows) < sample_limit:
-                    sample_rows.append(row_values)
+            columns = cls.find_first_non_empty_row(reader)
+            if not columns:
+                raise ValidationError("File does not contain any data rows.")
+            cls.validate_header_row(columns, "CSV")
+            sample_rows, row_count = cls.summarize_rows(reader, sample_limit)
             return columns, sample_rows, row_count
+        except UnicodeDecodeError as exc:
+            raise ValidationError("CSV file must be UTF-8 encoded.") from exc
+        except csv.Error as exc:
+            raise ValidationError("CSV file does not appear to be valid CSV.") from exc
         finally:
-            text_stream.detach()
-            payload_file.seek(0)
+            # Leave the caller's stream open.
+            text_stream.detach().detach()
 
     @classmethod
-    def parse_excel(cls, payload_file, sample_limit):
+    def inspect_excel(cls, payload_file, sample_limit):
+        """
+        Validate and summarize a workbook straight from a seekable file (no in-memory copy).
+        Raises `ValidationError` for content problems; returns `(columns, sample_rows, row_count)`.
+        """
+        if not payload_file.seek(0, SEEK_END):
+            raise ValidationError("Excel file is empty.")
         payload_file.seek(0)
-        file_bytes = payload_file.read()
-        payload_file.seek(0)
-        workbook = load_workbook(filename=BytesIO(file_bytes), read_only=True, data_only=True)
         try:
-            sheet = workbook.active
-            rows = sheet.iter_rows(values_only=True)
-            columns = cls.find_first_non_empty_row(rows) or []
-            sample_rows = []
-            row_count = 0
-            for row in rows:
-                row_values = cls.normalize_row(row)
-                if not any(row_values):
-                    continue
-                row_count += 1
-                if len(sample_rows) < sample_limit:
-                    sample_rows.append(row_values)
-            return columns, sample_rows, row_count
+            workbook = load_workbook(filename=payload_file, read_only=True, data_only=True)
+            try:
+                rows = workbook.active.iter_rows(values_only=True)
+                columns = cls.find_first_non_empty_row(rows)
+                if not columns:
+                    raise ValidationError("File does not contain any data rows.")
+                cls.validate_header_row(columns, "Excel")
+                sample_rows, row_count = cls.summarize_rows(rows, sample_limit)
+                return columns, sample_rows, row_count
+            finally:
+                workbook.close()
+        except Exception as exc:
+            raise ValidationError("Excel file could not be read.") from exc
         finally:
-            workbook.close()
+            payload_file.seek(0)
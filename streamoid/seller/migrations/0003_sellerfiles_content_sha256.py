@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0002_rename_bucket_name_seller_seller_uuid_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='content_sha256',
+            field=models.CharField(blank=True, default=None, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0003_sellerfiles_content_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='ingestion_errors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='ingestion_status',
+            field=models.CharField(choices=[('ingesting', 'Ingesting'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='lease_owner',
+            field=models.CharField(blank=True, default=None, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sellerfiles',
+            index=models.Index(fields=['ingestion_status', 'lease_expires_at'], name='seller_sell_ingesti_b697ae_idx'),
+        ),
+    ]
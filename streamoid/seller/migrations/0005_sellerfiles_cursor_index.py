@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0004_sellerfiles_ingestion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sellerfiles',
+            index=models.Index(fields=['seller', 'created_at', 'id'], name='seller_sell_seller__b0b60c_idx'),
+        ),
+    ]
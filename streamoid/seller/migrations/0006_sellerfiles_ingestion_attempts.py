@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0005_sellerfiles_cursor_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='ingestion_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0006_sellerfiles_ingestion_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellerfiles',
+            name='staged_object_name',
+            field=models.CharField(blank=True, default=None, max_length=512, null=True),
+        ),
+    ]
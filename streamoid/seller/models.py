@@ -1,11 +1,18 @@
 import uuid
+from pathlib import Path
 
 from django.db import models
 
 from core.constants import MAX_NAME_LENGTH
 from core.minio import MinioHandler
 from core.models import BaseModel
-from seller.constants import MAX_FILE_PATH_LENGTH
+from seller.constants import (
+    INGESTION_STAGING_FOLDER,
+    INGESTION_STATUS_CHOICES,
+    INGESTION_STATUS_READY,
+    MAX_FILE_PATH_LENGTH,
+    SHA256_HEX_LENGTH,
+)
 
 
 class ContentType(models.TextChoices):
@@ -36,6 +43,32 @@ class SellerFiles(BaseModel):
     rows_count = models.IntegerField(default=0)
     headers = models.JSONField(default=list, blank=True)
     sample_rows = models.JSONField(default=list, blank=True)
+    # SHA-256 of the uploaded bytes, computed while the file is streamed to MinIO.
+    content_sha256 = models.CharField(max_length=SHA256_HEX_LENGTH, null=True, blank=True, default=None)
+    # Async uploads are stored first and profiled by the background worker.
+    ingestion_status = models.CharField(
+        max_length=MAX_NAME_LENGTH,
+        choices=INGESTION_STATUS_CHOICES,
+        default=INGESTION_STATUS_READY,
+    )
+    ingestion_errors = models.JSONField(default=list, blank=True)
+    lease_owner = models.CharField(max_length=MAX_NAME_LENGTH, null=True, blank=True, default=None)
+    lease_expires_at = models.DateTimeField(null=True, blank=True, default=None)
+    # Profiling claims so far; the file is marked failed once it keeps crashing.
+    ingestion_attempts = models.PositiveIntegerField(default=0)
+    # Object holding an async upload until profiling succeeds and copies it to `name`.
+    staged_object_name = models.CharField(max_length=MAX_FILE_PATH_LENGTH, null=True, blank=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ingestion_status", "lease_expires_at"]),
+            # Backs cursor pagination of a seller's files.
+            models.Index(fields=["seller", "created_at", "id"]),
+        ]
+
+    @staticmethod
+    def staging_object_name(file_name) -> str:
+        return str(Path(INGESTION_STAGING_FOLDER).joinpath(uuid.uuid4().hex, file_name))
 
     def __str__(self):
         return f"<SellerFiles: {self.id} | Rows Count: {self.rows_count} | Path: {self.path} "
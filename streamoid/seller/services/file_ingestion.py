@@ -0,0 +1,218 @@
+import hashlib
+import shutil
+from datetime import timedelta
+from io import RawIOBase
+from tempfile import NamedTemporaryFile
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from loguru import logger
+from rest_framework.serializers import ValidationError
+
+from core.helpers import generate_lease_owner
+from core.minio import MinioHandler
+from core.response_cache import ResponseCache
+from seller.constants import (
+    CSV,
+    INGESTION_STATUS_FAILED,
+    INGESTION_STATUS_INGESTING,
+    INGESTION_STATUS_READY,
+    SAMPLE_ROWS_COUNT,
+    STREAM_CHUNK_SIZE,
+    XLSX,
+)
+from seller.file_parser import FileParser
+from seller.models import SellerFiles
+
+log = logger.bind(component="file_ingestion")
+
+
+class _TeeReader(RawIOBase):
+    """Forward-only view of an upload that copies every chunk it reads to a digest and a sink."""
+
+    def __init__(self, source, sink, digest):
+        super().__init__()
+        self._source = source
+        self._sink = sink
+        self._digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._source.read(len(buffer))
+        size = len(data)
+        if size:
+            buffer[:size] = data
+            self._digest.update(data)
+            self._sink.write(data)
+        return size
+
+    def drain(self):
+        while self.read(STREAM_CHUNK_SIZE):
+            pass
+
+
+class FileIngestion:
+    """
+    Store an uploaded seller file in MinIO in a single pass.
+    The same read feeds the multipart upload, a SHA-256 digest and the
+    header/sample/row-count extractor. Content errors raise `ValidationError`
+    and abort the upload, so invalid files are never stored.
+    """
+
+    def __init__(self, minio_handler: MinioHandler | None = None):
+        self.minio = minio_handler or MinioHandler()
+
+    def ingest(
+        self, bucket_name, file, file_type, sample_limit=SAMPLE_ROWS_COUNT, profile=True, object_name=None
+    ) -> dict:
+        """
+        Return the `SellerFiles` fields gathered while storing the file as
+        `object_name` (its name by default). With `profile=False` only the raw
+        bytes and digest are stored and the file is left `ingesting` for
+        `SellerFileProfilingService`.
+        """
+        object_name = object_name or file.name
+        digest = hashlib.sha256()
+        file.seek(0)
+        with self.minio.open_upload_stream(bucket_name, object_name) as upload:
+            tee = _TeeReader(file, upload, digest)
+            if not profile:
+                tee.drain()
+                log.info(
+                    "Stored seller file for background profiling: bucket={}, object={}", bucket_name, object_name
+                )
+                return {"content_sha256": digest.hexdigest(), "ingestion_status": INGESTION_STATUS_INGESTING}
+            if file_type == CSV:
+                headers, sample_rows, rows_count = FileParser.inspect_csv(tee, sample_limit)
+                tee.drain()
+            else:
+                # Workbooks need random access: stream the bytes out, then read the zip from the local upload.
+                tee.drain()
+                headers, sample_rows, rows_count = FileParser.inspect_excel(file, sample_limit)
+        log.info("Ingested seller file: bucket={}, object={}, rows={}", bucket_name, object_name, rows_count)
+        return {
+            "headers": headers,
+            "sample_rows": sample_rows,
+            "rows_count": rows_count,
+            "content_sha256": digest.hexdigest(),
+        }
+
+
+class SellerFileProfilingService:
+    """
+    Fill `headers`, `sample_rows` and `rows_count` for files uploaded in async mode.
+    Files are claimed with a lease so concurrent workers never profile the same
+    file twice; a lease left behind by a crashed worker simply expires and the
+    file is claimed again, until it has been claimed
+    `SELLER_FILE_INGESTION_MAX_ATTEMPTS` times. The staged upload is copied to
+    the file's name only once it profiles cleanly, and removed otherwise.
+    """
+
+    def __init__(self, owner: str | None = None, lease_seconds: int | None = None):
+        self.owner = owner or generate_lease_owner()
+        self.lease_seconds = lease_seconds or settings.SELLER_FILE_INGESTION_LEASE_SECONDS
+        self.minio = MinioHandler()
+
+    @classmethod
+    def run(cls) -> int:
+        return cls().process_pending()
+
+    def claim(self, batch_size: int) -> list[SellerFiles]:
+        now = timezone.now()
+        claimable = Q(ingestion_status=INGESTION_STATUS_INGESTING) & (
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+        )
+        candidate_ids = list(
+            SellerFiles.objects.filter(claimable).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        claimed_ids = []
+        for seller_file_id in candidate_ids:
+            # Compare-and-set per row: only one worker's update matches while the file is claimable.
+            claimed = SellerFiles.objects.filter(claimable, id=seller_file_id).update(
+                lease_owner=self.owner,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                ingestion_attempts=F("ingestion_attempts") + 1,
+                updated_at=now,
+            )
+            if claimed:
+                claimed_ids.append(seller_file_id)
+        return list(SellerFiles.objects.filter(id__in=claimed_ids).select_related("seller").order_by("id"))
+
+    def process_pending(self, should_stop=lambda: False) -> int:
+        processed = 0
+        while not should_stop():
+            seller_files = self.claim(settings.SELLER_FILE_INGESTION_BATCH_SIZE)
+            if not seller_files:
+                break
+            for seller_file in seller_files:
+                self.process(seller_file)
+                processed += 1
+        return processed
+
+    def process(self, seller_file: SellerFiles) -> None:
+        log_context = log.bind(seller_file_id=seller_file.id)
+        bucket_name = seller_file.seller.bucket_name
+        try:
+            headers, sample_rows, rows_count = self._profile(bucket_name, seller_file)
+            if seller_file.staged_object_name:
+                # Published under its name only now, replacing any earlier upload's object.
+                self.minio.copy_file(bucket_name, seller_file.staged_object_name, seller_file.name)
+        except ValidationError as exc:
+            log_context.warning("Seller file failed ingestion: {}", exc.detail)
+            self._fail(bucket_name, seller_file, [str(error) for error in exc.detail])
+            return
+        except Exception as exc:
+            if seller_file.ingestion_attempts >= settings.SELLER_FILE_INGESTION_MAX_ATTEMPTS:
+                log_context.exception(
+                    "Seller file profiling failed after {} attempts: {}", seller_file.ingestion_attempts, exc
+                )
+                self._fail(bucket_name, seller_file, ["Failed to read the file. Please upload it again."])
+                return
+            # Storage hiccups are retried once the lease expires.
+            log_context.exception("Seller file profiling crashed: {}", exc)
+            return
+        finished = self._finish(
+            seller_file,
+            ingestion_status=INGESTION_STATUS_READY,
+            ingestion_errors=[],
+            headers=headers,
+            sample_rows=sample_rows,
+            rows_count=rows_count,
+            staged_object_name=None,
+        )
+        if finished:
+            self._remove_staged(bucket_name, seller_file)
+        log_context.info("Seller file ingested: rows={}", rows_count)
+
+    def _fail(self, bucket_name, seller_file: SellerFiles, errors: list[str]) -> None:
+        # The published object under the file name is left alone: earlier uploads may still point at it.
+        if self._finish(
+            seller_file, ingestion_status=INGESTION_STATUS_FAILED, ingestion_errors=errors, staged_object_name=None
+        ):
+            self._remove_staged(bucket_name, seller_file)
+
+    def _remove_staged(self, bucket_name, seller_file: SellerFiles) -> None:
+        if seller_file.staged_object_name:
+            self.minio.remove_file(bucket_name, seller_file.staged_object_name)
+
+    def _profile(self, bucket_name, seller_file):
+        object_name = seller_file.staged_object_name or seller_file.name
+        with self.minio.open_file_stream(bucket_name, object_name) as file_stream:
+            if seller_file.file_type == CSV:
+                return FileParser.inspect_csv(file_stream, SAMPLE_ROWS_COUNT)
+            # Workbooks need random access, so spool the object to disk.
+            with NamedTemporaryFile(suffix=XLSX) as spool_file:
+                shutil.copyfileobj(file_stream, spool_file, STREAM_CHUNK_SIZE)
+                return FileParser.inspect_excel(spool_file, SAMPLE_ROWS_COUNT)
+
+    def _finish(self, seller_file: SellerFiles, **fields) -> bool:
+        # Guarded by the lease so a worker whose lease was taken over cannot overwrite the result.
+        finished = SellerFiles.objects.filter(id=seller_file.id, lease_owner=self.owner).update(
+            lease_owner=None, lease_expires_at=None, updated_at=timezone.now(), **fields
+        )
+        # Bulk updates skip `post_save`; clients poll the file until it leaves `ingesting`.
+        ResponseCache.invalidate(SellerFiles)
+        return bool(finished)
@@ -1,13 +1,14 @@
 from pathlib import Path
 
+from django.conf import settings
 from loguru import logger
 from rest_framework.request import Request
+from rest_framework.serializers import ValidationError
 
 from core.base_service import BaseService, PaginationService
+from core.fieldsets import SparseFieldset
 from core.minio import MinioHandler
-from seller.constants import CSV, SAMPLE_ROWS_COUNT
 from seller.decorators.validation import validate_seller
-from seller.file_parser import FileParser
 from seller.models import Seller, SellerFiles
 from seller.serializers import (
     FileUploadSerialzier,
@@ -15,6 +16,7 @@ from seller.serializers import (
     SellerFilesSerializer,
     SellerSerializer,
 )
+from seller.services.file_ingestion import FileIngestion
 
 log = logger.bind(component="seller_base")
 
@@ -24,10 +26,20 @@ class SellerHelperService:
         self.seller = seller
         self.minio = MinioHandler()
 
-    def store_file(self, bucket_name, file, file_type):
+    def store_file(self, bucket_name, file, file_type, profile=True):
+        """Stream the file to MinIO and record it; content problems raise `ValidationError`."""
         file_name = file.name
-        is_stored = self.minio.store_file(bucket_name, file_name, file)
-        if not is_stored:
+        # Unprofiled uploads are staged under a unique key: an invalid re-upload must not replace the
+        # object that earlier files with the same name (and their mappings) still read.
+        object_name = file_name if profile else SellerFiles.staging_object_name(file_name)
+        try:
+            summary = FileIngestion(self.minio).ingest(
+                bucket_name, file, file_type, profile=profile, object_name=object_name
+            )
+        except ValidationError:
+            raise
+        except Exception as e:
+            log.exception(f"Failed to store file in MinIO | Error: {e}")
             return None
         try:
             path = Path(bucket_name).joinpath(file_name)
@@ -36,15 +48,17 @@ class SellerHelperService:
                 name=file.name,
                 file_type=file_type,
                 path=str(path),
+                staged_object_name=None if profile else object_name,
+                **summary,
             )
             return seller_file
         except Exception as e:
             logger.error(f"Failed to store data in db | Error {str(e)}")
-            if not self.minio.remove_file(bucket_name, file_name):
+            if not self.minio.remove_file(bucket_name, object_name):
                 logger.warning(
                     "Failed to cleanup MinIO file | bucket=%s object=%s",
                     bucket_name,
-                    file_name,
+                    object_name,
                 )
             return None
 
@@ -61,34 +75,52 @@ class SellerService(BaseService):
             return self.get_500_response(errors="Failed to create seller. Please try again later")
         return self.get_201_response(data=SellerSerializer(seller).data)
 
+    def list_queryset(self):
+        return Seller.objects.all()
+
     def list(self, request: Request):
         query_params = request.query_params.dict()
         page_number, page_size = query_params.get("page_number"), query_params.get("page_size")
-        sellers = Seller.objects.all().order_by("-created_at")
+        sellers = self.list_queryset().order_by("-created_at")
         return PaginationService(page_number, page_size).paginated_response(sellers, SellerSerializer)
 
 
 class SellerFilesService(BaseService):
+    version_fields = ("updated_at", "seller__updated_at")
+
     def __init__(self, request: Request, *args, **kwargs):
         # Validate the seller
         self.seller_id = request.query_params.get("seller_id")
+        self.fieldset = SparseFieldset.from_query_params(request.query_params)
         self.seller = None
         if self.seller_id:
             self.seller = Seller.objects.filter(id=self.seller_id).last()
 
+    def list_queryset(self):
+        if not self.seller:
+            return None
+        return SellerFiles.objects.filter(seller=self.seller)
+
+    def detail_queryset(self, file_id):
+        if not self.seller:
+            return None
+        return SellerFiles.objects.filter(seller=self.seller, id=file_id)
+
     @validate_seller
     def list(self, request: Request):
         query_params = request.query_params.dict()
         page_number, page_size = query_params.get("page_number"), query_params.get("page_size")
-        files = SellerFiles.objects.filter(seller=self.seller).select_related("seller").order_by("-created_at")
-        return PaginationService(page_number, page_size).paginated_response(files, SellerFilesSerializer)
+        files = self.list_queryset().select_related("seller").order_by("-created_at")
+        return PaginationService(
+            page_number, page_size, cursor=query_params.get("cursor"), fieldset=self.fieldset
+        ).paginated_response(files, SellerFilesSerializer)
 
     @validate_seller
     def get(self, file_id):
-        file = SellerFiles.objects.filter(seller=self.seller, id=file_id).select_related("seller")
+        file = self.detail_queryset(file_id).select_related("seller")
         if not file.exists():
             return self.get_404_response("File Not Found")
-        return PaginationService().paginated_response(file, SellerFilesSerializer)
+        return PaginationService(fieldset=self.fieldset).paginated_response(file, SellerFilesSerializer)
 
     @validate_seller
     def upload(self, request: Request):
@@ -99,21 +131,18 @@ class SellerFilesService(BaseService):
             return self.get_412_response(errors=serializer.errors)
         file_type = serializer._file_type
 
-        # Save the file in minio
-        seller_file = SellerHelperService(self.seller).store_file(self.seller.bucket_name, payload_file, file_type)
+        # Save the file in minio, validating and parsing it in the same pass unless that is deferred
+        profile = not settings.SELLER_FILE_ASYNC_INGESTION
+        try:
+            seller_file = SellerHelperService(self.seller).store_file(
+                self.seller.bucket_name, payload_file, file_type, profile=profile
+            )
+        except ValidationError as exc:
+            return self.get_412_response(errors={"payload_file": exc.detail})
         if not seller_file:
             return self.get_500_response(errors="Failed to store file. Please try again later")
 
-        #  Parse the data
-        headers, sample_rows, row_count = None, None, None
-        if file_type == CSV:
-            headers, sample_rows, row_count = FileParser.parse_csv(payload_file, SAMPLE_ROWS_COUNT)
-        else:
-            headers, sample_rows, row_count = FileParser.parse_excel(payload_file, SAMPLE_ROWS_COUNT)
-
-        seller_file.rows_count = row_count
-        seller_file.headers = headers
-        seller_file.sample_rows = sample_rows
-        seller_file.save(update_fields=["rows_count", "headers", "sample_rows", "updated_at"])
-
+        if not profile:
+            # Clients poll the file detail until `ingestion_status` leaves `ingesting`.
+            return self.get_202_response(data=SellerFilesSerializer(seller_file).data)
         return PaginationService().paginated_response(seller_file, SellerFilesSerializer)
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+from openpyxl import Workbook
+
+from seller.constants import (
+    CSV,
+    INGESTION_STATUS_FAILED,
+    INGESTION_STATUS_INGESTING,
+    INGESTION_STATUS_READY,
+    XLSX,
+)
+from seller.models import Seller, SellerFiles
+from seller.services.file_ingestion import SellerFileProfilingService
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeResponse(BytesIO):
+    def release_conn(self):
+        pass
+
+
+class FakeMinioClient:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get_object(self, bucket_name, object_name):
+        return FakeResponse(self.objects[(bucket_name, object_name)])
+
+    def copy_object(self, bucket_name, object_name, source):
+        self.objects[(bucket_name, object_name)] = self.objects[(source.bucket_name, source.object_name)]
+
+    def remove_object(self, bucket_name, object_name):
+        self.objects.pop((bucket_name, object_name), None)
+
+
+@pytest.fixture
+def seller():
+    return Seller.objects.create(name="Demo Seller")
+
+
+@pytest.fixture
+def store(seller):
+    objects = {}
+    client = FakeMinioClient(objects)
+
+    def _store(name, content, file_type=CSV):
+        staged_object_name = SellerFiles.staging_object_name(name)
+        objects[(seller.bucket_name, staged_object_name)] = content
+        return SellerFiles.objects.create(
+            seller=seller,
+            name=name,
+            file_type=file_type,
+            path=f"{seller.bucket_name}/{name}",
+            ingestion_status=INGESTION_STATUS_INGESTING,
+            staged_object_name=staged_object_name,
+        )
+
+    with patch("core.minio.MinioHandler._get_client", return_value=client):
+        _store.objects = objects
+        yield _store
+
+
+def _xlsx_bytes(rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_profiling_fills_metadata_for_csv_and_excel(store, seller):
+    csv_content = b"sku,name\n1,Widget\n2,Gadget\n"
+    csv_file = store("items.csv", csv_content)
+    xlsx_file = store("items.xlsx", _xlsx_bytes([["sku", "name"], ["1", "Widget"]]), XLSX)
+
+    processed = SellerFileProfilingService(owner="worker-a").process_pending()
+
+    assert processed == 2
+    csv_file.refresh_from_db()
+    xlsx_file.refresh_from_db()
+    assert csv_file.ingestion_status == INGESTION_STATUS_READY
+    assert csv_file.headers == ["sku", "name"]
+    assert csv_file.sample_rows == [["1", "Widget"], ["2", "Gadget"]]
+    assert csv_file.rows_count == 2
+    assert csv_file.lease_owner is None
+    assert xlsx_file.ingestion_status == INGESTION_STATUS_READY
+    assert xlsx_file.headers == ["sku", "name"]
+    assert xlsx_file.rows_count == 1
+    # Published under the file name; the staged copies are gone.
+    assert csv_file.staged_object_name is None
+    assert store.objects[(seller.bucket_name, "items.csv")] == csv_content
+    assert sorted(name for _bucket, name in store.objects) == ["items.csv", "items.xlsx"]
+
+
+def test_profiling_marks_invalid_file_failed_and_keeps_published_object(store, seller):
+    store.objects[(seller.bucket_name, "items.csv")] = b"sku\n1\n"
+    seller_file = store("items.csv", b"sku,\n1,Widget\n")
+
+    SellerFileProfilingService(owner="worker-a").process_pending()
+
+    seller_file.refresh_from_db()
+    assert seller_file.ingestion_status == INGESTION_STATUS_FAILED
+    assert seller_file.ingestion_errors == ["CSV header row must not contain empty columns."]
+    assert seller_file.staged_object_name is None
+    # Earlier uploads with the same name still read the published object; the staged one is removed.
+    assert store.objects == {(seller.bucket_name, "items.csv"): b"sku\n1\n"}
+
+
+def test_claim_skips_files_leased_by_another_worker(store):
+    leased = store("leased.csv", b"sku\n1\n")
+    expired = store("expired.csv", b"sku\n1\n")
+    SellerFiles.objects.filter(id=leased.id).update(
+        lease_owner="worker-a", lease_expires_at=timezone.now() + timedelta(minutes=5)
+    )
+    SellerFiles.objects.filter(id=expired.id).update(
+        lease_owner="worker-a", lease_expires_at=timezone.now() - timedelta(minutes=5)
+    )
+
+    claimed = SellerFileProfilingService(owner="worker-b").claim(batch_size=10)
+
+    assert [seller_file.id for seller_file in claimed] == [expired.id]
+    assert claimed[0].lease_owner == "worker-b"
+
+
+def test_profiling_keeps_lease_when_storage_fails(store):
+    seller_file = store("items.csv", b"sku\n1\n")
+    store.objects.clear()
+
+    SellerFileProfilingService(owner="worker-a").process_pending(should_stop=iter([False, True]).__next__)
+
+    seller_file.refresh_from_db()
+    assert seller_file.ingestion_status == INGESTION_STATUS_INGESTING
+    assert seller_file.lease_owner == "worker-a"
+
+
+def test_profiling_gives_up_after_max_attempts(store, settings):
+    settings.SELLER_FILE_INGESTION_MAX_ATTEMPTS = 2
+    seller_file = store("items.csv", b"sku\n1\n")
+    store.objects.clear()
+    service = SellerFileProfilingService(owner="worker-a")
+
+    for attempt in range(1, 3):
+        # Let the previous lease lapse so the file is claimed again.
+        SellerFiles.objects.filter(id=seller_file.id).update(lease_expires_at=timezone.now() - timedelta(1))
+        service.process_pending(should_stop=iter([False, True]).__next__)
+        seller_file.refresh_from_db()
+        assert seller_file.ingestion_attempts == attempt
+
+    assert seller_file.ingestion_status == INGESTION_STATUS_FAILED
+    assert seller_file.ingestion_errors == ["Failed to read the file. Please upload it again."]
+    assert seller_file.lease_owner is None
+    assert service.claim(batch_size=10) == []
@@ -1,3 +1,4 @@
+import hashlib
 from io import BytesIO
 from unittest.mock import patch
 
@@ -8,9 +9,10 @@ from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 
-from seller.constants import CSV, XLSX
+from seller.constants import CSV, INGESTION_STATUS_FAILED, INGESTION_STATUS_INGESTING, INGESTION_STATUS_READY, XLSX
 from seller.models import Seller, SellerFiles
 from seller.serializers import SellerFilesSerializer
+from seller.services.file_ingestion import SellerFileProfilingService
 from seller.services.seller_base import SellerFilesService, SellerHelperService
 
 pytestmark = pytest.mark.django_db
@@ -58,8 +60,56 @@ def build_request(api_rf, method="get", seller_id=None, upload=None):
     return Request(django_request)
 
 
-@patch("seller.services.seller_base.MinioHandler.store_file", return_value=False)
-def test_store_file_returns_none_when_minio_store_fails(_store_file, seller, upload_csv):
+SUMMARY = {
+    "headers": ["sku", "name"],
+    "sample_rows": [["1", "Widget"]],
+    "rows_count": 1,
+    "content_sha256": "0" * 64,
+}
+
+
+class FakeResponse(BytesIO):
+    def release_conn(self):
+        pass
+
+
+class FakeMinioClient:
+    def __init__(self):
+        self.objects = {}
+        self.error = None
+
+    def bucket_exists(self, bucket_name):
+        return True
+
+    def put_object(self, bucket_name, object_name, data, length, part_size, num_parallel_uploads):
+        chunks = []
+        try:
+            while chunk := data.read(part_size):
+                chunks.append(chunk)
+        except Exception as exc:
+            self.error = exc
+            raise
+        self.objects[(bucket_name, object_name)] = b"".join(chunks)
+
+    def get_object(self, bucket_name, object_name):
+        return FakeResponse(self.objects[(bucket_name, object_name)])
+
+    def copy_object(self, bucket_name, object_name, source):
+        self.objects[(bucket_name, object_name)] = self.objects[(source.bucket_name, source.object_name)]
+
+    def remove_object(self, bucket_name, object_name):
+        self.objects.pop((bucket_name, object_name), None)
+
+
+@pytest.fixture
+def minio_client():
+    client = FakeMinioClient()
+    with patch("core.minio.MinioHandler._get_client", return_value=client):
+        yield client
+
+
+@patch("seller.services.seller_base.FileIngestion.ingest", side_effect=OSError("minio down"))
+def test_store_file_returns_none_when_minio_store_fails(_ingest, seller, upload_csv, minio_client):
     service = SellerHelperService(seller)
     result = service.store_file("bucket", upload_csv, CSV)
 
@@ -69,8 +119,10 @@ def test_store_file_returns_none_when_minio_store_fails(_store_file, seller, upl
 
 @patch("seller.services.seller_base.MinioHandler.remove_file", return_value=True)
 @patch("seller.services.seller_base.SellerFiles.objects.create", side_effect=Exception("boom"))
-@patch("seller.services.seller_base.MinioHandler.store_file", return_value=True)
-def test_store_file_cleans_up_on_db_failure(_store_file, _seller_create, remove_file, seller, upload_csv):
+@patch("seller.services.seller_base.FileIngestion.ingest", return_value=SUMMARY)
+def test_store_file_cleans_up_on_db_failure(
+    _ingest, _seller_create, remove_file, seller, upload_csv, minio_client
+):
     service = SellerHelperService(seller)
     result = service.store_file("bucket", upload_csv, CSV)
 
@@ -78,8 +130,8 @@ def test_store_file_cleans_up_on_db_failure(_store_file, _seller_create, remove_
     remove_file.assert_called_once_with("bucket", "items.csv")
 
 
-@patch("seller.services.seller_base.MinioHandler.store_file", return_value=True)
-def test_store_file_creates_seller_file(_store_file, seller, upload_csv):
+@patch("seller.services.seller_base.FileIngestion.ingest", return_value=SUMMARY)
+def test_store_file_creates_seller_file(_ingest, seller, upload_csv, minio_client):
     service = SellerHelperService(seller)
     result = service.store_file("bucket", upload_csv, CSV)
 
@@ -88,6 +140,8 @@ def test_store_file_creates_seller_file(_store_file, seller, upload_csv):
     assert result.name == "items.csv"
     assert result.file_type == CSV
     assert result.path == "bucket/items.csv"
+    assert result.headers == ["sku", "name"]
+    assert result.content_sha256 == "0" * 64
     assert SellerFiles.objects.count() == 1
 
 
@@ -174,41 +228,100 @@ def test_upload_returns_500_when_storage_fails(_store_file, api_rf, seller, uplo
 
 
 @patch("seller.services.seller_base.PaginationService.paginated_response", return_value={"ok": True})
-@patch("seller.services.seller_base.FileParser.parse_csv", return_value=(["sku", "name"], [["1", "Widget"]], 1))
-def test_upload_updates_rows_count_and_sets_metadata(_parse_csv, paginated_response, api_rf, seller, upload_csv):
-    seller_file = SellerFiles.objects.create(
-        seller=seller, name="items.csv", file_type=CSV, path="bucket/items.csv"
-    )
-    request = build_request(api_rf, method="post", seller_id=seller.id, upload=upload_csv)
+def test_upload_streams_csv_once_and_records_metadata(paginated_response, api_rf, seller, minio_client):
+    content = b"sku,name\n1,Widget\n\n2,Gadget\n"
+    upload = SimpleUploadedFile("items.csv", content, content_type="text/csv")
+    request = build_request(api_rf, method="post", seller_id=seller.id, upload=upload)
     service = SellerFilesService(request)
 
-    with patch("seller.services.seller_base.SellerHelperService.store_file", return_value=seller_file):
-        response = service.upload(request)
+    response = service.upload(request)
 
-    seller_file.refresh_from_db()
-    assert seller_file.rows_count == 1
-    assert seller_file.headers == ["sku", "name"]
-    assert seller_file.sample_rows == [["1", "Widget"]]
+    seller_file = SellerFiles.objects.get()
     assert response == {"ok": True}
+    assert minio_client.objects[(seller.bucket_name, "items.csv")] == content
+    assert seller_file.rows_count == 2
+    assert seller_file.headers == ["sku", "name"]
+    assert seller_file.sample_rows == [["1", "Widget"], ["2", "Gadget"]]
+    assert seller_file.content_sha256 == hashlib.sha256(content).hexdigest()
     args, _kwargs = paginated_response.call_args
     assert args[0] == seller_file
     assert args[1] is SellerFilesSerializer
 
 
 @patch("seller.services.seller_base.PaginationService.paginated_response", return_value={"ok": True})
-@patch("seller.services.seller_base.FileParser.parse_excel", return_value=(["sku", "name"], [["1", "Widget"]], 1))
-def test_upload_uses_excel_parser(_parse_excel, paginated_response, api_rf, seller, upload_xlsx):
-    seller_file = SellerFiles.objects.create(
-        seller=seller, name="items.xlsx", file_type=XLSX, path="bucket/items.xlsx"
-    )
+def test_upload_streams_excel_and_records_metadata(paginated_response, api_rf, seller, upload_xlsx, minio_client):
+    content = upload_xlsx.read()
+    upload_xlsx.seek(0)
     request = build_request(api_rf, method="post", seller_id=seller.id, upload=upload_xlsx)
     service = SellerFilesService(request)
 
-    with patch("seller.services.seller_base.SellerHelperService.store_file", return_value=seller_file):
-        response = service.upload(request)
+    response = service.upload(request)
 
+    seller_file = SellerFiles.objects.get()
     assert response == {"ok": True}
-    _parse_excel.assert_called_once()
-    args, _kwargs = paginated_response.call_args
-    assert args[0] == seller_file
-    assert args[1] is SellerFilesSerializer
+    assert minio_client.objects[(seller.bucket_name, "items.xlsx")] == content
+    assert seller_file.file_type == XLSX
+    assert seller_file.headers == ["sku", "name"]
+    assert seller_file.sample_rows == [["1", "Widget"]]
+    assert seller_file.rows_count == 1
+    assert seller_file.content_sha256 == hashlib.sha256(content).hexdigest()
+
+
+@pytest.mark.parametrize(
+    "name, content, error",
+    [
+        ("items.csv", b"\n\n\n", "CSV file does not appear to be valid CSV."),
+        ("items.csv", b"sku,\n1,Widget\n", "CSV header row must not contain empty columns."),
+        ("items.csv", b"\xff\xfe,\x00\n", "CSV file must be UTF-8 encoded."),
+        ("items.xlsx", b"not a workbook", "Excel file could not be read."),
+    ],
+)
+def test_upload_rejects_invalid_contents_without_storing(api_rf, seller, minio_client, name, content, error):
+    upload = SimpleUploadedFile(name, content)
+    request = build_request(api_rf, method="post", seller_id=seller.id, upload=upload)
+    service = SellerFilesService(request)
+
+    response = service.upload(request)
+
+    assert response["code"] == 412
+    assert response["errors"]["payload_file"] == [error]
+    assert minio_client.objects == {}
+    assert SellerFiles.objects.count() == 0
+
+
+@patch("seller.services.seller_base.PaginationService.paginated_response")
+def test_async_upload_stores_raw_file_and_returns_202(paginated_response, api_rf, seller, minio_client, settings):
+    settings.SELLER_FILE_ASYNC_INGESTION = True
+    content = b"sku,name\n1,Widget\n"
+    upload = SimpleUploadedFile("items.csv", content, content_type="text/csv")
+    request = build_request(api_rf, method="post", seller_id=seller.id, upload=upload)
+    service = SellerFilesService(request)
+
+    response = service.upload(request)
+
+    seller_file = SellerFiles.objects.get()
+    assert response["code"] == 202
+    assert response["data"]["id"] == seller_file.id
+    assert response["data"]["ingestion_status"] == INGESTION_STATUS_INGESTING
+    assert seller_file.headers == []
+    assert seller_file.rows_count == 0
+    assert seller_file.content_sha256 == hashlib.sha256(content).hexdigest()
+    assert seller_file.staged_object_name.startswith("staging/")
+    assert seller_file.staged_object_name.endswith("/items.csv")
+    assert minio_client.objects == {(seller.bucket_name, seller_file.staged_object_name): content}
+    paginated_response.assert_not_called()
+
+
+def test_invalid_async_reupload_leaves_earlier_ready_file_untouched(api_rf, seller, minio_client, settings):
+    settings.SELLER_FILE_ASYNC_INGESTION = True
+    content = b"sku,name\n1,Widget\n"
+    for upload_content in (content, b"sku,\n1,Widget\n"):
+        upload = SimpleUploadedFile("items.csv", upload_content, content_type="text/csv")
+        request = build_request(api_rf, method="post", seller_id=seller.id, upload=upload)
+        assert SellerFilesService(request).upload(request)["code"] == 202
+        SellerFileProfilingService(owner="worker-a").process_pending()
+
+    ready, failed = SellerFiles.objects.order_by("id")
+    assert ready.ingestion_status == INGESTION_STATUS_READY
+    assert failed.ingestion_status == INGESTION_STATUS_FAILED
+    assert minio_client.objects == {(seller.bucket_name, "items.csv"): content}